@@ -0,0 +1,64 @@
+-- =============================================
+-- AGENT_JOB
+-- Estado, progreso y resultado de los trabajos de agentes que se ejecutan
+-- en segundo plano (POST /api/agent/jobs). Lo comparten todos los workers
+-- de la API; el worker que ejecuta un trabajo actualiza heartbeat_at y
+-- atiende cancel_requested.
+-- Las fechas son segundos epoch (FLOAT), igual que en el almacén SQLite local.
+-- Se usa con [agents] job_store = "sqlserver" en config.toml.
+-- =============================================
+USE [SG_SST_AgenteInteligente];
+GO
+
+PRINT '=== 1. TABLA AGENT_JOB ==='
+
+IF OBJECT_ID(N'[dbo].[AGENT_JOB]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [dbo].[AGENT_JOB] (
+        [job_id] VARCHAR(32) NOT NULL PRIMARY KEY,
+        [user_id] INT NOT NULL,
+        [agent_name] VARCHAR(100) NOT NULL,
+        [task] NVARCHAR(MAX) NOT NULL,
+        [session_id] VARCHAR(100) NULL,
+        [context_json] NVARCHAR(MAX) NULL,
+        [status] VARCHAR(20) NOT NULL,
+        [progress] FLOAT NOT NULL DEFAULT 0,
+        [steps] INT NOT NULL DEFAULT 0,
+        [last_event] NVARCHAR(200) NULL,
+        [result_json] NVARCHAR(MAX) NULL,
+        [error] NVARCHAR(MAX) NULL,
+        [cancel_requested] BIT NOT NULL DEFAULT 0,
+        [worker_id] VARCHAR(200) NULL,
+        [created_at] FLOAT NOT NULL,
+        [started_at] FLOAT NULL,
+        [finished_at] FLOAT NULL,
+        [heartbeat_at] FLOAT NULL
+    );
+    PRINT '[OK] Tabla AGENT_JOB creada.';
+END
+ELSE
+BEGIN
+    PRINT '[INFO] La tabla AGENT_JOB ya existe.';
+END
+GO
+
+PRINT '=== 2. INDICES ==='
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[dbo].[AGENT_JOB]') AND name = 'IX_AGENT_JOB_user')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_AGENT_JOB_user]
+        ON [dbo].[AGENT_JOB] ([user_id], [created_at] DESC);
+    PRINT '[OK] Indice IX_AGENT_JOB_user creado.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[dbo].[AGENT_JOB]') AND name = 'IX_AGENT_JOB_active')
+BEGIN
+    -- Solo los trabajos activos: heartbeat, cancelaciones y huérfanos
+    CREATE NONCLUSTERED INDEX [IX_AGENT_JOB_active]
+        ON [dbo].[AGENT_JOB] ([worker_id], [status])
+        INCLUDE ([cancel_requested], [heartbeat_at])
+        WHERE [status] IN ('queued', 'running');
+    PRINT '[OK] Indice IX_AGENT_JOB_active creado.';
+END
+GO
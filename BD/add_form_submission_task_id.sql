@@ -0,0 +1,47 @@
+-- =============================================
+-- FORM_SUBMISSIONS.task_id
+-- Columna indexada con el id de tarea (antes solo en data_json '$.context.taskId')
+-- para resolver el estado de formularios de muchas tareas en una sola consulta.
+-- La API la diligencia al guardar cada envio.
+-- =============================================
+USE [SG_SST_AgenteInteligente];
+GO
+
+PRINT '=== 1. COLUMNA task_id ==='
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID(N'[dbo].[FORM_SUBMISSIONS]') AND name = 'task_id')
+BEGIN
+    ALTER TABLE [dbo].[FORM_SUBMISSIONS] ADD [task_id] INT NULL;
+    PRINT '[OK] Columna task_id agregada.';
+END
+ELSE
+BEGIN
+    PRINT '[INFO] La columna task_id ya existe.';
+END
+GO
+
+PRINT '=== 2. BACKFILL DESDE data_json ==='
+
+UPDATE [dbo].[FORM_SUBMISSIONS]
+SET task_id = TRY_CAST(JSON_VALUE(data_json, '$.context.taskId') AS INT)
+WHERE task_id IS NULL
+  AND ISJSON(data_json) = 1
+  AND JSON_VALUE(data_json, '$.context.taskId') IS NOT NULL;
+
+PRINT CONCAT('[OK] Envios actualizados: ', @@ROWCOUNT);
+GO
+
+PRINT '=== 3. INDICE ==='
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[dbo].[FORM_SUBMISSIONS]') AND name = 'IX_FORM_SUBMISSIONS_task_id')
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_FORM_SUBMISSIONS_task_id]
+        ON [dbo].[FORM_SUBMISSIONS] ([task_id], [status])
+        INCLUDE ([form_id]);
+    PRINT '[OK] Indice IX_FORM_SUBMISSIONS_task_id creado.';
+END
+ELSE
+BEGIN
+    PRINT '[INFO] El indice IX_FORM_SUBMISSIONS_task_id ya existe.';
+END
+GO
@@ -0,0 +1,58 @@
+-- =============================================
+-- TAREA.dedup_key
+-- Clave determinística (SHA-1 de tipo + sujeto + periodo) de las tareas
+-- que crea el agente coordinador. Reemplaza los chequeos de duplicados
+-- con LIKE sobre Descripcion por una búsqueda exacta.
+-- Las tareas existentes quedan con NULL; el agente las sigue comparando
+-- por descripción hasta que se cierran.
+-- =============================================
+USE [SG_SST_AgenteInteligente];
+GO
+
+PRINT '=== 1. COLUMNA dedup_key ==='
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID(N'[dbo].[TAREA]') AND name = 'dedup_key')
+BEGIN
+    ALTER TABLE [dbo].[TAREA] ADD [dedup_key] CHAR(40) NULL;
+    PRINT '[OK] Columna dedup_key agregada.';
+END
+ELSE
+BEGIN
+    PRINT '[INFO] La columna dedup_key ya existe.';
+END
+GO
+
+PRINT '=== 2. INDICE UNICO ==='
+
+-- Una sola tarea abierta por clave. El agente ya evita duplicados antes de
+-- insertar; el índice cubre dos ejecuciones concurrentes del coordinador
+-- (el INSERT que pierde la carrera falla con el error 2601 y se omite).
+IF EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[dbo].[TAREA]') AND name = 'IX_TAREA_dedup_key')
+BEGIN
+    DROP INDEX [IX_TAREA_dedup_key] ON [dbo].[TAREA];
+    PRINT '[OK] Indice no unico IX_TAREA_dedup_key eliminado.';
+END
+GO
+
+-- Duplicados previos al índice: la tarea abierta más antigua conserva la clave
+;WITH duplicadas AS (
+    SELECT dedup_key, ROW_NUMBER() OVER (PARTITION BY dedup_key ORDER BY id_tarea) AS n
+    FROM [dbo].[TAREA]
+    WHERE dedup_key IS NOT NULL AND Estado IN ('Pendiente', 'En Curso')
+)
+UPDATE duplicadas SET dedup_key = NULL WHERE n > 1;
+PRINT '[OK] Claves duplicadas en tareas abiertas: ' + CAST(@@ROWCOUNT AS VARCHAR(10));
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID(N'[dbo].[TAREA]') AND name = 'UX_TAREA_dedup_key')
+BEGIN
+    CREATE UNIQUE NONCLUSTERED INDEX [UX_TAREA_dedup_key]
+        ON [dbo].[TAREA] ([dedup_key])
+        INCLUDE ([Fecha_Creacion])
+        WHERE [dedup_key] IS NOT NULL AND [Estado] IN ('Pendiente', 'En Curso');
+    PRINT '[OK] Indice unico UX_TAREA_dedup_key creado.';
+END
+ELSE
+BEGIN
+    PRINT '[INFO] El indice UX_TAREA_dedup_key ya existe.';
+END
+GO
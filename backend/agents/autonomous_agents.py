@@ -1,9 +1,13 @@
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from enum import Enum
+import hashlib
 import json
+import unicodedata
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import IntegrityError
 
 class AgentAction(str, Enum):
     """Acciones que puede realizar un agente"""
@@ -27,6 +31,368 @@ class Priority(str, Enum):
     LOW = "Baja"
 
 
+# ============================================================
+# CONSULTAS COMPARTIDAS (ejecución por fila y por lotes)
+# ============================================================
+
+EMO_GAP_QUERY = text("""
+    SELECT 
+        E.id_empleado,
+        E.Nombre + ' ' + E.Apellidos AS NombreCompleto,
+        E.Correo,
+        CASE 
+            WHEN EM.id_examen IS NULL THEN 'Sin EMO Registrado'
+            WHEN EM.Fecha_Vencimiento < CAST(GETDATE() AS DATE) THEN 'EMO Vencido'
+        END AS Estado
+    FROM EMPLEADO E
+    LEFT JOIN (
+        SELECT EM1.id_empleado, EM1.id_examen, EM1.Fecha_Vencimiento
+        FROM EXAMEN_MEDICO EM1
+        WHERE EM1.Tipo_Examen = 'Periodico'
+        AND EM1.id_examen = (
+            SELECT TOP 1 id_examen FROM EXAMEN_MEDICO 
+            WHERE id_empleado = EM1.id_empleado AND Tipo_Examen = 'Periodico'
+            ORDER BY Fecha_Realizacion DESC
+        )
+    ) EM ON E.id_empleado = EM.id_empleado
+    WHERE E.Estado = 1
+    AND (EM.id_examen IS NULL OR EM.Fecha_Vencimiento < CAST(GETDATE() AS DATE))
+""")
+
+CAPACITACION_GAP_QUERY = text("""
+    SELECT 
+        c.id_capacitacion,
+        c.Tema,
+        c.Fecha_Programada,
+        DATEDIFF(DAY, c.Fecha_Programada, GETDATE()) AS DiasVencidos
+    FROM CAPACITACION c
+    WHERE c.Estado = 'Programada'
+    AND c.Fecha_Programada < GETDATE()
+""")
+
+COPASST_MONTH_QUERY = text("""
+    SELECT COUNT(*) 
+    FROM REUNION_COMITE rc
+    JOIN COMITE c ON rc.id_comite = c.id_comite
+    WHERE c.Tipo_Comite = 'COPASST'
+    AND MONTH(rc.Fecha_Reunion) = MONTH(GETDATE())
+    AND YEAR(rc.Fecha_Reunion) = YEAR(GETDATE())
+""")
+
+INSPECCION_GAP_QUERY = text("""
+    SELECT id_inspeccion, Tipo_Inspeccion, Area_Inspeccionada, Fecha_Programada
+    FROM INSPECCION
+    WHERE Estado = 'Programada' 
+    AND Fecha_Programada < CAST(GETDATE() AS DATE)
+""")
+
+MANTENIMIENTO_GAP_QUERY = text("""
+    SELECT id_equipo, Nombre, FechaProximoMantenimiento
+    FROM EQUIPO
+    WHERE Estado = 'Activo'
+    AND FechaProximoMantenimiento < CAST(GETDATE() AS DATE)
+""")
+
+RIESGO_GAP_QUERY = text("""
+    SELECT id_evaluacion, Descripcion, Fecha_Programada
+    FROM EVALUACION_RIESGO
+    WHERE Estado = 'Programada' AND Fecha_Programada < CAST(GETDATE() AS DATE)
+""")
+
+CONVIVENCIA_MONTH_QUERY = text("""
+    SELECT COUNT(*) FROM REUNION_COMITE
+    WHERE TipoReunion = 'Convivencia'
+    AND MONTH(FechaReunion) = MONTH(GETDATE())
+    AND YEAR(FechaReunion) = YEAR(GETDATE())
+""")
+# Filas por sentencia en escrituras multi-fila (SQL Server admite 2100 parámetros)
+BATCH_ROWS = 200
+
+SUPERVISORS_QUERY = text("""
+    SELECT e.Correo, e.id_supervisor, s.Nombre + ' ' + s.Apellidos AS NombreSupervisor
+    FROM EMPLEADO e
+    JOIN EMPLEADO s ON e.id_supervisor = s.id_empleado
+    WHERE e.Correo IN :correos
+""").bindparams(bindparam("correos", expanding=True))
+
+# Tareas abiertas (duplicados por responsable) y tareas del día (duplicados de alertas)
+OPEN_AND_TODAY_TASKS_QUERY = text("""
+    SELECT id_tarea, id_empleado_responsable, Descripcion, Estado, dedup_key,
+           CASE WHEN CAST(Fecha_Creacion AS DATE) = CAST(GETDATE() AS DATE) THEN 1 ELSE 0 END AS Hoy
+    FROM TAREA
+    WHERE Estado IN ('Pendiente', 'En Curso')
+    OR (CAST(Fecha_Creacion AS DATE) = CAST(GETDATE() AS DATE) AND Estado != 'Anulada')
+""")
+
+# Empleados con alerta de EMO generada hoy (por IdRelacionado, no por texto)
+TODAY_EMO_ALERTS_QUERY = text("""
+    SELECT DISTINCT em.id_empleado
+    FROM ALERTA a
+    JOIN EXAMEN_MEDICO em ON a.IdRelacionado = em.id_examen
+    WHERE a.ModuloOrigen IN ('EXAMEN_MEDICO', 'EXAMEN_MEDICO_VENCIDO')
+    AND a.Estado IN ('Pendiente', 'Enviada', 'Activa')
+    AND CAST(a.FechaGeneracion AS DATE) = CAST(GETDATE() AS DATE)
+""")
+
+ROLE_HOLDERS_QUERY = text("""
+    SELECT r.NombreRol, r.id_rol, e.id_empleado
+    FROM EMPLEADO e
+    JOIN EMPLEADO_ROL er ON e.id_empleado = er.id_empleado
+    JOIN ROL r ON er.id_rol = r.id_rol
+    WHERE e.Estado = 1
+    ORDER BY r.id_rol, e.id_empleado
+""")
+
+
+def _normalize(value: Any) -> str:
+    """Minúsculas, sin tildes y con espacios colapsados."""
+    value = unicodedata.normalize("NFKD", str(value))
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(value.casefold().split())
+
+
+def dedup_key(kind: str, subject: Any, bucket: Any = "") -> str:
+    """
+    Clave determinística de una tarea automática (TAREA.dedup_key).
+    
+    Args:
+        kind: Tipo de tarea o alerta ("emo", "capacitacion", "alerta", ...)
+        subject: Entidad a la que se refiere (id de empleado, equipo, mensaje, ...)
+        bucket: Periodo en que la tarea es única ("2026-10", fecha ISO, o vacío)
+    
+    Returns:
+        SHA-1 hexadecimal (40 caracteres) de los tres valores normalizados
+    """
+    raw = "|".join(_normalize(part) for part in (kind, subject, bucket))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _like(value: Optional[str], *parts: str) -> bool:
+    """Equivalente en memoria de ``value LIKE '%part1%part2%'`` (sin distinguir mayúsculas)."""
+    if not value:
+        return False
+    value = value.casefold()
+    position = 0
+    for part in parts:
+        position = value.find(part.casefold(), position)
+        if position < 0:
+            return False
+        position += len(part)
+    return True
+
+
+def _multirow_values(rows: List[Dict], columns: List[str]) -> Tuple[str, Dict]:
+    """Construye ``(:c_0, ...), (:c_1, ...)`` y sus parámetros para una sentencia multi-fila."""
+    groups = []
+    params = {}
+    for i, row in enumerate(rows):
+        names = []
+        for column in columns:
+            name = f"{column}_{i}"
+            params[name] = row[column]
+            names.append(f":{name}")
+        groups.append(f"({', '.join(names)})")
+    return ",\n".join(groups), params
+
+
+TASK_COLUMNS = ["resp", "desc", "days", "prio", "tipo", "form", "req", "dkey"]
+
+
+def task_row(key: str, responsible: int, description: str, days: int, priority: str,
+             task_type: str, form_id: Optional[str], requires_form: int = 1) -> Dict:
+    """Fila de TAREA en el formato de ``insert_tasks`` (vence en ``days`` días)."""
+    return {
+        "resp": responsible,
+        "desc": description,
+        "days": days,
+        "prio": priority,
+        "tipo": task_type,
+        "form": form_id,
+        "req": requires_form,
+        "dkey": key,
+    }
+
+
+def _is_duplicate_key(error: IntegrityError) -> bool:
+    """Violación de PK o índice único en SQL Server (errores 2627 y 2601)."""
+    message = str(error.orig)
+    return "2627" in message or "2601" in message
+
+
+def _insert_task_rows(db: Session, rows: List[Dict]) -> int:
+    # Engines run SET NOCOUNT ON, so rowcount is -1: count with @@ROWCOUNT
+    values, params = _multirow_values(rows, TASK_COLUMNS)
+    result = db.execute(text(f"""
+        SET NOCOUNT ON;
+        INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario, dedup_key)
+        SELECT v.resp, v.descr, DATEADD(day, v.days, GETDATE()), v.prio, 'Pendiente', v.tipo, v.form, v.req, v.dkey
+        FROM (VALUES {values}) AS v(resp, descr, days, prio, tipo, form, req, dkey)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM TAREA t WITH (UPDLOCK, HOLDLOCK)
+            WHERE t.dedup_key = v.dkey AND t.Estado IN ('Pendiente', 'En Curso')
+        );
+        SELECT @@ROWCOUNT AS inserted;
+    """), params)
+    return result.scalar() or 0
+
+
+def insert_tasks(db: Session, rows: List[Dict]) -> int:
+    """
+    Inserta tareas del coordinador (filas de ``plan_task``) sin confirmar.
+    
+    Las filas cuya ``dedup_key`` ya está en una tarea abierta se omiten:
+    el ``NOT EXISTS`` con bloqueo de rango cubre el caso normal y, si una
+    ejecución concurrente gana la carrera, el índice único
+    ``UX_TAREA_dedup_key`` rechaza el lote; entonces se reintenta fila por
+    fila y solo se descartan las duplicadas.
+    
+    Returns:
+        Número de tareas insertadas
+    """
+    inserted = 0
+    for start in range(0, len(rows), BATCH_ROWS):
+        chunk = rows[start:start + BATCH_ROWS]
+        try:
+            with db.begin_nested():
+                inserted += _insert_task_rows(db, chunk)
+            continue
+        except IntegrityError as e:
+            if not _is_duplicate_key(e):
+                raise
+        for row in chunk:
+            try:
+                with db.begin_nested():
+                    inserted += _insert_task_rows(db, [row])
+            except IntegrityError as e:
+                if not _is_duplicate_key(e):
+                    raise
+    return inserted
+
+
+class CoordinationBatch:
+    """
+    Estado en memoria de una ejecución por lotes del coordinador.
+    
+    Carga una sola vez las claves de deduplicación de las tareas abiertas
+    y de las del día, los EMOs con alerta del día y los responsables por
+    rol; cada chequeo de duplicados es una búsqueda en un conjunto y las
+    escrituras se acumulan para aplicarse al final en una sola transacción.
+    
+    Las tareas sin ``dedup_key`` (creadas antes de la columna) se siguen
+    comparando por descripción hasta que se cierran.
+    """
+    
+    def __init__(self, db_session: Session):
+        self.db = db_session
+        self.open_keys: Set[str] = set()
+        self.today_keys: Set[str] = set()
+        self.alert_keys: Set[str] = set()
+        self.unkeyed_open: Dict[int, Dict[int, str]] = defaultdict(dict)  # responsable -> {id_tarea: Descripcion}
+        self.unkeyed_today: List[str] = []
+        self.task_owner: Dict[int, int] = {}
+        self.roles: Dict[str, Tuple[int, int]] = {}  # NombreRol -> (id_rol, id_empleado)
+        self.escalations: List[Dict] = []
+        self.new_tasks: List[Dict] = []
+    
+    def load(self):
+        """Carga claves de tareas, EMOs con alerta y roles (tres consultas)."""
+        for row in self.db.execute(OPEN_AND_TODAY_TASKS_QUERY):
+            is_open = row.Estado in ('Pendiente', 'En Curso')
+            if row.dedup_key:
+                if is_open:
+                    self.open_keys.add(row.dedup_key)
+                if row.Hoy:
+                    self.today_keys.add(row.dedup_key)
+                continue
+            if is_open:
+                self.unkeyed_open[row.id_empleado_responsable][row.id_tarea] = row.Descripcion
+                self.task_owner[row.id_tarea] = row.id_empleado_responsable
+            if row.Hoy:
+                self.unkeyed_today.append(row.Descripcion)
+        
+        today = date.today().isoformat()
+        for row in self.db.execute(TODAY_EMO_ALERTS_QUERY):
+            self.alert_keys.add(dedup_key("alerta_emo", row.id_empleado, today))
+        
+        for row in self.db.execute(ROLE_HOLDERS_QUERY):
+            # Primer empleado activo por rol (como el TOP 1 de la versión por fila)
+            self.roles.setdefault(row.NombreRol, (row.id_rol, row.id_empleado))
+    
+    def load_supervisors(self, emails: List[str]) -> Dict[str, Any]:
+        """Supervisor por correo del responsable, en consultas de hasta 1000 correos."""
+        supervisors = {}
+        unique = sorted({email for email in emails if email})
+        for start in range(0, len(unique), 1000):
+            rows = self.db.execute(SUPERVISORS_QUERY, {"correos": unique[start:start + 1000]})
+            for row in rows:
+                supervisors[row.Correo.casefold()] = row
+        return supervisors
+    
+    def holder(self, *role_names: str, highest_role: bool = False) -> Optional[int]:
+        """Empleado con el primero de los roles dados (o con el de mayor id_rol)."""
+        found = [self.roles[name] for name in role_names if name in self.roles]
+        if not found:
+            return None
+        if highest_role:
+            return max(found)[1]
+        return found[0][1]
+    
+    def has_open_task(self, key: str, responsible: int, *parts: str) -> bool:
+        """Hay una tarea abierta con la clave (o, sin clave, del responsable y con la descripción)."""
+        if key in self.open_keys:
+            return True
+        return any(_like(desc, *parts) for desc in self.unkeyed_open.get(responsible, {}).values())
+    
+    def created_today(self, key: str, *parts: str) -> bool:
+        if key in self.today_keys:
+            return True
+        return any(_like(desc, *parts) for desc in self.unkeyed_today)
+    
+    def alert_today(self, key: str) -> bool:
+        return key in self.alert_keys
+    
+    def plan_task(self, key: str, responsible: int, description: str, days: int, priority: str,
+                  task_type: str, form_id: Optional[str], requires_form: int = 1):
+        """Agenda un INSERT en TAREA y registra su clave."""
+        self.new_tasks.append(task_row(key, responsible, description, days, priority, task_type, form_id, requires_form))
+        self.open_keys.add(key)
+        self.today_keys.add(key)
+    
+    def plan_escalation(self, task_id: int, new_responsible: int):
+        """Agenda la reasignación de una tarea al supervisor."""
+        self.escalations.append({"task": task_id, "resp": new_responsible})
+        owner = self.task_owner.pop(task_id, None)
+        if owner is not None:
+            description = self.unkeyed_open[owner].pop(task_id, None)
+            if description is not None:
+                self.unkeyed_open[new_responsible][task_id] = description
+                self.task_owner[task_id] = new_responsible
+    
+    def apply(self):
+        """Aplica escalamientos e inserciones en sentencias multi-fila y confirma una vez."""
+        try:
+            for start in range(0, len(self.escalations), BATCH_ROWS):
+                values, params = _multirow_values(self.escalations[start:start + BATCH_ROWS], ["task", "resp"])
+                self.db.execute(text(f"""
+                    UPDATE t
+                    SET id_empleado_responsable = v.resp,
+                        Prioridad = 'Crítica',
+                        Descripcion = t.Descripcion + ' [ESCALADA AUTOMÁTICAMENTE POR AGENTE]',
+                        Fecha_Actualizacion = GETDATE()
+                    FROM TAREA t
+                    JOIN (VALUES {values}) AS v(task, resp) ON t.id_tarea = v.task
+                """), params)
+            
+            inserted = insert_tasks(self.db, self.new_tasks)
+            if inserted < len(self.new_tasks):
+                print(f"Coordinador: {len(self.new_tasks) - inserted} tareas ya existían (otra ejecución concurrente)")
+            
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+
 # ============================================================
 # 1. AGENTE COORDINADOR DE TAREAS (Task Coordinator Agent)
 # ============================================================
@@ -40,8 +406,9 @@ class TaskCoordinatorAgent:
     - Carga de trabajo de responsables
     """
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, batch: bool = True):
         self.db = db_session
+        self.batch = batch
         self.rules = self._load_rules()
     
     def _load_rules(self) -> Dict:
@@ -60,8 +427,22 @@ class TaskCoordinatorAgent:
     
     def analyze_and_coordinate(self) -> List[Dict]:
         """
-        Analiza el estado actual y coordina acciones
+        Analiza el estado actual y coordina acciones.
+        
+        Con ``batch`` (por defecto) los datos se cargan una vez y todas las
+        escrituras se aplican en una sola transacción; sin él se usa la
+        ejecución original, una consulta y un commit por elemento.
+        
+        La ejecución por fila se conserva como respaldo operativo: el lote
+        es todo o nada (una escritura que falla revierte la corrida
+        completa), mientras que por fila cada acción se confirma sola y un
+        elemento con datos problemáticos no bloquea a los demás. Sirve para
+        aislar ese elemento y como referencia de las reglas mientras la
+        versión por lotes se valida en producción.
         """
+        if self.batch:
+            return self._coordinate_batch()
+        
         actions = []
         
         # 1. Analizar tareas vencidas (Usa SP existente)
@@ -331,11 +712,8 @@ class TaskCoordinatorAgent:
         # 3. Default: None (tarea sin formulario requerido)
         return None
 
-    def _get_responsible_for_alert(self, message: str, tipo: str) -> int:
-        """
-        Determina el responsable basado en el contenido de la alerta y la normativa.
-        Retorna el ID del empleado.
-        """
+    def _alert_role(self, message: str, tipo: str) -> str:
+        """Rol responsable de una alerta según palabras clave (normativa)."""
         # 1. Definir mapeo de Palabras Clave -> Rol Responsable
         routing_rules = [
             # COPASST
@@ -368,7 +746,16 @@ class TaskCoordinatorAgent:
             if target_role != "Coordinador SST":
                 break
         
-        # 3. Buscar ID del empleado con ese rol
+        return target_role
+
+    def _get_responsible_for_alert(self, message: str, tipo: str) -> int:
+        """
+        Determina el responsable basado en el contenido de la alerta y la normativa.
+        Retorna el ID del empleado.
+        """
+        target_role = self._alert_role(message, tipo)
+        
+        # Buscar ID del empleado con ese rol
         # Priorizamos el rol específico, si no existe, fallback al Coordinador
         query = text("""
             SELECT TOP 1 e.id_empleado 
@@ -427,6 +814,7 @@ class TaskCoordinatorAgent:
                 assigned_to = self._get_responsible_for_alert(mensaje, tipo)
                 
                 # Check for duplicate tasks created today
+                key = dedup_key("alerta", f"{tipo}|{mensaje}", date.today().isoformat())
                 description_pattern = f"%{mensaje}%"
                 duplicate_check = text("""
                     SELECT COUNT(*) FROM TAREA 
@@ -447,13 +835,12 @@ class TaskCoordinatorAgent:
                     # Determinar formulario requerido
                     form_id = self._get_form_for_task_type(tipo, mensaje)
                     
-                    # Insertar Tarea
-                    insert_sql = text("""
-                        INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario)
-                        VALUES (:resp, :desc, DATEADD(day, 1, GETDATE()), 'Crítica', 'Pendiente', 'Gestión Alerta', :form_id)
-                    """)
-                    self.db.execute(insert_sql, {"resp": assigned_to, "desc": description, "form_id": form_id})
+                    # Insertar Tarea (se omite si otra ejecución ya la creó)
+                    row = task_row(key, assigned_to, description, 1, 'Crítica', 'Gestión Alerta', form_id, requires_form=0)
+                    inserted = insert_tasks(self.db, [row])
                     self.db.commit()
+                    if not inserted:
+                        continue
 
                     actions.append({
                         "action": AgentAction.ESCALATE,
@@ -477,13 +864,12 @@ class TaskCoordinatorAgent:
                     # Determinar formulario requerido
                     form_id = self._get_form_for_task_type(tipo, mensaje)
                     
-                    # Insertar Tarea
-                    insert_sql = text("""
-                        INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario)
-                        VALUES (:resp, :desc, DATEADD(day, 3, GETDATE()), 'Alta', 'Pendiente', 'Gestión Alerta', :form_id)
-                    """)
-                    self.db.execute(insert_sql, {"resp": assigned_to, "desc": description, "form_id": form_id})
+                    # Insertar Tarea (se omite si otra ejecución ya la creó)
+                    row = task_row(key, assigned_to, description, 3, 'Alta', 'Gestión Alerta', form_id, requires_form=0)
+                    inserted = insert_tasks(self.db, [row])
                     self.db.commit()
+                    if not inserted:
+                        continue
 
                     actions.append({
                         "action": AgentAction.CREATE_TASK,
@@ -531,31 +917,11 @@ class TaskCoordinatorAgent:
             # ========================================
             # GAP 1: EMOs Vencidos o Faltantes
             # ========================================
-            query_emo = text("""
-                SELECT 
-                    E.id_empleado,
-                    E.Nombre + ' ' + E.Apellidos AS NombreCompleto,
-                    E.Correo,
-                    CASE 
-                        WHEN EM.id_examen IS NULL THEN 'Sin EMO Registrado'
-                        WHEN EM.Fecha_Vencimiento < CAST(GETDATE() AS DATE) THEN 'EMO Vencido'
-                    END AS Estado
-                FROM EMPLEADO E
-                LEFT JOIN (
-                    SELECT EM1.id_empleado, EM1.id_examen, EM1.Fecha_Vencimiento
-                    FROM EXAMEN_MEDICO EM1
-                    WHERE EM1.Tipo_Examen = 'Periodico'
-                    AND EM1.id_examen = (
-                        SELECT TOP 1 id_examen FROM EXAMEN_MEDICO 
-                        WHERE id_empleado = EM1.id_empleado AND Tipo_Examen = 'Periodico'
-                        ORDER BY Fecha_Realizacion DESC
-                    )
-                ) EM ON E.id_empleado = EM.id_empleado
-                WHERE E.Estado = 1
-                AND (EM.id_examen IS NULL OR EM.Fecha_Vencimiento < CAST(GETDATE() AS DATE))
-            """)
+            query_emo = EMO_GAP_QUERY
             
             employees_emo = self.db.execute(query_emo).fetchall()
+            today = date.today().isoformat()
+            emo_alerts_today = {row.id_empleado for row in self.db.execute(TODAY_EMO_ALERTS_QUERY)}
             
             for emp in employees_emo:
                 description = f"Realizar Examen Médico Ocupacional ({emp.Estado})"
@@ -569,22 +935,16 @@ class TaskCoordinatorAgent:
                 """)
                 task_exists = self.db.execute(check_task, {"emp_id": emp.id_empleado, "desc": f"%Examen Médico%"}).scalar()
                 
-                # CRÍTICO: Verificar duplicados de ALERTA para evitar duplicación
-                check_alert = text("""
-                    SELECT COUNT(*) FROM ALERTA 
-                    WHERE Mensaje LIKE :msg 
-                    AND Estado = 'Activa'
-                    AND CAST(FechaCreacion AS DATE) = CAST(GETDATE() AS DATE)
-                """)
-                alert_exists = self.db.execute(check_alert, {"msg": f"%{emp.NombreCompleto}%médico%"}).scalar()
+                # CRÍTICO: Verificar duplicados de ALERTA (EMO del empleado con alerta hoy)
+                alert_exists = emp.id_empleado in emo_alerts_today
                 
-                if task_exists == 0 and alert_exists == 0:
-                    insert_task = text("""
-                        INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                        VALUES (:emp_id, :desc, DATEADD(day, 15, GETDATE()), 'Alta', 'Pendiente', 'Salud', 'form_examen_medico', 1)
-                    """)
-                    self.db.execute(insert_task, {"emp_id": emp.id_empleado, "desc": description})
+                if task_exists == 0 and not alert_exists:
+                    row = task_row(dedup_key("emo", emp.id_empleado), emp.id_empleado, description,
+                                   15, 'Alta', 'Salud', 'form_examen_medico')
+                    inserted = insert_tasks(self.db, [row])
                     self.db.commit()
+                    if not inserted:
+                        continue
                     
                     actions.append({
                         "action": AgentAction.CREATE_TASK,
@@ -598,16 +958,7 @@ class TaskCoordinatorAgent:
             # GAP 2: Capacitaciones Obligatorias Pendientes
             # ========================================
             # Buscar capacitaciones programadas que no se han realizado
-            query_cap = text("""
-                SELECT 
-                    c.id_capacitacion,
-                    c.Tema,
-                    c.Fecha_Programada,
-                    DATEDIFF(DAY, c.Fecha_Programada, GETDATE()) AS DiasVencidos
-                FROM CAPACITACION c
-                WHERE c.Estado = 'Programada'
-                AND c.Fecha_Programada < GETDATE()
-            """)
+            query_cap = CAPACITACION_GAP_QUERY
             
             capacitaciones_pendientes = self.db.execute(query_cap).fetchall()
             
@@ -635,12 +986,12 @@ class TaskCoordinatorAgent:
                 exists = self.db.execute(check_task, {"coord_id": coord_id, "desc": f"%{cap.Tema}%"}).scalar()
                 
                 if exists == 0:
-                    insert_task = text("""
-                        INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                        VALUES (:coord_id, :desc, DATEADD(day, 7, GETDATE()), 'Alta', 'Pendiente', 'Capacitación', 'form_registro_capacitacion', 1)
-                    """)
-                    self.db.execute(insert_task, {"coord_id": coord_id, "desc": description})
+                    row = task_row(dedup_key("capacitacion", cap.id_capacitacion), coord_id, description,
+                                   7, 'Alta', 'Capacitación', 'form_registro_capacitacion')
+                    inserted = insert_tasks(self.db, [row])
                     self.db.commit()
+                    if not inserted:
+                        continue
                     
                     actions.append({
                         "action": AgentAction.CREATE_TASK,
@@ -654,14 +1005,7 @@ class TaskCoordinatorAgent:
             # GAP 3: Reuniones COPASST Pendientes
             # ========================================
             # Verificar si hay reunión mensual del COPASST
-            query_copasst = text("""
-                SELECT COUNT(*) 
-                FROM REUNION_COMITE rc
-                JOIN COMITE c ON rc.id_comite = c.id_comite
-                WHERE c.Tipo_Comite = 'COPASST'
-                AND MONTH(rc.Fecha_Reunion) = MONTH(GETDATE())
-                AND YEAR(rc.Fecha_Reunion) = YEAR(GETDATE())
-            """)
+            query_copasst = COPASST_MONTH_QUERY
             
             reuniones_mes = self.db.execute(query_copasst).scalar()
             
@@ -689,13 +1033,12 @@ class TaskCoordinatorAgent:
                 exists = self.db.execute(check_task, {"pres_id": pres_id, "desc": f"%reunión mensual COPASST%"}).scalar()
                 
                 if exists == 0:
-                    insert_task = text("""
-                        INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                        VALUES (:pres_id, :desc, DATEADD(day, 5, GETDATE()), 'Crítica', 'Pendiente', 'Comité', 'form_acta_reunion', 1)
-                    """)
-                    self.db.execute(insert_task, {"pres_id": pres_id, "desc": description})
+                    row = task_row(dedup_key("reunion_comite", "COPASST", today[:7]), pres_id, description,
+                                   5, 'Crítica', 'Comité', 'form_acta_reunion')
+                    exists = 0 if insert_tasks(self.db, [row]) else 1
                     self.db.commit()
-                    
+                
+                if exists == 0:
                     actions.append({
                         "action": AgentAction.CREATE_TASK,
                         "gap_type": "COPASST",
@@ -708,12 +1051,7 @@ class TaskCoordinatorAgent:
             # GAP 4: Inspecciones de Seguridad Vencidas
             # ========================================
             # Schema: id_inspeccion, Tipo_Inspeccion, Area_Inspeccionada, Fecha_Programada, Estado
-            query_inspeccion = text("""
-                SELECT id_inspeccion, Tipo_Inspeccion, Area_Inspeccionada, Fecha_Programada
-                FROM INSPECCION
-                WHERE Estado = 'Programada' 
-                AND Fecha_Programada < CAST(GETDATE() AS DATE)
-            """)
+            query_inspeccion = INSPECCION_GAP_QUERY
             try:
                 inspecciones = self.db.execute(query_inspeccion).fetchall()
                 for insp in inspecciones:
@@ -737,12 +1075,12 @@ class TaskCoordinatorAgent:
                     """)
                     exists = self.db.execute(check, {"emp": assigned_to, "desc": f"%{insp.Tipo_Inspeccion}%"}).scalar()
                     if not exists:
-                        insert = text("""
-                            INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                            VALUES (:emp, :desc, DATEADD(day, 5, GETDATE()), 'Alta', 'Pendiente', 'Inspección', :form_id, 1)
-                        """)
-                        self.db.execute(insert, {"emp": assigned_to, "desc": description, "form_id": form_id})
+                        row = task_row(dedup_key("inspeccion", insp.id_inspeccion), assigned_to, description,
+                                       5, 'Alta', 'Inspección', form_id)
+                        inserted = insert_tasks(self.db, [row])
                         self.db.commit()
+                        if not inserted:
+                            continue
                         actions.append({
                             "action": AgentAction.CREATE_TASK,
                             "gap_type": "INSPECCION",
@@ -758,12 +1096,7 @@ class TaskCoordinatorAgent:
             # GAP 5: Mantenimiento de Equipos Vencido
             # ========================================
             # Schema: id_equipo, Nombre, FechaProximoMantenimiento, Estado
-            query_mantenimiento = text("""
-                SELECT id_equipo, Nombre, FechaProximoMantenimiento
-                FROM EQUIPO
-                WHERE Estado = 'Activo'
-                AND FechaProximoMantenimiento < CAST(GETDATE() AS DATE)
-            """)
+            query_mantenimiento = MANTENIMIENTO_GAP_QUERY
             try:
                 equipos = self.db.execute(query_mantenimiento).fetchall()
                 for eq in equipos:
@@ -783,12 +1116,12 @@ class TaskCoordinatorAgent:
                     """)
                     exists = self.db.execute(check, {"emp": assigned_to, "desc": f"%{eq.Nombre}%"}).scalar()
                     if not exists:
-                        insert = text("""
-                            INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                            VALUES (:emp, :desc, DATEADD(day, 7, GETDATE()), 'Media', 'Pendiente', 'Mantenimiento', 'form_registro_mantenimiento', 1)
-                        """)
-                        self.db.execute(insert, {"emp": assigned_to, "desc": description})
+                        row = task_row(dedup_key("mantenimiento", eq.id_equipo), assigned_to, description,
+                                       7, 'Media', 'Mantenimiento', 'form_registro_mantenimiento')
+                        inserted = insert_tasks(self.db, [row])
                         self.db.commit()
+                        if not inserted:
+                            continue
                         actions.append({
                             "action": AgentAction.CREATE_TASK,
                             "gap_type": "MANTENIMIENTO",
@@ -804,11 +1137,7 @@ class TaskCoordinatorAgent:
             # GAP 6: Evaluaciones de Riesgo Pendientes
             # ========================================
             # Using new table EVALUACION_RIESGO
-            query_riesgo = text("""
-                SELECT id_evaluacion, Descripcion, Fecha_Programada
-                FROM EVALUACION_RIESGO
-                WHERE Estado = 'Programada' AND Fecha_Programada < CAST(GETDATE() AS DATE)
-            """)
+            query_riesgo = RIESGO_GAP_QUERY
             try:
                 riesgos = self.db.execute(query_riesgo).fetchall()
                 for ris in riesgos:
@@ -819,12 +1148,12 @@ class TaskCoordinatorAgent:
                     """)
                     exists = self.db.execute(check, {"emp": assigned_to, "desc": f"%{ris.Descripcion}%"}).scalar()
                     if not exists:
-                        insert = text("""
-                            INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                            VALUES (:emp, :desc, DATEADD(day, 10, GETDATE()), 'Alta', 'Pendiente', 'Evaluación Riesgo', 'form_evaluacion_riesgo', 1)
-                        """)
-                        self.db.execute(insert, {"emp": assigned_to, "desc": description})
+                        row = task_row(dedup_key("riesgo", ris.id_evaluacion), assigned_to, description,
+                                       10, 'Alta', 'Evaluación Riesgo', 'form_evaluacion_riesgo')
+                        inserted = insert_tasks(self.db, [row])
                         self.db.commit()
+                        if not inserted:
+                            continue
                         actions.append({
                             "action": AgentAction.CREATE_TASK,
                             "gap_type": "RIESGO",
@@ -841,12 +1170,7 @@ class TaskCoordinatorAgent:
             # GAP 7: Reuniones de Comité de Convivencia Mensuales
             # ========================================
             # Schema: REUNION_COMITE (TipoReunion, FechaReunion)
-            query_convivencia = text("""
-                SELECT COUNT(*) FROM REUNION_COMITE
-                WHERE TipoReunion = 'Convivencia'
-                AND MONTH(FechaReunion) = MONTH(GETDATE())
-                AND YEAR(FechaReunion) = YEAR(GETDATE())
-            """)
+            query_convivencia = CONVIVENCIA_MONTH_QUERY
             try:
                 reuniones = self.db.execute(query_convivencia).scalar()
                 if reuniones == 0:
@@ -864,12 +1188,11 @@ class TaskCoordinatorAgent:
                     """)
                     exists = self.db.execute(check, {"emp": pres_id, "desc": f"%reunión mensual del Comité de Convivencia%"}).scalar()
                     if not exists:
-                        insert = text("""
-                            INSERT INTO TAREA (id_empleado_responsable, Descripcion, Fecha_Vencimiento, Prioridad, Estado, Tipo_Tarea, id_formulario, requiere_formulario)
-                            VALUES (:emp, :desc, DATEADD(day, 5, GETDATE()), 'Crítica', 'Pendiente', 'Comité', 'form_acta_reunion', 1)
-                        """)
-                        self.db.execute(insert, {"emp": pres_id, "desc": description})
+                        row = task_row(dedup_key("reunion_comite", "Convivencia", today[:7]), pres_id, description,
+                                       5, 'Crítica', 'Comité', 'form_acta_reunion')
+                        exists = not insert_tasks(self.db, [row])
                         self.db.commit()
+                    if not exists:
                         actions.append({
                             "action": AgentAction.CREATE_TASK,
                             "gap_type": "CONVIVENCIA",
@@ -887,6 +1210,317 @@ class TaskCoordinatorAgent:
         return actions
 
 
+    # ============================================================
+    # EJECUCIÓN POR LOTES
+    # ============================================================
+
+    def _coordinate_batch(self) -> List[Dict]:
+        """
+        Versión por lotes de ``analyze_and_coordinate``: mismas reglas,
+        pero los chequeos de duplicados y responsables se resuelven en
+        memoria y las escrituras se confirman en un único commit.
+        """
+        batch = CoordinationBatch(self.db)
+        
+        # Los SPs corren primero: las tareas que generan cuentan como existentes
+        overdue = self.db.execute(text("EXEC SP_Monitorear_Tareas_Vencidas")).fetchall()
+        preventive = self._create_preventive_tasks_batch()
+        batch.load()
+        
+        actions = []
+        actions.extend(self._handle_overdue_tasks_batch(batch, overdue))
+        actions.extend(preventive)
+        actions.extend(self._rebalance_workload())
+        actions.extend(self._escalate_critical_tasks())
+        actions.extend(self._monitor_dashboard_alerts_batch(batch))
+        actions.extend(self._correct_compliance_gaps_batch(batch))
+        
+        batch.apply()
+        return actions
+    
+    def _create_preventive_tasks_batch(self) -> List[Dict]:
+        """Como ``_create_preventive_tasks`` pero sin commit propio."""
+        row = self.db.execute(text("EXEC SP_Generar_Tareas_Vigencia @IdCoordinadorSST = 101")).fetchone()
+        if row and row.TareasGeneradas > 0:
+            return [{
+                "action": AgentAction.CREATE_TASK,
+                "description": f"Se generaron automáticamente {row.TareasGeneradas} tareas preventivas por vencimientos.",
+                "count": row.TareasGeneradas,
+                "priority": Priority.HIGH
+            }]
+        return []
+    
+    def _handle_overdue_tasks_batch(self, batch: CoordinationBatch, tasks: List[Any]) -> List[Dict]:
+        """Escala tareas vencidas con un solo mapa de supervisores."""
+        actions = []
+        supervisors = batch.load_supervisors([task[5] for task in tasks if task[7] > 7])
+        
+        for task in tasks:
+            days_overdue = task[7]  # DiasVencida
+            
+            if days_overdue > 7:
+                supervisor = supervisors.get((task[5] or "").casefold())  # CorreoResponsable
+                if supervisor:
+                    batch.plan_escalation(task[0], supervisor.id_supervisor)
+                    actions.append({
+                        "action": AgentAction.ESCALATE,
+                        "task_id": task.id_tarea,
+                        "escalated_to": supervisor.NombreSupervisor,
+                        "reason": f"Tarea vencida hace {days_overdue} días. Reasignada automáticamente al supervisor.",
+                        "priority": Priority.CRITICAL,
+                        "status": "EXECUTED"
+                    })
+                else:
+                    actions.append({
+                        "action": AgentAction.ESCALATE,
+                        "task_id": task[0],
+                        "reason": f"Tarea vencida hace {days_overdue} días. No se pudo escalar (sin supervisor asignado).",
+                        "priority": Priority.CRITICAL,
+                        "status": "FAILED"
+                    })
+                    
+            elif days_overdue > 3:
+                actions.append({
+                    "action": AgentAction.SEND_ALERT,
+                    "task_id": task[0],
+                    "recipient": task[5],
+                    "message": f"Tarea '{task[1]}' vencida hace {days_overdue} días. Requiere acción inmediata.",
+                    "priority": Priority.HIGH,
+                    "details": dict(task._mapping)
+                })
+        
+        return actions
+    
+    def _alert_responsible(self, batch: CoordinationBatch, message: str, tipo: str) -> int:
+        """Como ``_get_responsible_for_alert`` pero contra el mapa de roles en memoria."""
+        return (
+            batch.holder(self._alert_role(message, tipo))
+            or batch.holder('Coordinador SST', 'Responsable SG-SST', 'Director SST', highest_role=True)
+            or 1
+        )
+    
+    def _monitor_dashboard_alerts_batch(self, batch: CoordinationBatch) -> List[Dict]:
+        """Convierte alertas de VW_Dashboard_Alertas en tareas sin consultas por alerta."""
+        actions = []
+        today = date.today().isoformat()
+        
+        try:
+            alerts = self.db.execute(text("SELECT * FROM VW_Dashboard_Alertas ORDER BY Prioridad DESC")).fetchall()
+        except Exception as e:
+            print(f"Error monitoring dashboard alerts: {e}")
+            return actions
+        
+        for alert in alerts:
+            alert_data = dict(alert._mapping)
+            tipo = alert_data.get('Tipo', 'General')
+            mensaje = alert_data.get('Mensaje')
+            if not mensaje or mensaje == 'Alerta sin descripción':
+                continue
+            
+            prioridad = alert_data.get('Prioridad', 'Media')
+            assigned_to = self._alert_responsible(batch, mensaje, tipo)
+            
+            key = dedup_key("alerta", f"{tipo}|{mensaje}", today)
+            if batch.created_today(key, mensaje):
+                continue
+            
+            if prioridad == 'Crítica':
+                description = f"Atender alerta crítica: {mensaje}"
+                form_id = self._get_form_for_task_type(tipo, mensaje)
+                batch.plan_task(key, assigned_to, description, 1, 'Crítica', 'Gestión Alerta', form_id, requires_form=0)
+                
+                actions.append({
+                    "action": AgentAction.ESCALATE,
+                    "reason": f"Alerta Crítica de Dashboard: {mensaje}",
+                    "priority": Priority.CRITICAL,
+                    "details": alert_data
+                })
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "description": description,
+                    "assigned_to": assigned_to,
+                    "priority": Priority.CRITICAL,
+                    "tipo": "Corrección Inmediata"
+                })
+                
+            elif prioridad == 'Alta':
+                description = f"Gestionar alerta: {mensaje}"
+                form_id = self._get_form_for_task_type(tipo, mensaje)
+                batch.plan_task(key, assigned_to, description, 3, 'Alta', 'Gestión Alerta', form_id, requires_form=0)
+                
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "description": description,
+                    "assigned_to": assigned_to,
+                    "priority": Priority.HIGH,
+                    "tipo": "Gestión de Alerta"
+                })
+                actions.append({
+                    "action": AgentAction.SEND_ALERT,
+                    "message": f"Nueva alerta alta en dashboard: {mensaje}",
+                    "priority": Priority.HIGH
+                })
+                
+            else:
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "description": f"Revisar: {mensaje}",
+                    "priority": Priority.MEDIUM,
+                    "tipo": "Revisión Rutinaria"
+                })
+        
+        return actions
+    
+    def _correct_compliance_gaps_batch(self, batch: CoordinationBatch) -> List[Dict]:
+        """
+        Mismas brechas que ``_correct_compliance_gaps``: una consulta por
+        brecha y sin commits. Las claves usan el id de la entidad (empleado,
+        capacitación, inspección, equipo, evaluación) o el mes para las
+        reuniones de comité.
+        """
+        actions = []
+        coord_id = batch.holder('Coordinador SST', 'Director SST') or 1
+        today = date.today().isoformat()
+        month = today[:7]
+        
+        # GAP 1: EMOs vencidos o faltantes
+        try:
+            for emp in self.db.execute(EMO_GAP_QUERY).fetchall():
+                key = dedup_key("emo", emp.id_empleado)
+                if (batch.has_open_task(key, emp.id_empleado, "Examen Médico")
+                        or batch.alert_today(dedup_key("alerta_emo", emp.id_empleado, today))):
+                    continue
+                description = f"Realizar Examen Médico Ocupacional ({emp.Estado})"
+                batch.plan_task(key, emp.id_empleado, description, 15, 'Alta', 'Salud', 'form_examen_medico')
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "gap_type": "EMO",
+                    "recipient": emp.NombreCompleto,
+                    "task": description,
+                    "status": "ASSIGNED_AUTOMATICALLY"
+                })
+        except Exception as e:
+            print(f"Error checking EMO gap: {e}")
+        
+        # GAP 2: Capacitaciones obligatorias pendientes
+        try:
+            for cap in self.db.execute(CAPACITACION_GAP_QUERY).fetchall():
+                key = dedup_key("capacitacion", cap.id_capacitacion)
+                if batch.has_open_task(key, coord_id, cap.Tema):
+                    continue
+                description = f"Ejecutar capacitación pendiente: {cap.Tema} (vencida hace {cap.DiasVencidos} días)"
+                batch.plan_task(key, coord_id, description, 7, 'Alta', 'Capacitación', 'form_registro_capacitacion')
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "gap_type": "CAPACITACION",
+                    "task": description,
+                    "assigned_to": coord_id,
+                    "status": "ASSIGNED_AUTOMATICALLY"
+                })
+        except Exception as e:
+            print(f"Error checking Capacitacion gap: {e}")
+        
+        # GAP 3: Reunión mensual COPASST
+        try:
+            if self.db.execute(COPASST_MONTH_QUERY).scalar() == 0:
+                pres_id = batch.holder('Presidente COPASST') or coord_id
+                key = dedup_key("reunion_comite", "COPASST", month)
+                if not batch.has_open_task(key, pres_id, "reunión mensual COPASST"):
+                    description = f"Programar reunión mensual COPASST - {datetime.now().strftime('%B %Y')}"
+                    batch.plan_task(key, pres_id, description, 5, 'Crítica', 'Comité', 'form_acta_reunion')
+                    actions.append({
+                        "action": AgentAction.CREATE_TASK,
+                        "gap_type": "COPASST",
+                        "task": description,
+                        "assigned_to": pres_id,
+                        "status": "ASSIGNED_AUTOMATICALLY"
+                    })
+        except Exception as e:
+            print(f"Error checking COPASST gap: {e}")
+        
+        # GAP 4: Inspecciones de seguridad vencidas
+        try:
+            inspector_id = batch.holder('Inspector SST', 'Vigía SST') or coord_id
+            for insp in self.db.execute(INSPECCION_GAP_QUERY).fetchall():
+                key = dedup_key("inspeccion", insp.id_inspeccion)
+                if batch.has_open_task(key, inspector_id, insp.Tipo_Inspeccion):
+                    continue
+                description = f"Realizar inspección de seguridad: {insp.Tipo_Inspeccion} en {insp.Area_Inspeccionada} (vencida)"
+                form_id = self._get_form_for_task_type(insp.Tipo_Inspeccion, description)
+                batch.plan_task(key, inspector_id, description, 5, 'Alta', 'Inspección', form_id)
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "gap_type": "INSPECCION",
+                    "description": description,
+                    "assigned_to": inspector_id,
+                    "priority": Priority.HIGH,
+                    "tipo": "Gestión Inspección"
+                })
+        except Exception as e:
+            print(f"Error checking Inspections gap: {e}")
+        
+        # GAP 5: Mantenimiento de equipos vencido
+        try:
+            maintenance_id = batch.holder('Responsable Mantenimiento') or coord_id
+            for eq in self.db.execute(MANTENIMIENTO_GAP_QUERY).fetchall():
+                key = dedup_key("mantenimiento", eq.id_equipo)
+                if batch.has_open_task(key, maintenance_id, eq.Nombre):
+                    continue
+                description = f"Programar mantenimiento del equipo: {eq.Nombre} (vencido el {eq.FechaProximoMantenimiento})"
+                batch.plan_task(key, maintenance_id, description, 7, 'Media', 'Mantenimiento', 'form_registro_mantenimiento')
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "gap_type": "MANTENIMIENTO",
+                    "description": description,
+                    "assigned_to": maintenance_id,
+                    "priority": Priority.MEDIUM,
+                    "tipo": "Mantenimiento Equipo"
+                })
+        except Exception as e:
+            print(f"Error checking Maintenance gap: {e}")
+        
+        # GAP 6: Evaluaciones de riesgo pendientes
+        try:
+            for ris in self.db.execute(RIESGO_GAP_QUERY).fetchall():
+                key = dedup_key("riesgo", ris.id_evaluacion)
+                if batch.has_open_task(key, coord_id, ris.Descripcion):
+                    continue
+                description = f"Ejecutar evaluación de riesgo: {ris.Descripcion} (vencida)"
+                batch.plan_task(key, coord_id, description, 10, 'Alta', 'Evaluación Riesgo', 'form_evaluacion_riesgo')
+                actions.append({
+                    "action": AgentAction.CREATE_TASK,
+                    "gap_type": "RIESGO",
+                    "description": description,
+                    "assigned_to": coord_id,
+                    "priority": Priority.HIGH,
+                    "tipo": "Evaluación de Riesgo"
+                })
+        except Exception:
+            # Table might not exist yet if script wasn't run
+            pass
+        
+        # GAP 7: Reunión mensual del Comité de Convivencia
+        try:
+            if self.db.execute(CONVIVENCIA_MONTH_QUERY).scalar() == 0:
+                pres_id = batch.holder('Presidente Comité Convivencia') or coord_id
+                key = dedup_key("reunion_comite", "Convivencia", month)
+                if not batch.has_open_task(key, pres_id, "reunión mensual del Comité de Convivencia"):
+                    description = f"Programar reunión mensual del Comité de Convivencia - {datetime.now().strftime('%B %Y')}"
+                    batch.plan_task(key, pres_id, description, 5, 'Crítica', 'Comité', 'form_acta_reunion')
+                    actions.append({
+                        "action": AgentAction.CREATE_TASK,
+                        "gap_type": "CONVIVENCIA",
+                        "description": description,
+                        "assigned_to": pres_id,
+                        "priority": Priority.CRITICAL,
+                        "tipo": "Reunión Comité Convivencia"
+                    })
+        except Exception as e:
+            print(f"Error checking Convivencia gap: {e}")
+        
+        return actions
+
+
 class PlanningAgent:
     """
     Agente que crea planes automáticamente basado en:
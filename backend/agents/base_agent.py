@@ -5,11 +5,13 @@ This module provides the abstract base class for all specialized agents.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime
 import logging
 from enum import Enum
 
+from agents.events import emit, streaming, TOKEN
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,12 +81,15 @@ class BaseAgent(ABC):
         description: str,
         model: str = "gpt-4",
         temperature: float = 0.7,
-        max_iterations: int = 10
+        max_iterations: int = 10,
+        cache_responses: bool = False
     ):
         self.name = name
         self.description = description
         self.model = model
         self.temperature = temperature
+        # Reuse cached answers for identical prompts even at temperature > 0
+        self.cache_responses = cache_responses
         self.max_iterations = max_iterations
         self.status = AgentStatus.IDLE
         self.logger = logging.getLogger(f"agent.{name}")
@@ -122,6 +127,15 @@ class BaseAgent(ABC):
         """
         return []
     
+    @staticmethod
+    def _chat_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Keep only what the chat completions API accepts from context messages"""
+        return [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in messages
+            if msg["role"] in ("system", "user", "assistant")
+        ]
+    
     async def _call_llm(
         self,
         messages: List[Dict[str, str]],
@@ -137,46 +151,35 @@ class BaseAgent(ABC):
         Returns:
             LLM response
         """
-        from langchain.chat_models import ChatOpenAI
-        from langchain.schema import HumanMessage, SystemMessage, AIMessage
-        from api.config import get_settings
+        from agents.llm_client import get_llm_manager
         
-        settings = get_settings()
-        if not settings.openai.api_key:
-            # Fallback to env var if not in settings yet (during startup)
-            import os
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                return {
-                    "content": "Error: OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file.",
-                    "role": "assistant"
-                }
-        else:
-            api_key = settings.openai.api_key
+        manager = get_llm_manager()
+        if not manager.api_key:
+            return {
+                "content": "Error: OpenAI API key not configured. Please add OPENAI_API_KEY to your .env file.",
+                "role": "assistant"
+            }
 
         try:
-            chat = ChatOpenAI(
-                openai_api_key=api_key,
-                model_name=self.model,
-                temperature=self.temperature
-            )
-            
-            # Convert dict messages to LangChain schema
-            lc_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    lc_messages.append(SystemMessage(content=msg["content"]))
-                elif msg["role"] == "user":
-                    lc_messages.append(HumanMessage(content=msg["content"]))
-                elif msg["role"] == "assistant":
-                    lc_messages.append(AIMessage(content=msg["content"]))
-            
-            # Call LLM
-            # Note: Tools support would go here using bind_functions or similar
-            response = await chat.apredict_messages(lc_messages)
+            if streaming():
+                # Forward tokens to the run's event stream as they arrive
+                parts = []
+                async for delta in self._stream_llm(messages):
+                    parts.append(delta)
+                    await emit(TOKEN, content=delta)
+                content = "".join(parts)
+            else:
+                # Note: Tools support would go here (the "tools" request field)
+                response = await manager.complete(
+                    self._chat_messages(messages),
+                    model=self.model,
+                    temperature=self.temperature,
+                    cache=self.cache_responses
+                )
+                content = response["choices"][0]["message"].get("content") or ""
             
             return {
-                "content": response.content,
+                "content": content,
                 "role": "assistant",
                 "function_call": None # Placeholder for tool calls
             }
@@ -188,6 +191,26 @@ class BaseAgent(ABC):
                 "role": "assistant"
             }
     
+    async def _stream_llm(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream the LLM answer token by token.
+        
+        Args:
+            messages: List of conversation messages
+        
+        Yields:
+            Content deltas as the provider sends them
+        """
+        from agents.llm_client import get_llm_manager
+        
+        async for delta in get_llm_manager().stream(
+            self._chat_messages(messages),
+            model=self.model,
+            temperature=self.temperature,
+            cache=self.cache_responses
+        ):
+            yield delta
+    
     def _log_execution(self, task: str, result: Dict[str, Any], duration: float):
         """Log agent execution for audit trail"""
         self.logger.info(
@@ -29,7 +29,8 @@ class DocumentAgent(BaseAgent):
             name="document_agent",
             description="Specialized agent for document processing and compliance verification",
             model="gpt-4",
-            temperature=0.4
+            temperature=0.4,
+            cache_responses=True  # Summaries of the same document are reused
         )
     
     def get_system_prompt(self) -> str:
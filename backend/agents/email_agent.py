@@ -31,7 +31,8 @@ class EmailAgent(BaseAgent):
             name="email_agent",
             description="Specialized agent for email communication and notifications",
             model="gpt-4",
-            temperature=0.6  # Slightly higher for more natural language
+            temperature=0.6,  # Slightly higher for more natural language
+            cache_responses=True  # Notification templates repeat with the same data
         )
         self.tools = EmailTools()
         self.query_tools = QueryTools()
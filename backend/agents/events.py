@@ -0,0 +1,96 @@
+"""
+Agent Run Events
+Progress events (routing, tool calls, LLM tokens, result) published while
+an agent runs, for streaming endpoints.
+
+The stream of the current run lives in a context variable, so tools and
+``BaseAgent`` publish with ``emit()`` without it being passed around.
+When no stream is active ``emit()`` does nothing.
+
+Any object with ``publish(event, **data)`` can be bound. Only sinks that
+set ``streams_tokens`` make ``streaming()`` true, so a progress sink
+(background jobs) keeps LLM calls on the non-streaming path.
+"""
+
+from contextvars import ContextVar, Token
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import time
+
+ROUTING = "routing"
+AGENT_START = "agent_start"
+TOOL_START = "tool_start"
+TOOL_END = "tool_end"
+TOKEN = "token"
+RESULT = "result"
+ERROR = "error"
+
+_current_stream: ContextVar[Optional[Any]] = ContextVar("agent_event_stream", default=None)
+
+
+class AgentEventStream:
+    """
+    Bounded queue of events for one run.
+
+    Publishers wait when the consumer falls behind, so a slow client
+    holds back the run instead of growing a buffer on the server.
+    """
+
+    _CLOSED = object()
+    streams_tokens = True
+
+    def __init__(self, max_pending: int = 256):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.started = time.monotonic()
+        self.closed = False
+
+    async def publish(self, event: str, **data):
+        data["event"] = event
+        data["elapsed_ms"] = round((time.monotonic() - self.started) * 1000.0, 1)
+        await self._queue.put(data)
+
+    def close(self):
+        """Mark the end of the run; never blocks, even if nobody is reading."""
+        self.closed = True
+        try:
+            self._queue.put_nowait(self._CLOSED)
+        except asyncio.QueueFull:
+            pass  # the reader sees ``closed`` once it drains the queue
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            if self.closed and self._queue.empty():
+                return
+            item = await self._queue.get()
+            if item is self._CLOSED:
+                return
+            yield item
+
+    def activate(self) -> Token:
+        """Make this the stream of the current context (and of tasks created from it)."""
+        return bind_stream(self)
+
+
+def bind_stream(stream) -> Token:
+    """Route ``emit()`` in the current context to ``stream.publish``."""
+    return _current_stream.set(stream)
+
+
+def json_default(value: Any) -> Any:
+    """orjson fallback for event and result payloads."""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def streaming() -> bool:
+    """Whether the current run streams LLM tokens to a client."""
+    return getattr(_current_stream.get(), "streams_tokens", False)
+
+
+async def emit(event: str, **data):
+    """Publish an event to the current run's stream, if any."""
+    stream = _current_stream.get()
+    if stream is not None:
+        await stream.publish(event, **data)
@@ -0,0 +1,199 @@
+"""
+LLM Response Cache
+
+Content-addressed cache of chat completions: a bounded in-memory LRU
+with optional TTL, backed by an optional SQLite file that survives
+restarts. Keys fingerprint the model, temperature, system prompt and
+conversation, so only byte-identical requests share an answer.
+"""
+
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def completion_key(
+    model: str,
+    temperature: Optional[float],
+    messages: List[Dict[str, Any]],
+    extra: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Fingerprint of a chat completion request.
+
+    The system prompt and the rest of the conversation are hashed
+    separately; other request fields that change the answer (max_tokens,
+    tools, ...) are part of the key too.
+    """
+    system = "\n".join(str(m.get("content") or "") for m in messages if m.get("role") == "system")
+    conversation = [(m.get("role"), m.get("content")) for m in messages if m.get("role") != "system"]
+    parts = [
+        model,
+        "default" if temperature is None else repr(float(temperature)),
+        _sha256(system.encode("utf-8")),
+        _sha256(orjson.dumps(conversation)),
+        _sha256(orjson.dumps(extra or {}, option=orjson.OPT_SORT_KEYS, default=str)),
+    ]
+    return _sha256("\0".join(parts).encode("utf-8"))
+
+
+class SQLiteCompletionStore:
+    """Persistent completion tier stored in a single SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " response BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        min_created = time.time() - max_age if max_age else 0.0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM completions WHERE key = ? AND created_at >= ?", (key, min_created)
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created_at) VALUES (?, ?, ?)",
+                (key, orjson.dumps(response), time.time())
+            )
+            self._conn.commit()
+
+    def purge_expired(self, max_age: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM completions WHERE created_at < ?", (time.time() - max_age,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    """
+    Thread-safe LRU completion cache with optional TTL and disk tier.
+
+    Memory misses fall through to the disk tier; disk hits are promoted
+    back into memory. ``tokens_saved`` adds up the ``usage`` of every
+    response served from the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = SQLiteCompletionStore(disk_path) if disk_path else None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.tokens_saved = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response for a key, counting the hit or miss"""
+        response = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl_seconds and time.monotonic() - entry[1] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    response = entry[0]
+
+        if response is None and self.disk is not None:
+            response = self.disk.get(key, max_age=self.ttl_seconds)
+            if response is not None:
+                self._store(key, response)
+                self.disk_hits += 1
+
+        if response is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.tokens_saved += (response.get("usage") or {}).get("total_tokens") or 0
+        return response
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """Add a response to memory and, when configured, to disk"""
+        self._store(key, response)
+        if self.disk is not None:
+            self.disk.put(key, response)
+
+    def _store(self, key: str, response: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (response, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, include_disk: bool = False):
+        with self._lock:
+            self._entries.clear()
+        if include_disk and self.disk is not None:
+            self.disk.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "tokens_saved": self.tokens_saved,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "disk_path": str(self.disk.path) if self.disk is not None else None
+        }
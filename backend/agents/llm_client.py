@@ -0,0 +1,378 @@
+"""
+LLM Client Manager
+Shared client for OpenAI-compatible chat completion APIs, used by every
+agent instead of building a new LangChain client per call.
+
+    - One keep-alive ``httpx.AsyncClient`` per event loop
+    - A concurrency semaphore per model
+    - Token-bucket limits on requests and (estimated) tokens per minute
+    - Retries with full-jitter exponential backoff on 429, 5xx and
+      connection errors, honouring ``Retry-After``
+    - ``stream()`` yields content deltas as they arrive (SSE)
+    - An optional response cache (``LLMResponseCache``), used only for
+      temperature 0 requests or when the caller passes ``cache=True``
+
+``base_url`` can point at any OpenAI-compatible server, including a
+local fake one in tests.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import random
+import time
+
+import httpx
+import orjson
+
+from agents.llm_cache import LLMResponseCache, completion_key
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+DEFAULT_MAX_TOKENS_ESTIMATE = 512
+
+
+class LLMError(Exception):
+    """The provider rejected the request, or retries were exhausted."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Reservation-style token bucket refilled at ``per_minute / 60`` per second.
+
+    ``reserve`` takes the tokens immediately (the balance may go negative)
+    and returns how long the caller must wait, so concurrent callers are
+    spaced out without a lock. Holds up to ten seconds' worth of burst.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """Rough prompt + completion size (4 characters per token) for the TPM bucket."""
+    prompt = sum(len(str(message.get("content") or "")) for message in messages) // 4
+    return prompt + (max_tokens or DEFAULT_MAX_TOKENS_ESTIMATE)
+
+
+class LLMClientManager:
+    """Pooled, rate-limited access to a chat completions endpoint."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = "",
+        default_model: str = "gpt-4",
+        timeout: float = 60.0,
+        max_connections: int = 20,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 4,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 20.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.default_model = default_model
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.transport = transport
+        self.cache = cache
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._semaphores: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.throttled_seconds = 0.0
+
+    # ============================================
+    # Pools and limits
+    # ============================================
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+            self._clients[loop] = client
+        return client
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        key = (asyncio.get_running_loop(), model)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores.setdefault(key, asyncio.Semaphore(self.max_concurrency))
+        return semaphore
+
+    async def _throttle(self, model: str, payload: Dict[str, Any]):
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            buckets = (
+                TokenBucket(self.requests_per_minute) if self.requests_per_minute > 0 else None,
+                TokenBucket(self.tokens_per_minute) if self.tokens_per_minute > 0 else None,
+            )
+            self._buckets[model] = buckets
+        requests_bucket, tokens_bucket = buckets
+        delay = 0.0
+        if requests_bucket is not None:
+            delay = max(delay, requests_bucket.reserve())
+        if tokens_bucket is not None:
+            delay = max(delay, tokens_bucket.reserve(estimate_tokens(payload["messages"], payload.get("max_tokens"))))
+        if delay > 0:
+            self.throttled_seconds += delay
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    # ============================================
+    # Requests
+    # ============================================
+
+    def _payload(self, messages, model, temperature, stream, extra) -> Dict[str, Any]:
+        payload = {"model": model, "messages": messages, "stream": stream, **extra}
+        if temperature is not None:
+            payload["temperature"] = temperature
+        return payload
+
+    def _cache_key(self, cache: bool, model, temperature, messages, extra) -> Optional[str]:
+        """Cache key when this request may be served from the cache, else None."""
+        if self.cache is None or not (cache or temperature == 0):
+            return None
+        return completion_key(model, temperature, messages, extra)
+
+    @staticmethod
+    def _check(response: httpx.Response):
+        if response.status_code < 400:
+            return
+        message = f"LLM error {response.status_code}: {response.text[:500]}"
+        if response.status_code in RETRY_STATUSES:
+            retry_after = response.headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            raise _RetryableError(message, response.status_code, retry_after)
+        raise LLMError(message, response.status_code)
+
+    async def _retry_or_raise(self, error: Exception, attempt: int, model: str):
+        status_code = getattr(error, "status_code", None)
+        if attempt >= self.max_retries:
+            self.failures += 1
+            raise LLMError(f"{error} (after {attempt + 1} attempts)", status_code) from error
+        self.retries += 1
+        delay = self._backoff(attempt, getattr(error, "retry_after", None))
+        logger.warning(f"LLM call to {model} failed ({error}); retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        cache: bool = False,
+        **extra
+    ) -> Dict[str, Any]:
+        """
+        Run a chat completion and return the provider's JSON response.
+
+        Args:
+            messages: Chat messages ({"role", "content"})
+            model: Model name; the configured default when omitted
+            temperature: Sampling temperature
+            cache: Allow a cached answer even when temperature is not 0
+            **extra: Other request fields (max_tokens, tools, ...)
+
+        Returns:
+            The chat completion response body
+        """
+        model = model or self.default_model
+        key = self._cache_key(cache, model, temperature, messages, extra)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        payload = self._payload(messages, model, temperature, False, extra)
+        attempt = 0
+        while True:
+            await self._throttle(model, payload)
+            try:
+                async with self._semaphore(model):
+                    self.requests += 1
+                    response = await self._client().post("/chat/completions", json=payload)
+                self._check(response)
+                body = response.json()
+                if key is not None:
+                    self.cache.put(key, body)
+                return body
+            except (_RetryableError, httpx.TransportError) as e:
+                await self._retry_or_raise(e, attempt, model)
+                attempt += 1
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        cache: bool = False,
+        **extra
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        Failures before the first delta are retried like ``complete``;
+        once text has been yielded an error is raised to the caller.
+        A cached answer is yielded as a single delta.
+        """
+        model = model or self.default_model
+        key = self._cache_key(cache, model, temperature, messages, extra)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                content = cached["choices"][0]["message"].get("content")
+                if content:
+                    yield content
+                return
+
+        payload = self._payload(messages, model, temperature, True, extra)
+        attempt = 0
+        while True:
+            await self._throttle(model, payload)
+            emitted = False
+            parts: List[str] = []
+            try:
+                async with self._semaphore(model):
+                    self.requests += 1
+                    async with self._client().stream("POST", "/chat/completions", json=payload) as response:
+                        if response.status_code >= 400:
+                            await response.aread()
+                            self._check(response)
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == "[DONE]":
+                                break
+                            choices = orjson.loads(data).get("choices") or [{}]
+                            content = (choices[0].get("delta") or {}).get("content")
+                            if content:
+                                emitted = True
+                                parts.append(content)
+                                yield content
+                if key is not None:
+                    self.cache.put(key, {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]})
+                return
+            except (_RetryableError, httpx.TransportError) as e:
+                if emitted:
+                    self.failures += 1
+                    raise LLMError(f"LLM stream interrupted: {e}", getattr(e, "status_code", None)) from e
+                await self._retry_or_raise(e, attempt, model)
+                attempt += 1
+
+    async def close(self):
+        """Close the client of the running loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+        }
+
+
+_manager: Optional[LLMClientManager] = None
+
+
+def get_llm_manager() -> LLMClientManager:
+    """Process-wide manager built from the [openai] settings."""
+    global _manager
+    if _manager is None:
+        from api.config import get_settings
+
+        config = get_settings().openai
+        _manager = LLMClientManager(
+            base_url=config.base_url,
+            api_key=config.api_key or os.getenv("OPENAI_API_KEY", ""),
+            default_model=config.model,
+            timeout=config.timeout,
+            max_connections=config.max_connections,
+            max_concurrency=config.max_concurrency,
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_retries=config.max_retries,
+            retry_base_delay=config.retry_base_delay,
+            retry_max_delay=config.retry_max_delay,
+            cache=LLMResponseCache(
+                max_entries=config.cache_max_entries,
+                ttl_seconds=config.cache_ttl_seconds or None,
+                disk_path=config.cache_path or None
+            ) if config.cache_enabled else None,
+        )
+    return _manager
+
+
+async def close_llm_clients():
+    """Close the shared LLM client (call on shutdown)."""
+    if _manager is not None:
+        await _manager.close()
@@ -29,7 +29,8 @@ class RiskAgent(BaseAgent):
             name="risk_agent",
             description="Specialized agent for occupational risk assessment and management",
             model="gpt-4",
-            temperature=0.3  # Lower temperature for more consistent risk assessments
+            temperature=0.3,  # Lower temperature for more consistent risk assessments
+            cache_responses=True
         )
     
     def get_system_prompt(self) -> str:
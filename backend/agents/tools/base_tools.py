@@ -7,10 +7,13 @@ Provides common functionality for all agent tools to interact with:
 - Database direct access (optional)
 """
 
-import httpx
 from typing import Dict, Any, List, Optional
 from datetime import date, datetime
 import logging
+import time
+
+from agents.events import emit, TOOL_START, TOOL_END
+from .transport import ToolTransport, get_default_transport
 
 logger = logging.getLogger(__name__)
 
@@ -27,15 +30,22 @@ class BaseTool:
     
     def __init__(
         self,
-        api_base_url: str = "http://localhost:8000",
-        auth_token: Optional[str] = None
+        api_base_url: Optional[str] = None,
+        auth_token: Optional[str] = None,
+        transport: Optional[ToolTransport] = None
     ):
+        if api_base_url is None:
+            from api.config import get_settings
+            api_base_url = get_settings().agents.tool_api_base_url
         self.api_base_url = api_base_url.rstrip('/')
         self.auth_token = auth_token
         self.headers = {}
         
         if auth_token:
             self.headers["Authorization"] = f"Bearer {auth_token}"
+        
+        # In-process by default; see agents/tools/transport.py
+        self.transport = transport or get_default_transport(self.api_base_url, self.headers)
     
     async def _make_request(
         self,
@@ -44,34 +54,36 @@ class BaseTool:
         **kwargs
     ) -> Dict[str, Any]:
         """
-        Make HTTP request to backend API.
+        Make a request to the backend API through the tool transport.
         
         Args:
             method: HTTP method (GET, POST, PUT, DELETE)
-            endpoint: API endpoint (will be appended to base_url)
-            **kwargs: Additional arguments for httpx request
+            endpoint: API endpoint path, e.g. /api/v1/crud/EMPLEADO
+            **kwargs: params (query string) and json (body)
         
         Returns:
             Response JSON as dictionary
         """
-        url = f"{self.api_base_url}{endpoint}"
-        
+        await emit(TOOL_START, tool=type(self).__name__, method=method, endpoint=endpoint)
+        started = time.monotonic()
+        ok = False
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=self.headers,
-                    **kwargs
-                )
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise Exception(f"API error: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Request error: {e}")
-            raise
+            response = await self.transport.request(
+                method,
+                endpoint,
+                params=kwargs.get("params"),
+                json=kwargs.get("json")
+            )
+            ok = True
+            return response
+        finally:
+            await emit(
+                TOOL_END,
+                tool=type(self).__name__,
+                endpoint=endpoint,
+                ok=ok,
+                duration_ms=round((time.monotonic() - started) * 1000.0, 1)
+            )
     
     # ============================================
     # Stored Procedure Methods
@@ -91,7 +103,8 @@ class BaseTool:
         """Call SP_Generar_Tareas_Vigencia"""
         return await self._make_request(
             "POST",
-            f"/api/v1/procedures/generate-tasks-expiration?id_coordinador_sst={coordinator_id}"
+            "/api/v1/procedures/generate-tasks-expiration",
+            params={"id_coordinador_sst": coordinator_id}
         )
     
     async def call_sp_accident_indicators(
@@ -100,10 +113,12 @@ class BaseTool:
         period: Optional[str] = None
     ) -> Dict[str, Any]:
         """Call SP_Calcular_Indicadores_Siniestralidad"""
-        endpoint = f"/api/v1/procedures/accident-indicators/{year}"
-        if period:
-            endpoint += f"?periodo={period}"
-        return await self._make_request("GET", endpoint)
+        params = {"periodo": period} if period else None
+        return await self._make_request(
+            "GET",
+            f"/api/v1/procedures/accident-indicators/{year}",
+            params=params
+        )
     
     async def call_sp_work_plan_compliance(
         self,
@@ -1,31 +1,69 @@
 import logging
 import re
+import time
 from typing import List, Dict, Any, Optional
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from api.models import engine
 from data.schema_context import SCHEMA_CONTEXT
-from prompts.sql_prompts import SQL_PROMPT
-from langchain.chat_models import ChatOpenAI
-from api.config import get_settings
+from prompts.sql_prompts import SQL_GENERATION_TEMPLATE
+from agents.events import emit, streaming, TOOL_START, TOOL_END, TOKEN
+from agents.llm_client import LLMClientManager, get_llm_manager
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 class QueryTools:
     """
     Tools for executing natural language queries against the database.
     Includes security validation to prevent destructive operations.
+    
+    SQL is generated through the shared ``LLMClientManager`` at
+    temperature 0, so repeated questions are served from its cache.
     """
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            openai_api_key=settings.openai.api_key,
-            model_name=settings.openai.model,
-            temperature=0
-        )
+    def __init__(self, llm: Optional[LLMClientManager] = None):
+        # None: the process-wide manager, resolved on first use
+        self._llm = llm
+    
+    @property
+    def llm(self) -> LLMClientManager:
+        return self._llm or get_llm_manager()
+    
+    async def _generate_sql(self, question: str) -> str:
+        """
+        Ask the LLM for a T-SQL query answering the question.
+        
+        On a streamed run the query is forwarded as ``token`` events
+        (tagged with ``tool``) while it is generated.
+        """
+        messages = [
+            {"role": "system", "content": SCHEMA_CONTEXT},
+            {"role": "user", "content": SQL_GENERATION_TEMPLATE.format(question=question)},
+        ]
+        if streaming():
+            parts = []
+            async for delta in self.llm.stream(messages, temperature=0):
+                parts.append(delta)
+                await emit(TOKEN, tool=type(self).__name__, content=delta)
+            return "".join(parts)
+        
+        response = await self.llm.complete(messages, temperature=0)
+        return response["choices"][0]["message"].get("content") or ""
     
     async def query_database(self, question: str) -> Dict[str, Any]:
+        """Run ``_query_database`` and report it on the run's event stream."""
+        await emit(TOOL_START, tool=type(self).__name__, method="SQL", endpoint="query_database")
+        started = time.monotonic()
+        result = await self._query_database(question)
+        await emit(
+            TOOL_END,
+            tool=type(self).__name__,
+            endpoint="query_database",
+            ok=result["success"],
+            duration_ms=round((time.monotonic() - started) * 1000.0, 1)
+        )
+        return result
+    
+    async def _query_database(self, question: str) -> Dict[str, Any]:
         """
         Translates a natural language question into SQL and executes it.
         
@@ -37,8 +75,7 @@ class QueryTools:
         """
         try:
             # 1. Generate SQL
-            prompt = SQL_PROMPT.format(schema_context=SCHEMA_CONTEXT, question=question)
-            response = self.llm.predict(prompt)
+            response = await self._generate_sql(question)
             sql_query = response.strip().replace("```sql", "").replace("```", "")
             
             # 2. Validate SQL (Security Check)
@@ -59,7 +96,9 @@ class QueryTools:
             # 3. Execute SQL
             logger.info(f"Executing generated SQL: {sql_query}")
             
-            with Session(engine) as db:
+            from api.database.engines import get_engine, AGENT
+            
+            with Session(get_engine(AGENT)) as db:
                 result = db.execute(text(sql_query))
                 
                 # Get column names
@@ -0,0 +1,372 @@
+"""
+Tool Transports
+
+How agent tools reach the stored-procedure and CRUD endpoints:
+
+    inprocess  Call the router functions directly, on a session from the
+               agent connection pool. No HTTP or routing per call; the
+               routes' authentication dependencies still run against
+               the tool's bearer token (see ``InProcessTransport``).
+    http       Send requests to a (remote) API through a long-lived,
+               keep-alive ``httpx.AsyncClient`` shared by all tools.
+
+Both return the JSON body the HTTP API would return and raise
+``Exception("API error: ...")`` for error responses.
+"""
+
+from typing import Annotated, Any, Dict, List, Optional, Tuple, get_args, get_origin
+from urllib.parse import parse_qsl, urlsplit
+import asyncio
+import inspect
+import logging
+
+import httpx
+import orjson
+
+logger = logging.getLogger(__name__)
+
+INPROCESS = "inprocess"
+HTTP = "http"
+
+# Dependencies the in-process transport replaces with an agent-pool session
+SESSION_DEPENDENCIES = {"get_db", "get_async_db"}
+# Dependencies resolved from the caller's token (api/dependencies.py)
+AUTH_DEPENDENCIES = {"get_current_principal", "get_current_user", "get_current_active_user"}
+
+# Routes a tool may call in-process without a user token, as
+# (router, method, path). All are read-only.
+ANONYMOUS_READ_ROUTES = {
+    ("procedures", "GET", "/accident-indicators/{year}"),
+    ("procedures", "GET", "/work-plan-compliance"),
+    ("procedures", "GET", "/medical-exam-compliance"),
+    ("procedures", "GET", "/executive-report"),
+    ("procedures", "GET", "/pending-alerts"),
+    ("procedures", "GET", "/agent-context"),
+    ("procedures", "GET", "/regulatory-compliance"),
+    ("crud", "GET", "/{table_name}"),
+    ("crud", "GET", "/{table_name}/{record_id}"),
+    ("crud", "POST", "/{table_name}/search"),
+}
+# Tables those anonymous CRUD reads may touch (never user accounts)
+ANONYMOUS_READ_TABLES = {
+    "CAPACITACION", "DOCUMENTO", "EMPLEADO", "EVALUACION_LEGAL", "INCIDENTE",
+    "MATRIZ_RIESGO", "PELIGRO", "PLANTILLA_DOCUMENTO", "REQUISITO_LEGAL", "TAREA",
+}
+
+NOT_AUTHENTICATED = orjson.dumps({"detail": "Not authenticated"}).decode()
+
+
+class ToolTransport:
+    """Interface implemented by the tool transports."""
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None
+    ) -> Any:
+        raise NotImplementedError
+
+
+# ============================================
+# HTTP transport
+# ============================================
+
+_clients: Dict[Tuple[asyncio.AbstractEventLoop, str], httpx.AsyncClient] = {}
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Shared client for ``base_url`` on the running event loop.
+
+    Connections are kept alive between tool calls; clients are per loop
+    because httpx connections cannot move between event loops.
+    """
+    from api.config import get_settings
+
+    loop = asyncio.get_running_loop()
+    key = (loop, base_url)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        config = get_settings().agents
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=config.tool_http_timeout,
+            limits=httpx.Limits(
+                max_connections=config.tool_http_max_connections,
+                max_keepalive_connections=config.tool_http_max_keepalive,
+            ),
+        )
+        _clients[key] = client
+    return client
+
+
+async def close_http_clients():
+    """Close the shared clients of the running loop (call on shutdown)."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _clients if key[0] is loop]:
+        await _clients.pop(key).aclose()
+
+
+class HttpTransport(ToolTransport):
+    """Requests to the API over HTTP on a pooled keep-alive client."""
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers or {}
+
+    async def request(self, method, endpoint, params=None, json=None):
+        try:
+            response = await get_http_client(self.base_url).request(
+                method,
+                endpoint,
+                headers=self.headers,
+                params=params,
+                json=json
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
+            raise Exception(f"API error: {e.response.text}")
+        except Exception as e:
+            logger.error(f"Request error: {e}")
+            raise
+
+
+# ============================================
+# In-process transport
+# ============================================
+
+class _Route:
+    """A router endpoint and how to bind each of its parameters."""
+
+    def __init__(self, method: str, route, prefix: str):
+        self.method = method
+        self.prefix = prefix
+        self.key = (prefix.rsplit("/", 1)[-1], method, route.path)
+        self.path_regex = route.path_regex
+        self.endpoint = route.endpoint
+        self.is_async = asyncio.iscoroutinefunction(route.endpoint)
+        self.params = [self._bind(name, param) for name, param in inspect.signature(route.endpoint).parameters.items()]
+        self.session_names = [name for name, kind, _, _ in self.params if kind == "session"]
+        self.auth = [(name, dependency) for name, kind, dependency, _ in self.params if kind == "auth"]
+
+    def _bind(self, name: str, param: inspect.Parameter):
+        from fastapi import params as fastapi_params
+        from pydantic import TypeAdapter
+        from pydantic_core import PydanticUndefined
+
+        annotation = param.annotation
+        default = param.default
+        if isinstance(default, fastapi_params.Depends):
+            if getattr(default.dependency, "__name__", None) in SESSION_DEPENDENCIES:
+                return name, "session", None, None
+            # Authentication (and role checks): resolved per call from the caller's token
+            return name, "auth", default.dependency, None
+
+        if isinstance(default, fastapi_params.Param):
+            default = default.default
+        if default is inspect.Parameter.empty or default is PydanticUndefined:
+            default = inspect.Parameter.empty
+
+        if annotation is inspect.Parameter.empty:
+            annotation = Any
+        adapter = TypeAdapter(annotation)
+        if f"(?P<{name}>" in self.path_regex.pattern:
+            return name, "path", adapter, default
+        if getattr(annotation, "__origin__", annotation) in (dict, list):
+            return name, "body", adapter, default
+        return name, "query", adapter, default
+
+    def bind(self, path_params: Dict[str, str], params: Dict[str, Any], body: Any) -> Dict[str, Any]:
+        arguments = {}
+        for name, kind, adapter, default in self.params:
+            if kind in ("session", "auth"):
+                arguments[name] = None
+                continue
+            if kind == "path":
+                value = path_params[name]
+            elif kind == "body":
+                value = body
+            else:
+                value = params.get(name, default)
+            if value is inspect.Parameter.empty or (value is None and default is inspect.Parameter.empty):
+                raise Exception(f"API error: {orjson.dumps({'detail': f'Missing parameter: {name}'}).decode()}")
+            arguments[name] = value if value is default else adapter.validate_python(value)
+        return arguments
+
+
+_route_table: Optional[List[_Route]] = None
+
+
+class InProcessTransport(ToolTransport):
+    """
+    Calls the procedures and CRUD router functions directly.
+
+    Sessions come from the agent engine's pool and are closed after each
+    call; synchronous handlers run on the ``db`` executor, so tool calls
+    never block the event loop.
+
+    Authentication is not skipped. With a bearer token in ``headers`` the
+    route's own dependencies (``get_current_active_user``, ``RoleChecker``,
+    ...) run against the token's principal. Without one, only
+    ``anonymous_routes`` over ``anonymous_tables`` can be called, and
+    anything else fails with the route's 401.
+    """
+
+    anonymous_routes = ANONYMOUS_READ_ROUTES
+    anonymous_tables = ANONYMOUS_READ_TABLES
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None):
+        self._routes: Optional[List[_Route]] = None
+        authorization = (headers or {}).get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        self.token = token if scheme.lower() == "bearer" and token else None
+
+    def _load_routes(self) -> List[_Route]:
+        global _route_table
+        if _route_table is None:
+            from api.config import get_settings
+            from api.routers import crud, procedures
+
+            api_prefix = get_settings().api.api_prefix
+            routes = []
+            for prefix, router in ((f"{api_prefix}/procedures", procedures.router), (f"{api_prefix}/crud", crud.router)):
+                for route in router.routes:
+                    for method in route.methods:
+                        routes.append(_Route(method, route, prefix))
+            _route_table = routes
+        return _route_table
+
+    def _check_anonymous(self, route: _Route, path_params: Dict[str, str]):
+        """Without a token, only allow-listed read-only routes and tables."""
+        table = path_params.get("table_name")
+        if route.key not in self.anonymous_routes or (table is not None and table not in self.anonymous_tables):
+            logger.warning(f"Tool call {route.method} {route.key[2]} ({table or '-'}) refused: no user token")
+            raise Exception(f"API error: {NOT_AUTHENTICATED}")
+
+    async def _principal(self):
+        """Principal of ``self.token``, validated like an HTTP request's."""
+        from sqlalchemy.orm import Session
+
+        from api.database import AsyncDBSession
+        from api.database.engines import get_engine, AGENT
+        from api.dependencies import get_current_principal
+
+        session = AsyncDBSession(Session(get_engine(AGENT), expire_on_commit=False))
+        try:
+            return await get_current_principal(self.token, session)
+        finally:
+            await session.close()
+
+    async def _resolve(self, dependency, principal) -> Any:
+        """
+        Run an authentication dependency for an already validated principal.
+
+        Its own ``Depends`` parameters are resolved the same way, down to
+        ``get_current_principal``, so every check in the chain still runs.
+        """
+        from fastapi import params as fastapi_params
+
+        if getattr(dependency, "__name__", None) == "get_current_principal":
+            return principal
+
+        arguments = {}
+        for name, param in inspect.signature(dependency).parameters.items():
+            marker = param.default
+            if get_origin(param.annotation) is Annotated:
+                marker = next((arg for arg in get_args(param.annotation) if isinstance(arg, fastapi_params.Depends)), marker)
+            if not isinstance(marker, fastapi_params.Depends):
+                detail = f"Unsupported dependency parameter: {name}"
+                raise Exception(f"API error: {orjson.dumps({'detail': detail}).decode()}")
+            arguments[name] = await self._resolve(marker.dependency, principal)
+
+        result = dependency(**arguments)
+        return await result if inspect.isawaitable(result) else result
+
+    async def _authenticate(self, route: _Route, path_params: Dict[str, str], arguments: Dict[str, Any]):
+        if not route.auth:
+            return
+        if self.token is None:
+            self._check_anonymous(route, path_params)
+            return
+        principal = await self._principal()
+        for name, dependency in route.auth:
+            arguments[name] = await self._resolve(dependency, principal)
+
+    def _match(self, method: str, path: str) -> Tuple[_Route, Dict[str, str]]:
+        if self._routes is None:
+            self._routes = self._load_routes()
+        for route in self._routes:
+            if route.method != method or not path.startswith(route.prefix):
+                continue
+            match = route.path_regex.match(path[len(route.prefix):])
+            if match:
+                return route, match.groupdict()
+        raise Exception(f"API error: {orjson.dumps({'detail': 'Not Found'}).decode()}")
+
+    async def _call_with_session(self, route: _Route, arguments: Dict[str, Any]) -> Any:
+        from sqlalchemy.orm import Session
+
+        from api.database import AsyncDBSession
+        from api.database.engines import get_engine, AGENT
+        from api.utils.executors import run_db
+
+        if route.is_async:
+            session = AsyncDBSession(Session(get_engine(AGENT), expire_on_commit=False))
+            try:
+                arguments.update((name, session) for name in route.session_names)
+                return await route.endpoint(**arguments)
+            finally:
+                await session.close()
+
+        def call():
+            with Session(get_engine(AGENT)) as session:
+                arguments.update((name, session) for name in route.session_names)
+                return route.endpoint(**arguments)
+
+        return await run_db(call)
+
+    async def request(self, method, endpoint, params=None, json=None):
+        from fastapi import HTTPException
+        from fastapi.encoders import jsonable_encoder
+        from fastapi.responses import Response
+
+        url = urlsplit(endpoint)
+        query = dict(parse_qsl(url.query))
+        query.update(params or {})
+        route, path_params = self._match(method.upper(), url.path)
+        arguments = route.bind(path_params, query, json)
+
+        try:
+            await self._authenticate(route, path_params, arguments)
+            if route.session_names:
+                result = await self._call_with_session(route, arguments)
+            else:
+                result = route.endpoint(**arguments)
+                if route.is_async:
+                    result = await result
+        except HTTPException as e:
+            detail = orjson.dumps({"detail": e.detail}, default=str).decode()
+            logger.error(f"Tool call error {e.status_code}: {detail}")
+            raise Exception(f"API error: {detail}")
+
+        if isinstance(result, Response):
+            return orjson.loads(result.body)
+        return jsonable_encoder(result)
+
+
+_inprocess_transport = InProcessTransport()
+
+
+def get_default_transport(api_base_url: str, headers: Optional[Dict[str, str]] = None) -> ToolTransport:
+    """Transport selected by ``[agents] tool_transport`` in config.toml."""
+    from api.config import get_settings
+
+    if get_settings().agents.tool_transport == HTTP:
+        return HttpTransport(api_base_url, headers)
+    if headers and "Authorization" in headers:
+        return InProcessTransport(headers)
+    return _inprocess_transport
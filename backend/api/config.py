@@ -6,7 +6,7 @@ Loads settings from config.toml file.
 import os
 import tomli
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -36,6 +36,15 @@ class ServerConfig(BaseModel):
     reload: bool = False
 
 
+class PoolConfig(BaseModel):
+    """Connection pool settings for one workload class."""
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 3600
+    pool_pre_ping: bool = False
+
+
 class DatabaseConfig(BaseModel):
     """Database configuration."""
     driver: str = "ODBC Driver 17 for SQL Server"
@@ -49,6 +58,11 @@ class DatabaseConfig(BaseModel):
     max_overflow: int = 10
     pool_timeout: int = 30
     pool_recycle: int = 3600
+    schema_cache_path: str = "data/schema_cache.pkl"  # Empty to always reflect
+    schema_cache_revalidate: bool = True
+    reflect_all_tables: bool = False
+    extra_reflect_tables: List[str] = []
+    pools: Dict[str, PoolConfig] = {}  # Per-workload overrides: oltp, agent, reporting
 
     @property
     def connection_string(self) -> str:
@@ -90,6 +104,8 @@ class SecurityConfig(BaseModel):
     require_lowercase: bool = True
     require_numbers: bool = True
     require_special_chars: bool = True
+    principal_cache_ttl: int = 60  # Seconds an authenticated user is reused without a DB lookup
+    principal_cache_size: int = 1000
 
 
 class CORSConfig(BaseModel):
@@ -198,6 +214,35 @@ class OpenAIConfig(BaseModel):
     api_key: str = ""
     model: str = "gpt-4"
     temperature: float = 0.7
+    base_url: str = "https://api.openai.com/v1"  # Any OpenAI-compatible endpoint
+    timeout: float = 60.0
+    max_connections: int = 20
+    max_concurrency: int = 8  # In-flight requests per model
+    requests_per_minute: int = 500  # Per model; 0 disables the limit
+    tokens_per_minute: int = 0  # Estimated prompt + completion tokens; 0 disables
+    max_retries: int = 4
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 20.0
+    cache_enabled: bool = True  # Only temperature 0 or opted-in requests are cached
+    cache_max_entries: int = 1000
+    cache_ttl_seconds: int = 86400  # 0 keeps entries until evicted
+    cache_path: str = "data/llm_cache.db"  # Empty for memory only
+
+
+class AgentsConfig(BaseModel):
+    """Agent runtime configuration."""
+    tool_transport: str = "inprocess"  # inprocess or http
+    tool_api_base_url: str = "http://localhost:8000"  # Used by the http transport
+    tool_http_timeout: float = 30.0
+    tool_http_max_connections: int = 20
+    tool_http_max_keepalive: int = 10
+    job_store: str = "sqlite"  # sqlite or sqlserver (AGENT_JOB table)
+    job_store_path: str = "data/agent_jobs.db"
+    job_workers: int = 4
+    job_max_running_per_user: int = 2
+    job_max_queued_per_user: int = 20
+    job_heartbeat_seconds: float = 5.0
+    job_stale_seconds: float = 120.0  # Active jobs without a heartbeat this long are failed
 
 
 class Settings(BaseModel):
@@ -217,6 +262,7 @@ class Settings(BaseModel):
     cache: CacheConfig
     features: FeaturesConfig
     openai: OpenAIConfig
+    agents: AgentsConfig = AgentsConfig()
 
     @classmethod
     def load_from_toml(cls, config_path: Optional[str] = None) -> "Settings":
@@ -256,6 +302,7 @@ class Settings(BaseModel):
             cache=CacheConfig(**config_data.get("cache", {})),
             features=FeaturesConfig(**config_data.get("features", {})),
             openai=OpenAIConfig(**config_data.get("openai", {})),
+            agents=AgentsConfig(**config_data.get("agents", {})),
         )
 
 
@@ -8,6 +8,8 @@ from api.database.connection import (
     init_db,
     test_connection,
 )
+from api.database.engines import get_engine, get_pool_metrics, dispose_engines
+from api.database.async_session import AsyncDBSession, get_async_db
 
 __all__ = [
     "engine",
@@ -16,4 +18,9 @@ __all__ = [
     "get_db",
     "init_db",
     "test_connection",
+    "get_engine",
+    "get_pool_metrics",
+    "dispose_engines",
+    "AsyncDBSession",
+    "get_async_db",
 ]
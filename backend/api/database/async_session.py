@@ -0,0 +1,91 @@
+"""
+Async Database Sessions
+Thread-backed async facade over the synchronous SQLAlchemy Session, for
+``async def`` handlers on the pyodbc engine.
+"""
+
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+from typing import Any, AsyncGenerator, Callable, Optional, TypeVar
+import logging
+
+from api.database.engines import get_engine, OLTP
+from api.utils.executors import run_db
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncDBSession:
+    """
+    The subset of ``AsyncSession``'s API the routers use, backed by a
+    regular Session.
+
+    Every round-trip runs on the ``db`` executor, which is sized to the
+    OLTP pool: the event loop never blocks on pyodbc, and a worker runs
+    at most as many queries at once as it has connections. Requests
+    waiting for a slot hold no thread.
+
+    Row results are buffered before they return to the loop. Objects are
+    not expired on commit; never touch a lazy relationship from the loop,
+    load it in the statement or use ``run_sync``.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def execute(self, statement, params: Optional[dict] = None, **kwargs) -> Result:
+        """Execute a statement; row results come back fully buffered."""
+        def run():
+            result = self.sync_session.execute(statement, params, **kwargs)
+            if getattr(result, "returns_rows", True) is False:
+                return result
+            return result.freeze()
+
+        result = await run_db(run)
+        return result if isinstance(result, Result) else result()
+
+    async def scalars(self, statement, params: Optional[dict] = None, **kwargs):
+        return (await self.execute(statement, params, **kwargs)).scalars()
+
+    async def scalar(self, statement, params: Optional[dict] = None, **kwargs) -> Any:
+        return (await self.execute(statement, params, **kwargs)).scalar()
+
+    async def get(self, entity, ident) -> Any:
+        return await run_db(self.sync_session.get, entity, ident)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def commit(self):
+        await run_db(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_db(self.sync_session.rollback)
+
+    async def refresh(self, instance):
+        await run_db(self.sync_session.refresh, instance)
+
+    async def run_sync(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run ``func(session, *args, **kwargs)`` on the executor, for code written against Session."""
+        return await run_db(func, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_db(self.sync_session.close)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncDBSession, None]:
+    """
+    Dependency for ``async def`` handlers; the async counterpart of ``get_db``.
+
+    Usage in FastAPI:
+        @router.get("/items")
+        async def read_items(db: AsyncDBSession = Depends(get_async_db)):
+            return (await db.execute(select(Item))).scalars().all()
+    """
+    db = AsyncDBSession(Session(get_engine(OLTP), expire_on_commit=False))
+    try:
+        yield db
+    finally:
+        await db.close()
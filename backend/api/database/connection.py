@@ -2,28 +2,17 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 import logging
 
-from api.config import get_settings
+from api.database.engines import get_engine
 
 logger = logging.getLogger(__name__)
 
-# Get settings
-settings = get_settings()
-
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database.sqlalchemy_url,
-    pool_size=settings.database.pool_size,
-    max_overflow=settings.database.max_overflow,
-    pool_timeout=settings.database.pool_timeout,
-    pool_recycle=settings.database.pool_recycle,
-    echo=settings.app.debug,  # Log SQL queries in debug mode
-)
+# Shared OLTP engine (same pool as api.models)
+engine = get_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -32,15 +21,6 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-# Event listener to set NOCOUNT ON for SQL Server
-@event.listens_for(engine, "connect")
-def set_nocount(dbapi_conn, connection_record):
-    """Set NOCOUNT ON for SQL Server connections."""
-    cursor = dbapi_conn.cursor()
-    cursor.execute("SET NOCOUNT ON")
-    cursor.close()
-
-
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency function to get database session.
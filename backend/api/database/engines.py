@@ -0,0 +1,214 @@
+"""
+Shared engine factory and connection-pool metrics.
+
+Every part of the backend gets its SQLAlchemy engine from ``get_engine``.
+There is one engine (and one pool) per workload class:
+
+    oltp       API request handling (the default)
+    agent      Autonomous agents and their tools
+    reporting  Long-running reports and stored procedures
+
+Pools are created lazily, so a process only opens connections for the
+workloads it actually runs.
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from typing import Any, Dict, List, Optional
+import bisect
+import logging
+import threading
+import time
+
+from api.config import get_settings, PoolConfig
+
+logger = logging.getLogger(__name__)
+
+OLTP = "oltp"
+AGENT = "agent"
+REPORTING = "reporting"
+
+# Used when a workload has no [database.pools.<name>] section; OLTP falls
+# back to the top-level [database] pool settings.
+WORKLOAD_DEFAULTS: Dict[str, Dict[str, int]] = {
+    AGENT: {"pool_size": 2, "max_overflow": 3, "pool_timeout": 30},
+    REPORTING: {"pool_size": 2, "max_overflow": 2, "pool_timeout": 120},
+}
+
+# Checkout latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolMetrics:
+    """Thread-safe counters and checkout-latency histogram for one pool."""
+
+    def __init__(self, workload: str):
+        self.workload = workload
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000.0)] += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def histogram(self) -> Dict[str, int]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        # Cumulative counts, Prometheus style
+        counts, running = {}, 0
+        for label, count in zip(labels, self.buckets):
+            running += count
+            counts[label] = running
+        return counts
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000.0 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "checkout_latency_ms": self.histogram(),
+            }
+
+
+_metrics: Dict[str, PoolMetrics] = {}
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times how long each checkout waits for a connection.
+
+    The workload name travels in ``logging_name``, which survives
+    ``recreate()`` after ``dispose()``, so metrics carry over.
+    """
+
+    def _do_get(self):
+        metrics = _metrics.get(self._orig_logging_name)
+        if metrics is None:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except Exception:
+            metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return record
+
+
+def pool_config(workload: str) -> PoolConfig:
+    """Effective pool settings for a workload."""
+    database = get_settings().database
+    if workload in database.pools:
+        return database.pools[workload]
+    if workload == OLTP:
+        return PoolConfig(
+            pool_size=database.pool_size,
+            max_overflow=database.max_overflow,
+            pool_timeout=database.pool_timeout,
+            pool_recycle=database.pool_recycle,
+        )
+    if workload in WORKLOAD_DEFAULTS:
+        return PoolConfig(pool_recycle=database.pool_recycle, **WORKLOAD_DEFAULTS[workload])
+    raise ValueError(f"Unknown database workload '{workload}'")
+
+
+def _create_engine(workload: str) -> Engine:
+    settings = get_settings()
+    config = pool_config(workload)
+    metrics = _metrics.setdefault(workload, PoolMetrics(workload))
+
+    engine = create_engine(
+        settings.database.sqlalchemy_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        pool_pre_ping=config.pool_pre_ping,
+        pool_logging_name=workload,
+        echo=settings.app.debug,  # Log SQL queries in debug mode
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_nocount(dbapi_conn, connection_record):
+        """Set NOCOUNT ON for SQL Server connections."""
+        metrics.record_connect()
+        if engine.dialect.name != "mssql":
+            return
+        cursor = dbapi_conn.cursor()
+        cursor.execute("SET NOCOUNT ON")
+        cursor.close()
+
+    @event.listens_for(engine, "checkin")
+    def count_checkin(dbapi_conn, connection_record):
+        metrics.record_checkin()
+
+    logger.info(
+        f"Created '{workload}' engine (pool_size={config.pool_size}, "
+        f"max_overflow={config.max_overflow}, pool_timeout={config.pool_timeout})"
+    )
+    return engine
+
+
+def get_engine(workload: str = OLTP) -> Engine:
+    """Shared engine for a workload class, created on first use."""
+    engine = _engines.get(workload)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(workload)
+            if engine is None:
+                engine = _create_engine(workload)
+                _engines[workload] = engine
+    return engine
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Live pool state and checkout metrics for every engine created so far."""
+    pools = {}
+    for workload, engine in list(_engines.items()):
+        pool = engine.pool
+        config = pool_config(workload)
+        pools[workload] = {
+            "pool_size": pool.size(),
+            "max_overflow": config.max_overflow,
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            **_metrics[workload].snapshot(),
+        }
+    return pools
+
+
+def dispose_engines(workloads: Optional[List[str]] = None):
+    """Close pooled connections (all workloads by default)."""
+    for workload in workloads or list(_engines):
+        engine = _engines.get(workload)
+        if engine is not None:
+            engine.dispose()
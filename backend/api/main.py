@@ -13,7 +13,10 @@ import sys
 from pathlib import Path
 
 from api.config import get_settings
-from api.database import test_connection, init_db
+from api.database import test_connection, init_db, get_pool_metrics, dispose_engines
+from api.utils.executors import get_executor_stats, shutdown_executors
+from agents.tools.transport import close_http_clients
+from agents.llm_client import close_llm_clients, get_llm_manager
 
 # Configure logging
 settings = get_settings()
@@ -64,6 +67,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down application")
+    await rag_router.embedding_batcher.close()
+    await agent_router.job_queue.close()
+    await close_http_clients()
+    await close_llm_clients()
+    shutdown_executors()
+    dispose_engines()
 
 
 # Create FastAPI application
@@ -140,6 +149,24 @@ async def health_check():
     }
 
 
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_metrics():
+    """Connection pool state and checkout latency per workload (oltp, agent, reporting)."""
+    return {"pools": get_pool_metrics()}
+
+
+@app.get("/health/executors", tags=["Health"])
+async def executor_metrics():
+    """Load on the thread pools used for CPU-bound and blocking database work."""
+    return {"executors": get_executor_stats()}
+
+
+@app.get("/health/llm", tags=["Health"])
+async def llm_metrics():
+    """Requests, retries and rate-limit waits of the shared LLM client."""
+    return {"llm": get_llm_manager().get_stats()}
+
+
 # Import and include routers
 from api.routers import (
     crud,
@@ -3,29 +3,134 @@ Auto-generate models from existing database using SQLAlchemy reflection.
 This is MUCH faster than manually creating each model!
 """
 
-from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy import MetaData, text
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.orm import Session
 import logging
 
 from api.config import get_settings
+from api.database.engines import get_engine, REPORTING
+from api.utils.schema_cache import load_metadata
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Create engine
-engine = create_engine(
-    settings.database.sqlalchemy_url,
-    pool_size=settings.database.pool_size,
-    max_overflow=settings.database.max_overflow,
-    pool_timeout=settings.database.pool_timeout,
-    pool_recycle=settings.database.pool_recycle,
-    echo=settings.app.debug,
-)
+# Shared OLTP engine (see api.database.engines)
+engine = get_engine()
+
+# Tables mapped below and used by the routers. Tables referenced by their
+# foreign keys are reflected too; anything else (e.g. for the generic CRUD
+# router) goes in database.extra_reflect_tables.
+REFLECTED_TABLES = [
+    # Core
+    'EMPLEADO',
+    'EMPRESA',
+    'SEDE',
+    'ROL',
+    'EMPLEADO_ROL',
+
+    # Risk management
+    'CATALOGO_PELIGRO',
+    'RIESGO',
+    'VALORACION_PROB',
+    'VALORACION_CONSEC',
+    'EXPOSICION',
+
+    # Events
+    'EVENTO',
+    'ACCION_CORRECTIVA',
+    'ACCION_MEJORA',
+
+    # Medical
+    'EXAMEN_MEDICO',
+    'PROGRAMA_VIGILANCIA',
+    'AUSENTISMO',
+
+    # Training
+    'CAPACITACION',
+    'ASISTENCIA',
+    'COMPETENCIA_SST',
+
+    # PPE
+    'EPP',
+    'ENTREGA_EPP',
+
+    # Committees
+    'COMITE',
+    'MIEMBRO_COMITE',
+    'REUNION_COMITE',
+
+    # Tasks
+    'PLAN_TRABAJO',
+    'TAREA',
+    'OBJETIVO_SST',
+
+    # Audits
+    'AUDITORIA',
+    'HALLAZGO_AUDITORIA',
+    'PLAN_ACCION_AUDITORIA',
+
+    # Documents
+    'DOCUMENTO',
+    'VERSION_DOCUMENTO',
+    'PLANTILLA_DOCUMENTO',
+
+    # Alerts
+    'ALERTA',
+    'HISTORIAL_NOTIFICACION',
 
-# Reflect existing database
-metadata = MetaData()
-metadata.reflect(engine)
+    # Users
+    'USUARIOS_AUTORIZADOS',
+    'CONVERSACION_AGENTE',
+    'LOG_AGENTE',
+    'CONFIG_AGENTE',
+
+    # Equipment
+    'EQUIPO',
+    'MANTENIMIENTO_EQUIPO',
+
+    # Inspections
+    'INSPECCION',
+    'HALLAZGO_INSPECCION',
+
+    # Emergency
+    'AMENAZA',
+    'BRIGADA',
+    'MIEMBRO_BRIGADA',
+    'SIMULACRO',
+
+    # Contractors
+    'CONTRATISTA',
+    'EVALUACION_CONTRATISTA',
+    'TRABAJADOR_CONTRATISTA',
+
+    # Indicators
+    'INDICADOR',
+    'RESULTADO_INDICADOR',
+
+    # Legal
+    'REQUISITO_LEGAL',
+    'EVALUACION_LEGAL',
+
+    # Reports
+    'REPORTE_GENERADO',
+    'REVISION_DIRECCION',
+]
+
+
+def _tables_to_reflect():
+    if settings.database.reflect_all_tables:
+        return None
+    return sorted(set(REFLECTED_TABLES) | set(settings.database.extra_reflect_tables))
+
+
+# Reflect existing database (from the schema snapshot when available)
+metadata: MetaData = load_metadata(
+    engine,
+    tables=_tables_to_reflect(),
+    cache_path=settings.database.schema_cache_path or None,
+    revalidate=settings.database.schema_cache_revalidate,
+)
 
 # Auto-generate models from existing tables
 Base = automap_base(metadata=metadata)
@@ -153,7 +258,7 @@ def call_stored_procedure(proc_name: str, params: dict = None):
     Example:
         call_stored_procedure('SP_Calcular_Indicadores_Siniestralidad', {'Anio': 2024})
     """
-    with Session(engine) as session:
+    with Session(get_engine(REPORTING)) as session:
         if params:
             param_str = ", ".join([f"@{k}={v}" for k, v in params.items()])
             sql = text(f"EXEC {proc_name} {param_str}")
@@ -187,6 +292,7 @@ __all__ = [
     'Base',
     'engine',
     'metadata',
+    'REFLECTED_TABLES',
     'get_db',
     'call_stored_procedure',
     'STORED_PROCEDURES',
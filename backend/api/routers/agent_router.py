@@ -4,10 +4,13 @@ Agent API Router
 FastAPI endpoints for agent execution and management.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+import asyncio
 import logging
+import orjson
 from datetime import datetime
 
 # Import agents and orchestrator
@@ -15,12 +18,16 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from agents.base_agent import AgentContext, AgentStatus
+from agents.base_agent import AgentContext, AgentStatus, BaseAgent
+from agents.events import AgentEventStream, json_default, ROUTING, AGENT_START, RESULT, ERROR
 from agents.risk_agent import RiskAgent
 from agents.document_agent import DocumentAgent
 from agents.email_agent import EmailAgent
 from agents.assistant_agent import AssistantAgent
 from orchestrator.role_orchestrator import RoleOrchestrator
+from orchestrator.job_store import create_job_store
+from orchestrator.job_queue import AgentJobQueue, JobQueueFull
+from api.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +51,36 @@ AGENTS = {
 }
 
 
+async def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a queued job (same steps as /run after the permission check)."""
+    agent = AGENTS[job["agent_name"]]
+    context = AgentContext(user_id=job["user_id"], session_id=job["session_id"])
+    context.metadata.update(job["context"])
+    
+    result = await agent.execute(job["task"], context)
+    
+    orchestrator.track_agent_usage(
+        user_id=job["user_id"],
+        agent_name=job["agent_name"],
+        task_id=job["job_id"],
+        status="completed"
+    )
+    return result
+
+
+# Background jobs: status lives in the job store, shared by all workers
+_agents_config = get_settings().agents
+job_queue = AgentJobQueue(
+    store=create_job_store(_agents_config.job_store, _agents_config.job_store_path),
+    runner=_run_job,
+    max_workers=_agents_config.job_workers,
+    max_running_per_user=_agents_config.job_max_running_per_user,
+    max_queued_per_user=_agents_config.job_max_queued_per_user,
+    heartbeat_seconds=_agents_config.job_heartbeat_seconds,
+    stale_seconds=_agents_config.job_stale_seconds
+)
+
+
 # ============================================
 # Request/Response Models
 # ============================================
@@ -67,6 +104,14 @@ class AgentRunResponse(BaseModel):
     execution_time: Optional[float] = None
 
 
+class AgentJobResponse(BaseModel):
+    """A queued background job"""
+    job_id: str
+    status: str
+    agent_name: str
+    status_url: str
+
+
 class AgentStatusResponse(BaseModel):
     """Agent status response"""
     task_id: str
@@ -87,6 +132,42 @@ class AgentListResponse(BaseModel):
 # Endpoints
 # ============================================
 
+async def _prepare_run(request: AgentRunRequest) -> Tuple[Dict[str, Any], str, BaseAgent, AgentContext]:
+    """Check permissions, select the agent and build its context (raises HTTPException)."""
+    orchestration = await orchestrator.orchestrate(
+        user_id=request.user_id,
+        task=request.task,
+        preferred_agent=request.agent_name
+    )
+    
+    if orchestration["status"] == "error":
+        raise HTTPException(
+            status_code=403,
+            detail=orchestration["message"]
+        )
+    
+    # Get the agent
+    agent_name = orchestration["selected_agent"]
+    agent = AGENTS.get(agent_name)
+    
+    if not agent:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent {agent_name} not found"
+        )
+    
+    # Create context
+    context = AgentContext(
+        user_id=request.user_id,
+        session_id=request.session_id
+    )
+    
+    if request.context:
+        context.metadata.update(request.context)
+    
+    return orchestration, agent_name, agent, context
+
+
 @router.post("/run", response_model=AgentRunResponse)
 async def run_agent(
     request: AgentRunRequest,
@@ -102,37 +183,7 @@ async def run_agent(
     4. Returns results
     """
     try:
-        # Validate user permissions
-        orchestration = await orchestrator.orchestrate(
-            user_id=request.user_id,
-            task=request.task,
-            preferred_agent=request.agent_name
-        )
-        
-        if orchestration["status"] == "error":
-            raise HTTPException(
-                status_code=403,
-                detail=orchestration["message"]
-            )
-        
-        # Get the agent
-        agent_name = orchestration["selected_agent"]
-        agent = AGENTS.get(agent_name)
-        
-        if not agent:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Agent {agent_name} not found"
-            )
-        
-        # Create context
-        context = AgentContext(
-            user_id=request.user_id,
-            session_id=request.session_id
-        )
-        
-        if request.context:
-            context.metadata.update(request.context)
+        orchestration, agent_name, agent, context = await _prepare_run(request)
         
         # Execute agent
         start_time = datetime.now()
@@ -168,21 +219,145 @@ async def run_agent(
         )
 
 
+def _format_event(event: Dict[str, Any], format: str) -> bytes:
+    data = orjson.dumps(event, default=json_default)
+    if format == "ndjson":
+        return data + b"\n"
+    return b"event: " + event["event"].encode() + b"\ndata: " + data + b"\n\n"
+
+
+@router.post("/run/stream")
+async def run_agent_stream(
+    request: AgentRunRequest,
+    format: str = Query("sse", description="sse (text/event-stream) or ndjson")
+):
+    """
+    Execute an agent and stream its progress.
+    
+    Events, in order: routing, agent_start, any number of tool_start /
+    tool_end / token, then result (same fields as /run) or error. Each
+    event carries ``elapsed_ms`` since the run started.
+    
+    Token events come from the tools: today only the SQL that
+    ``QueryTools`` generates (``tool`` is set on each one). The agents'
+    own answers arrive whole in ``result``; they are not streamed token
+    by token yet.
+    
+    Permission and agent errors are returned as regular HTTP errors
+    before the stream starts. Disconnecting cancels the run.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be sse or ndjson")
+    
+    orchestration, agent_name, agent, context = await _prepare_run(request)
+    events = AgentEventStream()
+    
+    async def run():
+        # Tools and the LLM client find the stream through the task's context
+        events.activate()
+        try:
+            await events.publish(
+                ROUTING,
+                selected_agent=agent_name,
+                user_role=orchestration.get("user_role"),
+                allowed_agents=orchestration.get("allowed_agents", [])
+            )
+            await events.publish(AGENT_START, agent_name=agent_name)
+            
+            start_time = datetime.now()
+            result = await agent.execute(request.task, context)
+            execution_time = (datetime.now() - start_time).total_seconds()
+            task_id = f"{agent_name}_{request.user_id}_{int(start_time.timestamp())}"
+            
+            orchestrator.track_agent_usage(
+                user_id=request.user_id,
+                agent_name=agent_name,
+                task_id=task_id,
+                status="completed"
+            )
+            await events.publish(
+                RESULT,
+                status="success",
+                agent_name=agent_name,
+                task_id=task_id,
+                result=result,
+                execution_time=execution_time
+            )
+        except Exception as e:
+            logger.error(f"Error executing agent: {e}")
+            await events.publish(ERROR, agent_name=agent_name, error=f"Error executing agent: {str(e)}")
+        finally:
+            events.close()
+    
+    async def body() -> AsyncIterator[bytes]:
+        task = asyncio.create_task(run())
+        try:
+            async for event in events:
+                yield _format_event(event, format)
+        finally:
+            # Client went away (or the run ended): never leave the agent running
+            if not task.done():
+                task.cancel()
+    
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/jobs", response_model=AgentJobResponse, status_code=202)
+async def enqueue_agent_job(request: AgentRunRequest):
+    """
+    Queue an agent run and return immediately.
+    
+    Poll /status/{job_id} for progress and the result; cancel with
+    /cancel/{job_id}. Permissions are checked before queueing.
+    """
+    orchestration, agent_name, agent, context = await _prepare_run(request)
+    
+    try:
+        job = await job_queue.enqueue(
+            user_id=request.user_id,
+            agent_name=agent_name,
+            task=request.task,
+            context=request.context,
+            session_id=request.session_id
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return AgentJobResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        agent_name=agent_name,
+        status_url=f"{router.prefix}/status/{job['job_id']}"
+    )
+
+
+@router.get("/jobs/stats")
+async def agent_job_stats():
+    """Queue depth and outcome counters of this worker's job queue."""
+    return job_queue.get_stats()
+
+
 @router.get("/status/{task_id}", response_model=AgentStatusResponse)
 async def get_agent_status(task_id: str):
     """
-    Get the status of a running agent task.
-    
-    Note: This is a placeholder. In production, you would track
-    task status in a database or cache (Redis).
+    Get the status, progress and result of a background agent job.
     """
-    # TODO: Implement actual task tracking
+    job = await job_queue.get(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {task_id} not found")
+    
     return AgentStatusResponse(
         task_id=task_id,
-        status="completed",
-        agent_name="unknown",
-        progress=100.0,
-        result={"message": "Task tracking not yet implemented"}
+        status=job["status"],
+        agent_name=job["agent_name"],
+        progress=job["progress"],
+        result=job["result"],
+        error=job["error"]
     )
 
 
@@ -225,16 +400,28 @@ async def list_agents(user_id: int):
 @router.post("/cancel/{task_id}")
 async def cancel_agent_task(task_id: str, user_id: int):
     """
-    Cancel a running agent task.
+    Cancel a queued or running background job of the user.
     
-    Note: This is a placeholder. Actual implementation would require
-    task tracking and cancellation logic.
+    A job running in another API worker is cancelled by that worker
+    within one heartbeat.
     """
-    # TODO: Implement task cancellation
+    job = await job_queue.get(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {task_id} not found")
+    if job["user_id"] != user_id:
+        raise HTTPException(status_code=403, detail="Job belongs to another user")
+    
+    if not await job_queue.cancel(task_id):
+        return {
+            "status": job["status"],
+            "task_id": task_id,
+            "message": f"Job already {job['status']}"
+        }
+    
     return {
         "status": "cancelled",
         "task_id": task_id,
-        "message": "Task cancellation not yet implemented"
+        "message": "Cancellation requested"
     }
 
 
@@ -245,18 +432,14 @@ async def get_agent_history(
     offset: int = 0
 ):
     """
-    Get agent execution history for a user.
-    
-    Note: This is a placeholder. Actual implementation would query
-    from database.
+    Get background agent job history for a user, newest first.
     """
-    # TODO: Implement history retrieval from database
+    page = await job_queue.history(user_id, limit, offset)
     return {
-        "history": [],
-        "total": 0,
+        "history": page["jobs"],
+        "total": page["total"],
         "limit": limit,
-        "offset": offset,
-        "message": "History tracking not yet implemented"
+        "offset": offset
     }
 
 
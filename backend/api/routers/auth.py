@@ -7,6 +7,7 @@ from pydantic import BaseModel
 
 from api.models import get_db, AuthorizedUser
 from api.utils.security import verify_password, create_access_token
+from api.utils.executors import run_cpu, run_db
 from api.config import get_settings
 from api.dependencies import get_current_active_user
 
@@ -32,7 +33,9 @@ async def login_for_access_token(
     import logging
     logger = logging.getLogger(__name__)
     
-    user = db.query(AuthorizedUser).filter(AuthorizedUser.Correo_Electronico == form_data.username).first()
+    user = await run_db(
+        lambda: db.query(AuthorizedUser).filter(AuthorizedUser.Correo_Electronico == form_data.username).first()
+    )
     
     # Debug logging
     if not user:
@@ -53,7 +56,8 @@ async def login_for_access_token(
     
     logger.info(f"User found: {form_data.username}, Hash length: {len(user.Password_Hash)}, Hash prefix: {user.Password_Hash[:10] if len(user.Password_Hash) >= 10 else user.Password_Hash}")
     
-    password_valid = verify_password(form_data.password, user.Password_Hash)
+    # bcrypt takes ~100-300 ms; keep it off the event loop
+    password_valid = await run_cpu(verify_password, form_data.password, user.Password_Hash)
     logger.info(f"Password verification result for {form_data.username}: {password_valid}")
     
     if not password_valid:
@@ -70,7 +74,7 @@ async def login_for_access_token(
         from api.models import Role
         # We need to query this inside the session
         # Note: 'user' is already attached to 'db' session from the query above
-        db_role = db.query(Role).filter(Role.id_rol == user.id_rol).first()
+        db_role = await run_db(lambda: db.query(Role).filter(Role.id_rol == user.id_rol).first())
         if db_role:
             role_name = db_role.NombreRol
             
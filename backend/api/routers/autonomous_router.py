@@ -11,6 +11,7 @@ router = APIRouter(
 
 @router.post("/coordinate-tasks", response_model=List[Dict[str, Any]])
 def coordinate_tasks(
+    batch: bool = True,
     db: Session = Depends(get_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
@@ -20,9 +21,14 @@ def coordinate_tasks(
     2. Create preventive tasks
     3. Rebalance workload
     4. Escalate critical tasks
+
+    With ``batch`` (default) all reads happen up front and every write is
+    applied in a single transaction; ``batch=false`` runs the per-row path,
+    which commits each action on its own. Use it when a batch run keeps
+    rolling back, to let the healthy rows through and find the failing one.
     """
     try:
-        agent = TaskCoordinatorAgent(db)
+        agent = TaskCoordinatorAgent(db, batch=batch)
         actions = agent.analyze_and_coordinate()
         return actions
     except Exception as e:
@@ -4,17 +4,22 @@ This saves us from writing individual routers for each entity.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import inspect, and_, or_
-from typing import List, Dict, Any, Optional
+from sqlalchemy import inspect
+from typing import List, Dict, Any, Iterator, Optional
+import json
 import logging
 
 from api.models import get_db, Base, AuthorizedUser
+from api.database.engines import get_engine, REPORTING
 from api.dependencies import get_current_active_user
+from api.utils.serializers import get_serializer
+from api.utils.pagination import apply_filters, export_rows, paginate
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 def get_model_class(table_name: str):
@@ -29,15 +34,7 @@ def model_to_dict(instance) -> Dict[str, Any]:
     """Convert SQLAlchemy model instance to dictionary."""
     if instance is None:
         return None
-    
-    result = {}
-    for column in inspect(instance).mapper.column_attrs:
-        value = getattr(instance, column.key)
-        # Convert datetime/date to ISO format
-        if hasattr(value, 'isoformat'):
-            value = value.isoformat()
-        result[column.key] = value
-    return result
+    return get_serializer(type(instance))(instance)
 
 
 @router.get("/{table_name}")
@@ -45,34 +42,70 @@ def get_all(
     table_name: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: str = Query("exact", description="exact, approximate or none"),
     db: Session = Depends(get_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
     Get all records from any table with pagination.
     
-    Example: GET /api/v1/crud/EMPLEADO?skip=0&limit=10
+    Example: GET /api/v1/crud/EMPLEADO?limit=100&count=none
+    Next page: GET /api/v1/crud/EMPLEADO?limit=100&count=none&cursor=<next_cursor>
     """
     Model = get_model_class(table_name)
     
     try:
-        # Get primary key column for ordering (required by MSSQL for OFFSET)
-        pk_column = inspect(Model).primary_key[0]
-        
-        total = db.query(Model).count()
-        items = db.query(Model).order_by(pk_column).offset(skip).limit(limit).all()
-        
-        return {
-            "total": total,
-            "skip": skip,
-            "limit": limit,
-            "items": [model_to_dict(item) for item in items]
-        }
+        # Returned as a response so FastAPI skips jsonable_encoder on every row
+        return ORJSONResponse(
+            paginate(db, Model, table_name, db.query(Model), skip, limit, cursor, count, filtered=False)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error querying {table_name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _export_rows(Model, filters: Optional[Dict[str, Any]], format: str) -> Iterator[Any]:
+    """
+    Stream a table as NDJSON or CSV.
+    Runs on its own reporting-pool session because request-scoped sessions
+    are closed before a streaming response body is sent.
+    """
+    with Session(get_engine(REPORTING)) as session:
+        yield from export_rows(session, Model, filters, format)
+
+
+@router.get("/{table_name}/export")
+def export(
+    table_name: str,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    filters: Optional[str] = Query(None, description='JSON object of equality filters, e.g. {"Estado": true}'),
+    current_user: AuthorizedUser = Depends(get_current_active_user)
+):
+    """
+    Stream every (matching) record of a table without loading it in memory.
+    
+    Example: GET /api/v1/crud/EVENTO/export?format=csv
+    """
+    Model = get_model_class(table_name)
+    
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    try:
+        filter_data = json.loads(filters) if filters else None
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filters: {e}")
+    
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        _export_rows(Model, filter_data, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{format}"'}
+    )
+
+
 @router.get("/{table_name}/{record_id}")
 def get_one(
     table_name: str,
@@ -96,7 +129,7 @@ def get_one(
         if not item:
             raise HTTPException(status_code=404, detail=f"Record {record_id} not found in {table_name}")
         
-        return model_to_dict(item)
+        return ORJSONResponse(model_to_dict(item))
     except HTTPException:
         raise
     except Exception as e:
@@ -225,6 +258,8 @@ def search(
     filters: Dict[str, Any],
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: str = Query("exact", description="exact or none"),
     db: Session = Depends(get_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
@@ -237,26 +272,12 @@ def search(
     Model = get_model_class(table_name)
     
     try:
-        # Get primary key column for ordering (required by MSSQL for OFFSET)
-        pk_column = inspect(Model).primary_key[0]
-        
-        query = db.query(Model)
-        
-        # Apply filters
-        for key, value in filters.items():
-            if hasattr(Model, key):
-                query = query.filter(getattr(Model, key) == value)
-        
-        total = query.count()
-        items = query.order_by(pk_column).offset(skip).limit(limit).all()
-        
-        return {
-            "total": total,
-            "skip": skip,
-            "limit": limit,
-            "filters": filters,
-            "items": [model_to_dict(item) for item in items]
-        }
+        query = apply_filters(Model, db.query(Model), filters)
+        page = paginate(db, Model, table_name, query, skip, limit, cursor, count, filtered=bool(filters))
+        page["filters"] = filters
+        return ORJSONResponse(page)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error searching {table_name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
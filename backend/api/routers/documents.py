@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
+from sqlalchemy import desc, or_, select
 from typing import List, Optional
 from datetime import datetime
 from fastapi.responses import FileResponse, JSONResponse
 import logging
 
 from api.models import get_db, Base, AuthorizedUser
+from api.database import AsyncDBSession, get_async_db
 from api.dependencies import get_current_active_user
 from api.models.documents import DocumentRead, DocumentCreate, DocumentUpdate
 from api.utils.file_storage import save_upload_file, get_file_path_absolute, delete_file
@@ -23,32 +24,32 @@ def get_document_model():
         raise HTTPException(status_code=500, detail="DOCUMENTO table not found. Restart backend.")
 
 @router.get("/", response_model=List[DocumentRead])
-def get_documents(
+async def get_documents(
     type: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """List all documents with filters"""
     Documento = get_document_model()
-    query = db.query(Documento)
+    query = select(Documento)
     
     if type:
-        query = query.filter(Documento.Tipo == type)
+        query = query.where(Documento.Tipo == type)
     
     if category:
-        query = query.filter(Documento.CategoriaSGSST == category)
+        query = query.where(Documento.CategoriaSGSST == category)
         
     if search:
         search_term = f"%{search}%"
-        query = query.filter(or_(
+        query = query.where(or_(
             Documento.Nombre.like(search_term),
             Documento.descripcion.like(search_term),
             Documento.Codigo.like(search_term)
         ))
         
-    return query.order_by(desc(Documento.FechaCreacion)).all()
+    return (await db.scalars(query.order_by(desc(Documento.FechaCreacion)))).all()
 
 @router.post("/upload", response_model=DocumentRead)
 async def upload_document(
@@ -59,7 +60,7 @@ async def upload_document(
     area: Optional[str] = Form(None),
     descripcion: Optional[str] = Form(None),
     version: int = Form(1),
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """Upload a file and create document record"""
@@ -95,8 +96,8 @@ async def upload_document(
         )
         
         db.add(new_doc)
-        db.commit()
-        db.refresh(new_doc)
+        await db.commit()
+        await db.refresh(new_doc)
         return new_doc
         
     except Exception as e:
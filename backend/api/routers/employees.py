@@ -3,12 +3,12 @@ Employees Router - API endpoints for employee management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List, Optional
 import logging
 
-from api.models import get_db, AuthorizedUser
+from api.models import AuthorizedUser
+from api.database import AsyncDBSession, get_async_db
 from api.dependencies import get_current_active_user
 from api.schemas.employee import EmployeeResponse
 
@@ -20,7 +20,7 @@ router = APIRouter()
 async def get_employees(
     search: Optional[str] = Query(None),
     limit: int = Query(100, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -37,7 +37,7 @@ async def get_employees(
             
         query_str += f" ORDER BY NombreCompleto OFFSET 0 ROWS FETCH NEXT {limit} ROWS ONLY"
         
-        result = db.execute(text(query_str), params)
+        result = await db.execute(text(query_str), params)
         
         # Convert rows to dicts for Pydantic validation
         employees = []
@@ -56,13 +56,13 @@ async def get_employees(
 @router.get("/employees/{employee_id}", response_model=EmployeeResponse)
 async def get_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """Get single employee details from view"""
     try:
         query = text("SELECT * FROM VW_Empleados_Activos WHERE id_empleado = :id")
-        result = db.execute(query, {"id": employee_id}).fetchone()
+        result = (await db.execute(query, {"id": employee_id})).fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="Employee not found")
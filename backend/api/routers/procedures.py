@@ -6,11 +6,12 @@ This lets us use all your existing business logic!
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import date, datetime
 import logging
 
 from api.models import get_db, call_stored_procedure, STORED_PROCEDURES, AuthorizedUser
+from api.database import AsyncDBSession, get_async_db
 from api.dependencies import get_current_active_user
 
 logger = logging.getLogger(__name__)
@@ -18,6 +19,35 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def fetch_result_sets(session: Session, sql: str, *params) -> List[list]:
+    """
+    Run a statement on the raw pyodbc cursor and return every result set.
+    Sets that produce no rows (or are not queries) come back as [].
+    """
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(sql, *params)
+        result_sets = []
+        while True:
+            try:
+                result_sets.append(cursor.fetchall())
+            except Exception:
+                result_sets.append([])
+            if not cursor.nextset():
+                break
+        return result_sets
+    finally:
+        cursor.close()
+
+
+def first_row(result_sets: List[list]) -> Tuple[int, Optional[Any]]:
+    """Index of the first result set with data and its first row."""
+    for index, rows in enumerate(result_sets):
+        if rows:
+            return index, rows[0]
+    return len(result_sets), None
+
+
 @router.post("/monitor-overdue-tasks")
 def monitor_overdue_tasks(
     db: Session = Depends(get_db),
@@ -83,10 +113,10 @@ def generate_tasks_expiration(
 
 
 @router.get("/accident-indicators/{year}")
-def calculate_accident_indicators(
+async def calculate_accident_indicators(
     year: int,
     periodo: Optional[str] = Query(None, description="Period: Q1, Q2, Q3, Q4, or specific month"),
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -101,31 +131,18 @@ def calculate_accident_indicators(
         logger.info(f"Calling SP_Calcular_Indicadores_Siniestralidad with year={year}, periodo={periodo}")
         
         # Use raw connection to handle multiple result sets
-        connection = db.connection()
-        cursor = connection.connection.cursor()
-        
         if periodo:
-            cursor.execute("EXEC SP_Calcular_Indicadores_Siniestralidad @Anio = ?, @Periodo = ?", year, periodo)
+            result_sets = await db.run_sync(
+                fetch_result_sets, "EXEC SP_Calcular_Indicadores_Siniestralidad @Anio = ?, @Periodo = ?", year, periodo
+            )
         else:
-            cursor.execute("EXEC SP_Calcular_Indicadores_Siniestralidad @Anio = ?", year)
+            result_sets = await db.run_sync(
+                fetch_result_sets, "EXEC SP_Calcular_Indicadores_Siniestralidad @Anio = ?", year
+            )
         
-        # Consume all result sets until we find the data
-        row = None
-        while True:
-            try:
-                row = cursor.fetchone()
-                if row:
-                    break
-                # Move to next result set
-                if not cursor.nextset():
-                    break
-            except Exception:
-                # Try next result set
-                if not cursor.nextset():
-                    break
-        
-        cursor.close()
-        db.commit()
+        # First result set with data
+        _, row = first_row(result_sets)
+        await db.commit()
         
         data = None
         if row:
@@ -168,16 +185,16 @@ def calculate_accident_indicators(
         
         return data
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error executing SP_Calcular_Indicadores_Siniestralidad: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error al calcular indicadores: {str(e)}")
 
 
 @router.get("/work-plan-compliance")
-def work_plan_compliance_report(
+async def work_plan_compliance_report(
     id_plan: Optional[int] = None,
     fecha_corte: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -190,7 +207,7 @@ def work_plan_compliance_report(
         if not id_plan:
             # We need to reflect the table or use raw SQL since we might not have the model loaded
             # Assuming PLAN_TRABAJO table exists as per previous context
-            latest_plan = db.execute(text("SELECT TOP 1 id_plan FROM PLAN_TRABAJO ORDER BY Anio DESC")).fetchone()
+            latest_plan = (await db.execute(text("SELECT TOP 1 id_plan FROM PLAN_TRABAJO ORDER BY Anio DESC"))).fetchone()
             if latest_plan:
                 id_plan = latest_plan[0]
             else:
@@ -211,17 +228,7 @@ def work_plan_compliance_report(
                     "by_type": []
                 }
 
-        params = {"id_plan": id_plan}
-        sql = "EXEC SP_Reporte_Cumplimiento_Plan @IdPlan = :id_plan"
-        
-        if fecha_corte:
-            params["fecha_corte"] = fecha_corte
-            sql += ", @FechaCorte = :fecha_corte"
-        
         # Use raw connection for multiple result sets
-        connection = db.connection()
-        cursor = connection.connection.cursor()
-        
         params_list = [id_plan]
         sql = "EXEC SP_Reporte_Cumplimiento_Plan @IdPlan = ?"
         
@@ -229,20 +236,10 @@ def work_plan_compliance_report(
             sql += ", @FechaCorte = ?"
             params_list.append(fecha_corte)
             
-        cursor.execute(sql, *params_list)
+        result_sets = await db.run_sync(fetch_result_sets, sql, *params_list)
         
         # Find first result set with data
-        summary_row = None
-        while True:
-            try:
-                summary_row = cursor.fetchone()
-                if summary_row:
-                    break
-                if not cursor.nextset():
-                    break
-            except Exception:
-                if not cursor.nextset():
-                    break
+        summary_index, summary_row = first_row(result_sets)
         if summary_row:
             logger.info(f"Work Plan Summary Row: {summary_row}")
             # Check if column 1 is a date (which caused the error)
@@ -274,17 +271,13 @@ def work_plan_compliance_report(
         
         # Second result set - by task type
         by_type = []
-        if cursor.nextset():
-            rows = cursor.fetchall()
-            for row in rows:
-                by_type.append({
-                    "tipo_tarea": row[0],
-                    "total": row[1],
-                    "cerradas": row[2],
-                    "porcentaje_cumplimiento": float(row[3]) if row[3] else 0,
-                })
-                
-        cursor.close()
+        for row in result_sets[summary_index + 1] if summary_index + 1 < len(result_sets) else []:
+            by_type.append({
+                "tipo_tarea": row[0],
+                "total": row[1],
+                "cerradas": row[2],
+                "porcentaje_cumplimiento": float(row[3]) if row[3] else 0,
+            })
         
         return {
             "summary": summary,
@@ -296,8 +289,8 @@ def work_plan_compliance_report(
 
 
 @router.get("/medical-exam-compliance")
-def medical_exam_compliance_report(
-    db: Session = Depends(get_db),
+async def medical_exam_compliance_report(
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -306,23 +299,10 @@ def medical_exam_compliance_report(
     """
     try:
         # Use raw connection for multiple result sets
-        connection = db.connection()
-        cursor = connection.connection.cursor()
-        
-        cursor.execute("EXEC SP_Reporte_Cumplimiento_EMO")
+        result_sets = await db.run_sync(fetch_result_sets, "EXEC SP_Reporte_Cumplimiento_EMO")
         
         # Find first result set with data
-        summary_row = None
-        while True:
-            try:
-                summary_row = cursor.fetchone()
-                if summary_row:
-                    break
-                if not cursor.nextset():
-                    break
-            except Exception:
-                if not cursor.nextset():
-                    break
+        summary_index, summary_row = first_row(result_sets)
         summary = {}
         if summary_row:
             summary = {
@@ -335,21 +315,18 @@ def medical_exam_compliance_report(
         
         # Second result set - employees without valid EMO
         employees_without_emo = []
-        if cursor.nextset():
-            rows = cursor.fetchall()
-            for row in rows:
-                employees_without_emo.append({
-                    "id_empleado": row[0],
-                    "numero_documento": row[1],
-                    "nombre_completo": row[2],
-                    "cargo": row[3],
-                    "area": row[4],
-                    "correo": row[5],
-                    "estado": row[6],
-                    "fecha_vencimiento": row[7].isoformat() if row[7] and hasattr(row[7], 'isoformat') else None,
-                    "dias_vencidos": row[8] if row[8] is not None else None,
-                })
-        cursor.close()
+        for row in result_sets[summary_index + 1] if summary_index + 1 < len(result_sets) else []:
+            employees_without_emo.append({
+                "id_empleado": row[0],
+                "numero_documento": row[1],
+                "nombre_completo": row[2],
+                "cargo": row[3],
+                "area": row[4],
+                "correo": row[5],
+                "estado": row[6],
+                "fecha_vencimiento": row[7].isoformat() if row[7] and hasattr(row[7], 'isoformat') else None,
+                "dias_vencidos": row[8] if row[8] is not None else None,
+            })
         
         return {
             "summary": summary,
@@ -361,8 +338,8 @@ def medical_exam_compliance_report(
 
 
 @router.get("/executive-report")
-def executive_report(
-    db: Session = Depends(get_db),
+async def executive_report(
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -370,15 +347,15 @@ def executive_report(
     Returns executive dashboard for CEO.
     """
     try:
-        result = db.execute(text("EXEC SP_Reporte_Ejecutivo_CEO"))
+        result = await db.execute(text("EXEC SP_Reporte_Ejecutivo_CEO"))
         
         # This SP returns multiple result sets
         # You'll need to parse them according to your SP structure
         data = []
         # Basic handling for now, assuming single result set or we just want the first one
         # If it returns multiple, we need to know the structure of each
-        if result.returns_rows:
-            for row in result:
+        if getattr(result, "returns_rows", True):
+            for row in result.mappings():
                 data.append(dict(row))
         
         return {"executive_report": data}
@@ -414,8 +391,8 @@ def generate_automatic_alerts(
 
 
 @router.get("/pending-alerts")
-def get_pending_alerts(
-    db: Session = Depends(get_db),
+async def get_pending_alerts(
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -423,7 +400,7 @@ def get_pending_alerts(
     Returns list of pending alerts.
     """
     try:
-        result = db.execute(text("EXEC SP_Obtener_Alertas_Pendientes"))
+        result = await db.execute(text("EXEC SP_Obtener_Alertas_Pendientes"))
         
         alerts = []
         for row in result:
@@ -561,10 +538,10 @@ def generate_expiration_alerts(
 
 
 @router.get("/agent-context")
-def get_agent_context(
+async def get_agent_context(
     correo_usuario: str,
     ultimas_n: int = 5,
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -572,7 +549,7 @@ def get_agent_context(
     Gets recent context for the AI agent based on user email.
     """
     try:
-        result = db.execute(
+        result = await db.execute(
             text("EXEC SP_Obtener_Contexto_Agente @CorreoUsuario = :email, @UltimasN = :n"),
             {"email": correo_usuario, "n": ultimas_n}
         )
@@ -661,8 +638,8 @@ def register_agent_conversation(
 
 
 @router.get("/regulatory-compliance")
-def regulatory_compliance(
-    db: Session = Depends(get_db),
+async def regulatory_compliance(
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -688,7 +665,7 @@ def regulatory_compliance(
         WHERE rn = 1
         """
         
-        result = db.execute(text(sql)).fetchone()
+        result = (await db.execute(text(sql))).fetchone()
         
         compliance_score = 0
         if result and result[0] > 0:
@@ -4,7 +4,7 @@ RAG API Router
 FastAPI endpoints for RAG (Retrieval-Augmented Generation) queries.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import logging
@@ -15,9 +15,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from rag.rag_pipeline import RAGPipeline
+from rag.rag_pipeline import HybridRAGPipeline
 from rag.vectorstore import VectorStore
-from rag.embeddings import EmbeddingGenerator
+from rag.embeddings import CachedEmbeddingGenerator
+from rag.batching import EmbeddingBatcher
+from rag.query_cache import QueryResultCache
 from rag.loaders import DocumentLoader, PDFLoader, DOCXLoader
 
 logger = logging.getLogger(__name__)
@@ -25,13 +27,27 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/rag")
 
 # Initialize RAG components
-embedding_generator = EmbeddingGenerator()
+embedding_generator = CachedEmbeddingGenerator(
+    cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+    cache_path=os.getenv("EMBEDDING_CACHE_PATH") or None
+)
+embedding_batcher = EmbeddingBatcher(
+    embedding_generator,
+    max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+    max_wait_ms=float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+)
 vectorstore = VectorStore(index_path="./vector/index")
-rag_pipeline = RAGPipeline(
+rag_pipeline = HybridRAGPipeline(
     vectorstore=vectorstore,
     embedding_generator=embedding_generator,
     top_k=5,
-    rerank=True
+    rerank=True,
+    embedding_batcher=embedding_batcher,
+    result_cache=QueryResultCache(
+        max_entries=int(os.getenv("RAG_QUERY_CACHE_SIZE", "1000")),
+        ttl_seconds=float(os.getenv("RAG_QUERY_CACHE_TTL", "3600")),
+        similarity_threshold=float(os.getenv("RAG_QUERY_CACHE_SIMILARITY", "0")) or None
+    )
 )
 
 
@@ -72,7 +88,7 @@ class DocumentIngestResponse(BaseModel):
     status: str
     file_path: str
     chunks_created: int
-    doc_ids: List[str]
+    doc_ids: List[int]
     message: Optional[str] = None
 
 
@@ -145,8 +161,8 @@ async def search_documents(request: SearchRequest):
     Returns relevant document chunks without LLM generation.
     """
     try:
-        # Generate query embedding
-        query_embedding = embedding_generator.embed_text(request.query)
+        # Generate query embedding (micro-batched with concurrent requests)
+        query_embedding = await embedding_batcher.embed(request.query)
         
         # Search vectorstore
         results = vectorstore.search(
@@ -287,6 +303,9 @@ async def get_vectorstore_stats():
     """Get statistics about the vectorstore"""
     try:
         stats = vectorstore.get_stats()
+        stats["embedding_cache"] = embedding_generator.get_cache_stats()
+        stats["embedding_batcher"] = embedding_batcher.get_stats()
+        stats["query_cache"] = rag_pipeline.result_cache.get_stats()
         return stats
         
     except Exception as e:
@@ -298,19 +317,40 @@ async def get_vectorstore_stats():
 
 
 @router.delete("/document/{doc_id}")
-async def delete_document(doc_id: str):
+async def delete_document(doc_id: int, background_tasks: BackgroundTasks):
     """
-    Delete a document from the vectorstore.
+    Delete a document chunk from the vectorstore.
     
-    Note: This is a placeholder. Actual implementation would require
-    document tracking and deletion logic.
+    The chunk is tombstoned immediately, so it stops appearing in search
+    results. After the response is sent only the deleted bitmap is
+    saved; the store is rewritten once tombstones cross the compaction
+    threshold.
     """
-    # TODO: Implement document deletion
-    return {
-        "status": "not_implemented",
-        "doc_id": doc_id,
-        "message": "Document deletion not yet implemented"
-    }
+    try:
+        deleted = vectorstore.delete_documents([doc_id])
+        
+        if not deleted:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Document not found: {doc_id}"
+            )
+        
+        background_tasks.add_task(vectorstore.save_deletions)
+        
+        return {
+            "status": "deleted",
+            "doc_id": doc_id,
+            "message": "Document deleted from vectorstore"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting document {doc_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error deleting document: {str(e)}"
+        )
 
 
 @router.get("/documents")
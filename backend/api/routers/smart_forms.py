@@ -21,6 +21,7 @@ from api.models.smart_forms import (
 )
 from api.dependencies import get_current_active_user
 from api.services.pdf_generator import PDFGenerator
+from api.utils.executors import cpu_call
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -147,7 +148,7 @@ async def get_prefill_data(
 # ============================================================
 
 @router.post("/forms/{form_id}/submit")
-async def submit_form(
+def submit_form(
     form_id: str,
     submission: FormSubmission,
     db: Session = Depends(get_db),
@@ -296,7 +297,7 @@ async def submit_form(
 # ============================================================
 
 @router.post("/forms/{form_id}/draft")
-async def save_draft(
+def save_draft(
     form_id: str,
     data: Dict[str, Any],
     db: Session = Depends(get_db),
@@ -353,7 +354,7 @@ async def save_draft(
 
 
 @router.get("/forms/{form_id}/draft")
-async def get_draft(
+def get_draft(
     form_id: str,
     db: Session = Depends(get_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
@@ -502,6 +503,17 @@ def validate_form_data(
     )
 
 
+def get_context_task_id(data: Dict[str, Any]) -> Optional[int]:
+    """Task ID from the submission context, stored in FORM_SUBMISSIONS.task_id for indexed lookups"""
+    context = data.get('context')
+    if not isinstance(context, dict):
+        return None
+    try:
+        return int(context['taskId']) if context.get('taskId') is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 def save_form_submission(
     db: Session,
     form_id: str,
@@ -537,6 +549,7 @@ def save_form_submission(
                     form_title,
                     data_json,
                     attachments_json,
+                    task_id,
                     submitted_by,
                     submitted_at,
                     status,
@@ -552,6 +565,7 @@ def save_form_submission(
                     :form_title,
                     :data_json,
                     :attachments_json,
+                    :task_id,
                     :submitted_by,
                     GETDATE(),
                     'Submitted',
@@ -570,6 +584,7 @@ def save_form_submission(
                 "form_title": form_title,
                 "data_json": json.dumps(submission.data),
                 "attachments_json": attachments_json,
+                "task_id": get_context_task_id(submission.data),
                 "submitted_by": user_id,
                 "ip_address": submission.ip_address,
                 "user_agent": submission.user_agent
@@ -593,7 +608,9 @@ def save_form_submission(
                 filename = f"ACTA_{clean_title}_{submission_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
                 
                 # Generate
-                filepath, _, size_bytes = generator.generate_inspection_report(
+                # Rendering is CPU-bound; run it on the bounded CPU pool
+                filepath, _, size_bytes = cpu_call(
+                    generator.generate_inspection_report,
                     form_data=pdf_data,
                     schema_title=form_title,
                     user_name=f"Usuario {user_id}", # Idealmente obtener nombre real si posible
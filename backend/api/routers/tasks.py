@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, aliased
-from sqlalchemy import text, and_, or_
-from typing import List, Optional
+from sqlalchemy import text, bindparam, and_, or_, select, func, case
+from typing import List, Optional, Set, Tuple
 from datetime import date
 import logging
 
 from api.models import get_db, Base, AuthorizedUser
-from api.dependencies import get_current_active_user
+from api.database import AsyncDBSession, get_async_db
+from api.dependencies import get_current_active_user, get_current_principal
+from api.utils.principal_cache import Principal
 
 logger = logging.getLogger(__name__)
 
@@ -28,11 +30,36 @@ def get_empleado_model():
         raise HTTPException(status_code=500, detail="EMPLEADO table not found in database")
 
 
+# SQL Server allows ~2100 parameters per statement
+TASK_ID_CHUNK = 1000
+
+SUBMITTED_FORMS_QUERY = text("""
+    SELECT DISTINCT task_id, form_id FROM FORM_SUBMISSIONS
+    WHERE task_id IN :task_ids
+    AND status = 'Submitted'
+""").bindparams(bindparam("task_ids", expanding=True))
+
+
+def get_submitted_task_forms(db: Session, task_ids: List[int]) -> Set[Tuple[int, str]]:
+    """
+    Get the (task_id, form_id) pairs that have a submitted form.
+    Uses the indexed FORM_SUBMISSIONS.task_id column, one query per chunk of task IDs.
+    """
+    submitted = set()
+    unique_ids = sorted(set(task_ids))
+    for start in range(0, len(unique_ids), TASK_ID_CHUNK):
+        rows = db.execute(SUBMITTED_FORMS_QUERY, {
+            "task_ids": unique_ids[start:start + TASK_ID_CHUNK]
+        }).fetchall()
+        submitted.update((row[0], row[1]) for row in rows)
+    return submitted
+
+
 @router.get("/my-tasks")
-def get_my_tasks(
+async def get_my_tasks(
     status: Optional[str] = None,
     priority: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -45,29 +72,39 @@ def get_my_tasks(
         Empleado = get_empleado_model()
         
         # Build query - join with Empleado to filter by email
-        query = db.query(Tarea, Empleado).join(
+        query = select(Tarea, Empleado).join(
             Empleado, Tarea.id_empleado_responsable == Empleado.id_empleado
-        ).filter(
+        ).where(
             Empleado.Correo == current_user.Correo_Electronico
         )
         
         # Apply optional filters
         if status:
-            query = query.filter(Tarea.Estado == status)
+            query = query.where(Tarea.Estado == status)
         
         if priority:
-            query = query.filter(Tarea.Prioridad == priority)
+            query = query.where(Tarea.Prioridad == priority)
         
         # Order by priority and due date
-        tasks_data = query.order_by(
+        tasks_data = (await db.execute(query.order_by(
             Tarea.Fecha_Vencimiento.asc()
-        ).all()
-        
-        # Convert to dict and check form status
+        ))).all()
+        
+        # Resolve form status for all tasks at once
+        form_tasks = [
+            task.id_tarea for task, _ in tasks_data
+            if getattr(task, 'id_formulario', None) and getattr(task, 'requiere_formulario', True)
+        ]
+        submitted_forms = set()
+        if form_tasks:
+            try:
+                submitted_forms = await db.run_sync(get_submitted_task_forms, form_tasks)
+            except Exception as e:
+                logger.warning(f"Failed to check form submissions for {len(form_tasks)} tasks: {e}")
+
+        # Convert to dict
         result = []
         for task, emp in tasks_data:
-            # Check form submission if task requires form
-            form_submitted = False
             requires_form = False
             
             # Check if column exists (safe handling)
@@ -76,26 +113,12 @@ def get_my_tasks(
             elif hasattr(task, 'id_formulario') and task.id_formulario:
                 # Fallback: if id_formulario is present, assume required
                 requires_form = True
-                
-            if requires_form and hasattr(task, 'id_formulario') and task.id_formulario:
-                # Check if submission exists
-                # We use raw sql or model if available. Using raw SQL for safety against circular imports
-                # NOTE: task_id is stored inside data_json context
-                try:
-                    check_sql = text("""
-                        SELECT COUNT(*) FROM FORM_SUBMISSIONS 
-                        WHERE form_id = :form_id
-                        AND JSON_VALUE(data_json, '$.context.taskId') = CAST(:task_id AS NVARCHAR(50))
-                        AND status = 'Submitted'
-                    """)
-                    count = db.execute(check_sql, {
-                        "form_id": task.id_formulario,
-                        "task_id": task.id_tarea
-                    }).scalar()
-                    form_submitted = count > 0
-                except Exception as e:
-                    logger.warning(f"Failed to check form submission for task {task.id_tarea}: {e}")
-                    form_submitted = False
+
+            form_submitted = (
+                requires_form
+                and bool(getattr(task, 'id_formulario', None))
+                and (task.id_tarea, task.id_formulario) in submitted_forms
+            )
 
             result.append({
                 "id_tarea": task.id_tarea,
@@ -127,8 +150,8 @@ def get_my_tasks(
 
 
 @router.get("/stats")
-def get_task_stats(
-    db: Session = Depends(get_db),
+async def get_task_stats(
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """
@@ -138,23 +161,24 @@ def get_task_stats(
         Tarea = get_tarea_model()
         Empleado = get_empleado_model()
         
-        # Base filter for user's tasks
-        base_query = db.query(Tarea).join(
-            Empleado, Tarea.id_empleado_responsable == Empleado.id_empleado
-        ).filter(
-            Empleado.Correo == current_user.Correo_Electronico
-        )
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
         
-        # Count by status
-        pending = base_query.filter(Tarea.Estado == 'Pendiente').count()
-        in_progress = base_query.filter(Tarea.Estado == 'En Curso').count()
-        completed = base_query.filter(Tarea.Estado == 'Cerrada').count()
-        overdue = base_query.filter(
-            and_(
+        # Count by status in a single pass over the user's tasks
+        query = select(
+            count_where(Tarea.Estado == 'Pendiente'),
+            count_where(Tarea.Estado == 'En Curso'),
+            count_where(Tarea.Estado == 'Cerrada'),
+            count_where(and_(
                 Tarea.Estado != 'Cerrada',
                 Tarea.Fecha_Vencimiento < date.today()
-            )
-        ).count()
+            )),
+        ).select_from(Tarea).join(
+            Empleado, Tarea.id_empleado_responsable == Empleado.id_empleado
+        ).where(
+            Empleado.Correo == current_user.Correo_Electronico
+        )
+        pending, in_progress, completed, overdue = (await db.execute(query)).one()
         
         return {
             "pending": pending,
@@ -171,9 +195,9 @@ def get_task_stats(
 
 
 @router.get("/{task_id}/form-status")
-def get_task_form_status(
+async def get_task_form_status(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncDBSession = Depends(get_async_db),
     current_user: AuthorizedUser = Depends(get_current_active_user)
 ):
     """Check if task's required form has been submitted"""
@@ -184,7 +208,7 @@ def get_task_form_status(
         FROM TAREA WHERE id_tarea = :task_id
     """)
     
-    task_result = db.execute(task_query, {"task_id": task_id}).fetchone()
+    task_result = (await db.execute(task_query, {"task_id": task_id})).fetchone()
     if not task_result:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -204,11 +228,11 @@ def get_task_form_status(
         AND submitted_at >= :task_created
     """)
     
-    submission_count = db.execute(submission_query, {
+    submission_count = await db.scalar(submission_query, {
         "form_id": form_id,
         "user_email": current_user.Correo_Electronico,
         "task_created": task_created
-    }).scalar()
+    })
     
     return {
         "requires_form": True,
@@ -407,50 +431,43 @@ def assign_task(
 
 
 @router.get("/all")
-def get_all_tasks(
+async def get_all_tasks(
     status: Optional[str] = None,
     priority: Optional[str] = None,
     area: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
-    current_user: AuthorizedUser = Depends(get_current_active_user)
+    db: AsyncDBSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Get all tasks (admin only).
     For coordinators and CEOs to see all tasks in the system.
     """
     try:
-        # Verify admin permission
-        # Verify admin permission
-        is_admin = False
-        if current_user.id_rol:
-             from api.models import Role
-             name = db.query(Role.NombreRol).filter(Role.id_rol == current_user.id_rol).scalar()
-             is_admin = name in ['CEO', 'Coordinador SST']
-        else:
-             is_admin = current_user.Nivel_Acceso in ['CEO', 'Coordinador SST']
-
-        if not is_admin:
+        # Verify admin permission (role is resolved once per cached principal)
+        if not principal.has_role(['CEO', 'Coordinador SST']):
             raise HTTPException(status_code=403, detail="Only admins can view all tasks")
         
         Tarea = get_tarea_model()
         Empleado = get_empleado_model()
         
-        query = db.query(Tarea, Empleado).join(
+        query = select(Tarea, Empleado).join(
             Empleado, Tarea.id_empleado_responsable == Empleado.id_empleado
         )
         
         # Apply filters
         if status:
-            query = query.filter(Tarea.Estado == status)
+            query = query.where(Tarea.Estado == status)
         if priority:
-            query = query.filter(Tarea.Prioridad == priority)
+            query = query.where(Tarea.Prioridad == priority)
         if area:
-            query = query.filter(Empleado.Area == area)
+            query = query.where(Empleado.Area == area)
         
-        total = query.count()
-        tasks_data = query.order_by(Tarea.Fecha_Vencimiento.asc()).offset(skip).limit(limit).all()
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        tasks_data = (await db.execute(
+            query.order_by(Tarea.Fecha_Vencimiento.asc()).offset(skip).limit(limit)
+        )).all()
         
         result = []
         for task, emp in tasks_data:
@@ -482,32 +499,23 @@ def get_all_tasks(
 
 
 @router.get("/users")
-def get_assignable_users(
-    db: Session = Depends(get_db),
-    current_user: AuthorizedUser = Depends(get_current_active_user)
+async def get_assignable_users(
+    db: AsyncDBSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal)
 ):
     """
     Get list of users that can be assigned tasks.
     Only admins can access this endpoint.
     """
     try:
-        # Verify admin permission
-        # Verify admin permission
-        is_admin = False
-        if current_user.id_rol:
-             from api.models import Role
-             name = db.query(Role.NombreRol).filter(Role.id_rol == current_user.id_rol).scalar()
-             is_admin = name in ['CEO', 'Coordinador SST']
-        else:
-             is_admin = current_user.Nivel_Acceso in ['CEO', 'Coordinador SST']
-
-        if not is_admin:
+        # Verify admin permission (role is resolved once per cached principal)
+        if not principal.has_role(['CEO', 'Coordinador SST']):
             raise HTTPException(status_code=403, detail="Only admins can view users")
         
         Empleado = get_empleado_model()
         
         # Get active employees
-        users = db.query(Empleado).filter(Empleado.Estado == True).all()
+        users = (await db.scalars(select(Empleado).where(Empleado.Estado == True))).all()
         
         result = []
         for user in users:
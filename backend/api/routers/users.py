@@ -7,7 +7,7 @@ import logging
 from datetime import datetime
 
 from api.models import get_db, AuthorizedUser, Role
-from api.dependencies import get_current_active_user, RoleChecker
+from api.dependencies import get_current_active_user, RoleChecker, principal_cache
 from api.utils.security import get_password_hash
 
 logger = logging.getLogger(__name__)
@@ -29,6 +29,11 @@ class UserCreate(BaseModel):
     role_id: int
     password: str
 
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = None
+    role_id: Optional[int] = None
+    Estado: Optional[bool] = None
+
 class UserRead(BaseModel):
     id_autorizado: int
     Correo_Electronico: str
@@ -157,3 +162,56 @@ def create_user(
         db.rollback()
         logger.error(f"Error creating user: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{user_id}", response_model=UserRead)
+def update_user(
+    user_id: int,
+    user_in: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: AuthorizedUser = Depends(RoleChecker(["CEO", "Coordinador SST", "Gerente General"]))
+):
+    """Update name, role or state (deactivation) of a user (Admin only)"""
+    try:
+        user = db.query(AuthorizedUser).filter(AuthorizedUser.id_autorizado == user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        role = None
+        if user_in.role_id is not None:
+            role = db.query(Role).filter(Role.id_rol == user_in.role_id).first()
+            if not role:
+                raise HTTPException(status_code=400, detail="Invalid Role ID")
+            user.id_rol = role.id_rol
+            user.Nivel_Acceso = role.NombreRol # Keep synced for legacy
+            user.PuedeAprobar = 1 if "Coordinador" in role.NombreRol or "CEO" in role.NombreRol else 0
+        elif user.id_rol:
+            role = db.query(Role).filter(Role.id_rol == user.id_rol).first()
+        
+        if user_in.full_name is not None:
+            user.Nombre_Persona = user_in.full_name
+        if user_in.Estado is not None:
+            user.Estado = user_in.Estado
+        
+        db.commit()
+        db.refresh(user)
+        
+        # Cached sessions of this user must see the new role/state right away
+        principal_cache.invalidate_user(user.Correo_Electronico)
+        
+        return UserRead(
+            id_autorizado=user.id_autorizado,
+            Correo_Electronico=user.Correo_Electronico,
+            Nombre_Persona=user.Nombre_Persona,
+            Nivel_Acceso=user.Nivel_Acceso,
+            Estado=user.Estado if user.Estado is not None else False,
+            FechaRegistro=user.FechaRegistro,
+            Role=role
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error updating user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,123 @@
+"""
+Executors
+Managed pools for work that must not run on the event loop:
+
+    cpu  Password hashing and PDF rendering. Bounded to the CPU count,
+         with at most ``CPU_QUEUE_FACTOR`` jobs per worker in flight, so a
+         login storm queues instead of piling up threads.
+    db   Blocking SQLAlchemy calls made from ``async def`` handlers,
+         sized to the OLTP connection pool so threads never wait on it.
+
+bcrypt releases the GIL while hashing, so threads give real parallelism
+for logins; PDF rendering is mostly Python and mainly gains from being
+off the event loop.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+import asyncio
+import functools
+import logging
+import os
+import threading
+
+from api.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CPU_QUEUE_FACTOR = 4
+
+
+class ManagedExecutor:
+    """Thread pool with a cap on queued jobs and basic counters."""
+
+    def __init__(self, name: str, max_workers: int, max_pending: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * CPU_QUEUE_FACTOR
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._async_slots: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._counter_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+
+    def _wrap(self, func: Callable[..., T], args, kwargs) -> Callable[[], T]:
+        call = functools.partial(func, *args, **kwargs)
+
+        def run():
+            try:
+                return call()
+            finally:
+                with self._counter_lock:
+                    self.completed += 1
+
+        return run
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Await ``func(*args, **kwargs)`` on the pool; waits for a slot when the queue is full."""
+        loop = asyncio.get_running_loop()
+        slots = self._async_slots.get(loop)
+        if slots is None:
+            slots = self._async_slots.setdefault(loop, asyncio.Semaphore(self.max_pending))
+        async with slots:
+            with self._counter_lock:
+                self.submitted += 1
+            return await loop.run_in_executor(self._executor, self._wrap(func, args, kwargs))
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run ``func`` on the pool from synchronous code (e.g. a worker thread) and wait for it."""
+        with self._slots:
+            with self._counter_lock:
+                self.submitted += 1
+            return self._executor.submit(self._wrap(func, args, kwargs)).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "in_flight": self.submitted - self.completed,
+        }
+
+
+def _db_pool_size() -> int:
+    database = get_settings().database
+    oltp = database.pools.get("oltp")
+    if oltp is not None:
+        return oltp.pool_size + oltp.max_overflow
+    return database.pool_size + database.max_overflow
+
+
+cpu_executor = ManagedExecutor("cpu", max_workers=os.cpu_count() or 2)
+db_executor = ManagedExecutor("db", max_workers=_db_pool_size())
+
+
+async def run_cpu(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run CPU-bound work (hashing, rendering) off the event loop."""
+    return await cpu_executor.run(func, *args, **kwargs)
+
+
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run blocking database work off the event loop."""
+    return await db_executor.run(func, *args, **kwargs)
+
+
+def cpu_call(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run CPU-bound work on the bounded CPU pool from synchronous code."""
+    return cpu_executor.call(func, *args, **kwargs)
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    return {"cpu": cpu_executor.get_stats(), "db": db_executor.get_stats()}
+
+
+def shutdown_executors():
+    cpu_executor.shutdown()
+    db_executor.shutdown()
@@ -0,0 +1,168 @@
+"""
+Pagination and Export Helpers
+Keyset cursors, count modes and streaming table export for the CRUD router.
+"""
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select, and_, or_, text
+from typing import Any, Dict, Iterator, List, Optional
+import base64
+import csv
+import io
+import json
+import logging
+import orjson
+
+from api.utils.serializers import get_serializer, serialize_rows
+
+logger = logging.getLogger(__name__)
+
+
+# Count modes for paginated listings
+COUNT_MODES = ("exact", "approximate", "none")
+
+# Rows fetched per round-trip while streaming an export
+EXPORT_BATCH_SIZE = 500
+
+
+def encode_cursor(table_name: str, pk_values: List[Any]) -> str:
+    """Opaque continuation token holding the last primary key returned."""
+    payload = json.dumps({"t": table_name, "k": pk_values}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(table_name: str, cursor: str, pk_count: int) -> List[Any]:
+    """Primary key values stored in a cursor issued for ``table_name``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["k"]
+        if payload["t"] != table_name or len(values) != pk_count:
+            raise ValueError("cursor does not belong to this table")
+        return values
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def apply_filters(Model, query, filters: Optional[Dict[str, Any]]):
+    """Equality filters on the columns that exist in the model (Query or select())."""
+    for key, value in (filters or {}).items():
+        if hasattr(Model, key):
+            query = query.where(getattr(Model, key) == value)
+    return query
+
+
+def after_key(pk_columns, values: List[Any]):
+    """
+    Keyset predicate "primary key > values" in primary-key order.
+    SQL Server has no row-value comparison, so composite keys expand to
+    (a > x) OR (a = x AND b > y) ...
+    """
+    terms = []
+    for i, column in enumerate(pk_columns):
+        equal = [pk_columns[j] == values[j] for j in range(i)]
+        terms.append(and_(*equal, column > values[i]))
+    return or_(*terms)
+
+
+def approximate_count(db: Session, Model) -> Optional[int]:
+    """Row count from the catalog (no table scan); None if unavailable."""
+    table = Model.__table__
+    name = f"{table.schema}.{table.name}" if table.schema else table.name
+    try:
+        return db.execute(text("""
+            SELECT SUM(p.rows) FROM sys.partitions p
+            WHERE p.object_id = OBJECT_ID(:name) AND p.index_id IN (0, 1)
+        """), {"name": name}).scalar()
+    except Exception as e:
+        logger.warning(f"Approximate count unavailable for {name}: {e}")
+        return None
+
+
+def paginate(
+    db: Session,
+    Model,
+    table_name: str,
+    query,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    count: str,
+    filtered: bool
+) -> Dict[str, Any]:
+    """
+    One page of ``query`` ordered by primary key.
+
+    With ``cursor`` the page starts after the key it encodes (keyset
+    pagination, constant cost at any depth); otherwise ``skip`` is used
+    as an OFFSET. ``next_cursor`` is None on the last page.
+
+    ``count`` selects how ``total`` is computed: "exact" runs COUNT(*),
+    "approximate" reads the catalog row count (unfiltered listings only;
+    filtered queries report None), "none" skips it.
+    """
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {', '.join(COUNT_MODES)}")
+
+    pk_columns = list(inspect(Model).primary_key)
+
+    total = None
+    if count == "exact":
+        total = query.count()
+    elif count == "approximate" and not filtered:
+        total = approximate_count(db, Model)
+
+    page = query.order_by(*pk_columns)
+    if cursor:
+        page = page.filter(after_key(pk_columns, decode_cursor(table_name, cursor, len(pk_columns))))
+    elif skip:
+        page = page.offset(skip)
+
+    # One extra row tells whether another page exists
+    items = page.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(table_name, [getattr(last, column.key) for column in pk_columns])
+
+    return {
+        "total": total,
+        "total_is_approximate": count == "approximate" and total is not None,
+        "skip": 0 if cursor else skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "items": serialize_rows(items)
+    }
+
+
+def export_rows(session: Session, Model, filters: Optional[Dict[str, Any]], format: str) -> Iterator[Any]:
+    """
+    Stream a table as NDJSON lines or CSV text, ``EXPORT_BATCH_SIZE`` rows
+    per database round-trip; CSV is yielded in blocks of that many rows
+    after a single header line.
+    """
+    pk_columns = list(inspect(Model).primary_key)
+    serialize = get_serializer(Model)
+    query = apply_filters(Model, select(Model), filters).order_by(*pk_columns)
+    rows = session.scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+    if format == "ndjson":
+        for item in rows:
+            yield orjson.dumps(serialize(item), option=orjson.OPT_APPEND_NEWLINE)
+        return
+
+    columns = [column.key for column in inspect(Model).column_attrs]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for i, item in enumerate(rows, start=1):
+        writer.writerow(serialize(item))
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
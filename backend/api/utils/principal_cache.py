@@ -0,0 +1,119 @@
+"""
+Principal Cache
+Short-lived cache of authenticated users so token validation does not hit
+the database on every request.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user (detached from any session) with its resolved role."""
+    user: Any
+    role_name: Optional[str]
+
+    @property
+    def email(self) -> str:
+        return self.user.Correo_Electronico
+
+    @property
+    def active(self) -> bool:
+        return bool(self.user.Estado)
+
+    def has_role(self, allowed_roles) -> bool:
+        """Role check against ROL.NombreRol, or legacy Nivel_Acceso when no role is assigned."""
+        if self.user.id_rol:
+            return self.role_name in allowed_roles
+        return self.user.Nivel_Acceso in allowed_roles
+
+
+def token_id(payload: Dict[str, Any], token: str) -> str:
+    """The token's ``jti``, or a hash of the token for tokens issued without one."""
+    jti = payload.get("jti")
+    if jti:
+        return str(jti)
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PrincipalCache:
+    """
+    Thread-safe, size-bounded TTL cache of principals keyed by
+    ``(sub, jti)``.
+
+    Entries never outlive their token's ``exp``. ``invalidate_user``
+    drops every cached token of a user; call it whenever the user's
+    role, state or credentials change.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject: str, jti: str) -> Optional[Principal]:
+        key = (subject.lower(), jti)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, subject: str, jti: str, principal: Principal, token_exp: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        with self._lock:
+            self._entries[(subject.lower(), jti)] = (principal, expires_at)
+            self._entries.move_to_end((subject.lower(), jti))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, subject: str) -> int:
+        """Drop all cached tokens of a user; returns how many were dropped."""
+        subject = subject.lower()
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == subject]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                self.invalidations += 1
+        if keys:
+            logger.info(f"Principal cache invalidated for {subject} ({len(keys)} tokens)")
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,183 @@
+"""
+Schema Reflection Cache
+Persists the reflected SQLAlchemy MetaData to disk so API workers and
+scripts can boot without a full catalog round-trip.
+"""
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Engine
+from typing import Callable, Iterable, List, Optional
+from pathlib import Path
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# User tables plus the constraints automap derives relationships from
+FINGERPRINT_SQL = text("""
+    SELECT o.name, o.type, CONVERT(varchar(33), o.modify_date, 126)
+    FROM sys.objects o
+    WHERE o.is_ms_shipped = 0 AND o.type IN ('U', 'PK', 'UQ', 'F')
+    ORDER BY o.name, o.type
+""")
+
+
+def schema_fingerprint(engine: Engine) -> str:
+    """Hash of the name, type and modify_date of every user table and key constraint."""
+    digest = hashlib.sha256()
+    with engine.connect() as conn:
+        for name, obj_type, modified in conn.execute(FINGERPRINT_SQL):
+            digest.update(f"{name}|{obj_type.strip()}|{modified}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def tables_key(tables: Optional[Iterable[str]]) -> str:
+    """Stable key for the set of reflected tables (``*`` means all)."""
+    return ",".join(sorted(tables)) if tables else "*"
+
+
+class SchemaSnapshot:
+    """
+    Pickled MetaData snapshot stored next to the fingerprint it was
+    reflected against.
+
+    A snapshot is only reused when it was written by the same snapshot
+    format and SQLAlchemy version for the same set of tables.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def load(self, tables: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """Return ``{"fingerprint", "metadata"}`` or None if missing or incompatible."""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable schema snapshot {self.path}: {e}")
+            return None
+
+        if (
+            payload.get("version") != SNAPSHOT_VERSION
+            or payload.get("sqlalchemy") != sqlalchemy.__version__
+            or payload.get("tables") != tables_key(tables)
+        ):
+            logger.info(f"Schema snapshot {self.path} is from another build; ignoring it")
+            return None
+        return payload
+
+    def save(self, metadata: MetaData, fingerprint: str, tables: Optional[Iterable[str]] = None):
+        """Write the snapshot atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "sqlalchemy": sqlalchemy.__version__,
+            "tables": tables_key(tables),
+            "fingerprint": fingerprint,
+            "metadata": metadata,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def reflect_metadata(engine: Engine, tables: Optional[List[str]] = None) -> MetaData:
+    """Reflect the given tables (and the tables their foreign keys point to)."""
+    metadata = MetaData()
+    metadata.reflect(engine, only=tables or None)
+    return metadata
+
+
+def load_metadata(
+    engine: Engine,
+    tables: Optional[List[str]] = None,
+    cache_path: Optional[str] = None,
+    revalidate: bool = True,
+    fingerprint: Callable[[Engine], str] = schema_fingerprint,
+) -> MetaData:
+    """
+    Get reflected MetaData, from the on-disk snapshot when possible.
+
+    With a usable snapshot the MetaData is returned without touching
+    the database; if ``revalidate`` is set, a daemon thread then compares
+    the live schema fingerprint with the snapshot's and re-reflects and
+    rewrites the snapshot when they differ. The running process keeps
+    the mappings it booted with, so schema changes take effect on the
+    next start.
+
+    Without a snapshot (or with ``cache_path`` unset) the schema is
+    reflected synchronously and, if caching is on, saved.
+
+    Args:
+        engine: Engine to reflect from
+        tables: Table names to reflect; None reflects the whole schema
+        cache_path: Snapshot file; None disables the cache
+        revalidate: Check the snapshot against the live schema in the background
+        fingerprint: Function computing the schema fingerprint
+
+    Returns:
+        Reflected MetaData
+    """
+    if not cache_path:
+        return reflect_metadata(engine, tables)
+
+    snapshot = SchemaSnapshot(cache_path)
+    cached = snapshot.load(tables)
+
+    if cached is not None:
+        logger.info(f"Loaded schema snapshot with {len(cached['metadata'].tables)} tables from {cache_path}")
+        if revalidate:
+            threading.Thread(
+                target=_revalidate,
+                args=(engine, tables, snapshot, cached["fingerprint"], fingerprint),
+                name="schema-revalidate",
+                daemon=True,
+            ).start()
+        return cached["metadata"]
+
+    current = fingerprint(engine)
+    metadata = reflect_metadata(engine, tables)
+    try:
+        snapshot.save(metadata, current, tables)
+        logger.info(f"Reflected {len(metadata.tables)} tables; snapshot written to {cache_path}")
+    except Exception as e:
+        logger.warning(f"Could not write schema snapshot {cache_path}: {e}")
+    return metadata
+
+
+def _revalidate(
+    engine: Engine,
+    tables: Optional[List[str]],
+    snapshot: SchemaSnapshot,
+    cached_fingerprint: str,
+    fingerprint: Callable[[Engine], str],
+):
+    try:
+        current = fingerprint(engine)
+        if current == cached_fingerprint:
+            logger.debug("Schema snapshot is up to date")
+            return
+        metadata = reflect_metadata(engine, tables)
+        snapshot.save(metadata, current, tables)
+        logger.warning(
+            "Database schema changed since the snapshot was taken; snapshot refreshed, "
+            "restart the API to pick up the new mappings"
+        )
+    except Exception as e:
+        logger.warning(f"Schema snapshot revalidation failed: {e}")
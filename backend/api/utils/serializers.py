@@ -0,0 +1,108 @@
+"""
+Row Serializers
+Precompiled, cached row-to-dict functions for automapped model classes.
+"""
+
+from sqlalchemy import inspect, LargeBinary
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime, time
+from decimal import Decimal
+import base64
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+RowSerializer = Callable[[Any], Dict[str, Any]]
+
+_serializers: Dict[type, RowSerializer] = {}
+
+
+def _decimal(value: Decimal):
+    # Same rule as FastAPI's jsonable_encoder: integral decimals become int
+    return int(value) if value.as_tuple().exponent >= 0 else float(value)
+
+
+def _decimal_converter(column_type) -> Callable[[Decimal], Any]:
+    """Resolve int vs float from the column's declared scale when it has one."""
+    scale = getattr(column_type, "scale", None)
+    if scale is None:
+        return _decimal
+    return int if scale == 0 else float
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _base64(value: bytes) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+
+def _converter_for(column) -> Optional[Callable[[Any], Any]]:
+    """JSON converter for a column's values, or None if they are JSON-native."""
+    if isinstance(column.type, LargeBinary):
+        return _base64
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if issubclass(python_type, (datetime, date, time)):
+        return _isoformat
+    if issubclass(python_type, Decimal):
+        if not getattr(column.type, "asdecimal", True):
+            return None
+        return _decimal_converter(column.type)
+    if issubclass(python_type, uuid.UUID):
+        return str
+    return None
+
+
+def build_serializer(model_class) -> RowSerializer:
+    """
+    Build the row serializer for a mapped class.
+
+    Column keys and converters are resolved once; serializing a row
+    reads the loaded values straight from the instance ``__dict__``
+    (falling back to attribute access for expired or unloaded columns)
+    and converts only the date, decimal, UUID and binary columns.
+    """
+    attrs = list(inspect(model_class).column_attrs)
+    keys = tuple(attr.key for attr in attrs)
+    converters: List[Tuple[str, Callable[[Any], Any]]] = []
+    for attr in attrs:
+        converter = _converter_for(attr.columns[0])
+        if converter is not None:
+            converters.append((attr.key, converter))
+
+    def serialize(instance) -> Dict[str, Any]:
+        state = instance.__dict__
+        try:
+            row = {key: state[key] for key in keys}
+        except KeyError:
+            row = {key: getattr(instance, key) for key in keys}
+        for key, converter in converters:
+            value = row[key]
+            if value is not None:
+                row[key] = converter(value)
+        return row
+
+    return serialize
+
+
+def get_serializer(model_class) -> RowSerializer:
+    """Cached serializer for a mapped class, built on first use."""
+    serializer = _serializers.get(model_class)
+    if serializer is None:
+        serializer = build_serializer(model_class)
+        _serializers[model_class] = serializer
+        logger.debug(f"Built row serializer for {model_class.__name__}")
+    return serializer
+
+
+def serialize_rows(rows: List[Any]) -> List[Dict[str, Any]]:
+    """Serialize a list of instances of the same class."""
+    if not rows:
+        return []
+    serializer = get_serializer(type(rows[0]))
+    return [serializer(row) for row in rows]
@@ -0,0 +1,291 @@
+"""
+Agent Job Queue
+
+Runs agent tasks in the background so HTTP requests return as soon as
+the job is recorded. Jobs execute on a bounded pool of asyncio workers
+in the process that accepted them; their status, progress and result
+live in a ``JobStore`` that every process can read.
+
+Scheduling is round-robin across users, with a cap on how many jobs one
+user can have running or queued, so a burst from one user does not
+starve the others.
+
+Cancellation works for queued and running jobs. A job running in
+another process is flagged in the store and cancelled by its owner on
+the next heartbeat.
+"""
+
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from agents.events import bind_stream, TOOL_END
+from orchestrator.job_store import JobStore, QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFull(Exception):
+    """The user already has the maximum number of jobs queued."""
+
+
+class _JobProgress:
+    """
+    Event sink for a running job: counts finished tool calls and writes
+    progress to the store at most once per ``interval`` seconds.
+    
+    Nobody reads tokens of a background job, so it does not ask for them
+    and LLM calls use ``complete()`` (and its cache).
+    """
+    
+    streams_tokens = False
+
+    def __init__(self, queue: "AgentJobQueue", job_id: str, interval: float = 1.0):
+        self.queue = queue
+        self.job_id = job_id
+        self.interval = interval
+        self.steps = 0
+        self.written = 0.0
+
+    async def publish(self, event: str, **data):
+        if event != TOOL_END:
+            return
+        self.steps += 1
+        now = time.monotonic()
+        if now - self.written < self.interval:
+            return
+        self.written = now
+        # Agents do not report a total; approach 95% as tool calls accumulate
+        progress = min(95.0, 5.0 + 90.0 * self.steps / self.queue.expected_steps)
+        await self.queue._store(
+            self.queue.store.update, self.job_id,
+            progress=progress, steps=self.steps, last_event=data.get("endpoint") or event
+        )
+
+
+class AgentJobQueue:
+    """
+    Bounded worker pool for agent jobs.
+
+    ``runner(job)`` does the actual work and returns the result dict.
+    The queue binds to the event loop it is started on.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: JobRunner,
+        max_workers: int = 4,
+        max_running_per_user: int = 2,
+        max_queued_per_user: int = 20,
+        heartbeat_seconds: float = 5.0,
+        stale_seconds: float = 120.0,
+        expected_steps: int = 10
+    ):
+        self.store = store
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_running_per_user = max_running_per_user
+        self.max_queued_per_user = max_queued_per_user
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.expected_steps = expected_steps
+        # Random suffix: a restarted process must not adopt its predecessor's jobs
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pending: Dict[int, Deque[Dict[str, Any]]] = {}
+        self._users: Deque[int] = deque()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._running_per_user: Dict[int, int] = defaultdict(int)
+        self._condition: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        # One thread: store writes are small and stay ordered
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-job-store")
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    async def _store(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    # ============================================
+    # Lifecycle
+    # ============================================
+
+    def _ensure_started(self):
+        if self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        self._condition = asyncio.Condition()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.max_workers)]
+        self._workers.append(loop.create_task(self._heartbeat()))
+        logger.info(f"Agent job queue started with {self.max_workers} workers ({self.worker_id})")
+
+    async def close(self):
+        """Stop the workers; running and queued jobs end as cancelled."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for task in self._running.values():
+            task.cancel()
+        if self._running:
+            await asyncio.wait(list(self._running.values()))
+        for jobs in self._pending.values():
+            for job in jobs:
+                await self._store(self.store.finish, job["job_id"], CANCELLED, error="Server shutdown")
+        self._pending.clear()
+        self._users.clear()
+        self._executor.shutdown(wait=False)
+
+    # ============================================
+    # Public API
+    # ============================================
+
+    async def enqueue(
+        self,
+        user_id: int,
+        agent_name: str,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Record a job and queue it; returns without waiting for it to run.
+
+        Raises:
+            JobQueueFull: the user has ``max_queued_per_user`` jobs waiting
+        """
+        self._ensure_started()
+        if len(self._pending.get(user_id, ())) >= self.max_queued_per_user:
+            raise JobQueueFull(f"User {user_id} already has {self.max_queued_per_user} queued jobs")
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "agent_name": agent_name,
+            "task": task,
+            "session_id": session_id,
+            "context": context or {},
+            "status": QUEUED,
+            "worker_id": self.worker_id,
+        }
+        await self._store(self.store.create, job)
+
+        async with self._condition:
+            if user_id not in self._pending:
+                self._pending[user_id] = deque()
+                self._users.append(user_id)
+            self._pending[user_id].append(job)
+            self._condition.notify()
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it is unknown or already finished."""
+        for user_id, jobs in list(self._pending.items()):
+            for job in jobs:
+                if job["job_id"] == job_id:
+                    jobs.remove(job)
+                    if not jobs:
+                        del self._pending[user_id]
+                        self._users.remove(user_id)
+                    self.cancelled += 1
+                    return await self._store(self.store.finish, job_id, CANCELLED, error="Cancelled")
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            return True
+
+        # Owned by another process: its heartbeat picks the flag up
+        return await self._store(self.store.request_cancel, job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._store(self.store.get, job_id)
+
+    async def history(self, user_id: int, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        return await self._store(self.store.list_for_user, user_id, limit, offset)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "max_workers": self.max_workers,
+            "running": len(self._running),
+            "queued": sum(len(jobs) for jobs in self._pending.values()),
+            "users_waiting": len(self._users),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+    # ============================================
+    # Workers
+    # ============================================
+
+    def _pick(self) -> Optional[Dict[str, Any]]:
+        """Next job, taking users in turn and skipping those at their running cap."""
+        for _ in range(len(self._users)):
+            user_id = self._users[0]
+            self._users.rotate(-1)
+            if self._running_per_user[user_id] >= self.max_running_per_user:
+                continue
+            jobs = self._pending[user_id]
+            job = jobs.popleft()
+            if not jobs:
+                del self._pending[user_id]
+                self._users.remove(user_id)
+            self._running_per_user[user_id] += 1
+            return job
+        return None
+
+    async def _work(self):
+        while True:
+            async with self._condition:
+                job = self._pick()
+                while job is None:
+                    await self._condition.wait()
+                    job = self._pick()
+            task = asyncio.get_running_loop().create_task(self._execute(job))
+            self._running[job["job_id"]] = task
+            # wait() instead of await: a cancelled job must not cancel the worker
+            await asyncio.wait([task])
+
+    async def _execute(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        try:
+            await self._store(self.store.update, job_id, status=RUNNING, started_at=time.time(), progress=5.0)
+            bind_stream(_JobProgress(self, job_id))
+            result = await self.runner(job)
+            await self._store(self.store.finish, job_id, COMPLETED, result=result)
+            self.completed += 1
+        except asyncio.CancelledError:
+            await self._store(self.store.finish, job_id, CANCELLED, error="Cancelled")
+            self.cancelled += 1
+        except Exception as e:
+            logger.error(f"Agent job {job_id} failed: {e}")
+            await self._store(self.store.finish, job_id, FAILED, error=str(e))
+            self.failed += 1
+        finally:
+            self._running.pop(job_id, None)
+            self._running_per_user[job["user_id"]] -= 1
+            async with self._condition:
+                self._condition.notify_all()
+
+    async def _heartbeat(self):
+        """Keep this worker's jobs alive in the store, apply remote cancels, fail orphans."""
+        while True:
+            try:
+                for job_id in await self._store(self.store.heartbeat, self.worker_id):
+                    await self.cancel(job_id)
+                await self._store(self.store.fail_stale, self.stale_seconds)
+            except Exception as e:
+                logger.error(f"Agent job heartbeat failed: {e}")
+            await asyncio.sleep(self.heartbeat_seconds)
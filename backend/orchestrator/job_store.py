@@ -0,0 +1,218 @@
+"""
+Agent Job Store
+
+Durable status, progress and results of background agent jobs, shared
+by every API worker. One implementation over SQLAlchemy serves both
+deployments:
+
+    sqlite     Local file, table created on first use
+    sqlserver  AGENT_JOB table on the agent connection pool
+               (BD/add_agent_job.sql)
+
+Timestamps are epoch seconds (FLOAT) so both backends compare them the
+same way. The agent engine runs SET NOCOUNT ON, so on SQL Server the rows
+a write changed come from @@ROWCOUNT rather than the cursor's rowcount.
+"""
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pathlib import Path
+import logging
+import time
+
+import orjson
+
+from agents.events import json_default
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS AGENT_JOB (
+    job_id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    agent_name TEXT NOT NULL,
+    task TEXT NOT NULL,
+    session_id TEXT,
+    context_json TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    steps INTEGER NOT NULL DEFAULT 0,
+    last_event TEXT,
+    result_json TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+)
+"""
+
+SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS IX_AGENT_JOB_user ON AGENT_JOB (user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS IX_AGENT_JOB_status ON AGENT_JOB (status, worker_id)",
+]
+
+COLUMNS = (
+    "job_id", "user_id", "agent_name", "task", "session_id", "context_json", "status",
+    "progress", "steps", "last_event", "result_json", "error", "cancel_requested",
+    "worker_id", "created_at", "started_at", "finished_at", "heartbeat_at",
+)
+_SELECT = f"SELECT {', '.join(COLUMNS)} FROM AGENT_JOB"
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else orjson.dumps(value, default=json_default).decode()
+
+
+def _iso(epoch: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(epoch).isoformat() if epoch else None
+
+
+class JobStore:
+    """
+    AGENT_JOB table access. Methods block; call them off the event loop.
+    """
+
+    def __init__(self, engine: Engine, create_schema: bool = False):
+        self.engine = engine
+        if create_schema:
+            with engine.begin() as conn:
+                conn.execute(text(SQLITE_SCHEMA))
+                for statement in SQLITE_INDEXES:
+                    conn.execute(text(statement))
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        job = dict(zip(COLUMNS, row))
+        context_json, result_json = job.pop("context_json"), job.pop("result_json")
+        job["context"] = orjson.loads(context_json) if context_json else {}
+        job["result"] = orjson.loads(result_json) if result_json else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        for key in ("created_at", "started_at", "finished_at", "heartbeat_at"):
+            job[key] = _iso(job[key])
+        return job
+
+    def _changed(self, conn, sql: str, params: Dict[str, Any]) -> int:
+        """Run a write and return how many rows it changed."""
+        if self.engine.dialect.name == "mssql":
+            return conn.execute(text(f"SET NOCOUNT ON; {sql}; SELECT @@ROWCOUNT"), params).scalar() or 0
+        return conn.execute(text(sql), params).rowcount
+
+    def create(self, job: Dict[str, Any]):
+        row = {column: job.get(column) for column in COLUMNS}
+        row["context_json"] = _dumps(job.get("context"))
+        row["result_json"] = None
+        row["progress"] = job.get("progress", 0.0)
+        row["steps"] = 0
+        row["cancel_requested"] = 0
+        row["created_at"] = row["heartbeat_at"] = time.time()
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(f"INSERT INTO AGENT_JOB ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)})"),
+                row
+            )
+
+    def update(self, job_id: str, **fields):
+        """Set columns of a job; ``result`` is stored as JSON."""
+        if "result" in fields:
+            fields["result_json"] = _dumps(fields.pop("result"))
+        assignments = ", ".join(f"{column} = :{column}" for column in fields)
+        with self.engine.begin() as conn:
+            conn.execute(text(f"UPDATE AGENT_JOB SET {assignments} WHERE job_id = :job_id"), {**fields, "job_id": job_id})
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+        """Move an active job to a final status; False if it had already finished."""
+        with self.engine.begin() as conn:
+            updated = self._changed(
+                conn,
+                "UPDATE AGENT_JOB SET status = :status, result_json = :result, error = :error,"
+                " finished_at = :now, progress = CASE WHEN :status = 'completed' THEN 100 ELSE progress END"
+                " WHERE job_id = :job_id AND status IN ('queued', 'running')",
+                {"status": status, "result": _dumps(result), "error": error, "now": time.time(), "job_id": job_id}
+            )
+            return updated > 0
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(text(f"{_SELECT} WHERE job_id = :job_id"), {"job_id": job_id}).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_for_user(self, user_id: int, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        if self.engine.dialect.name == "mssql":
+            page = "OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY"
+        else:
+            page = "LIMIT :limit OFFSET :offset"
+        params = {"user_id": user_id, "limit": limit, "offset": offset}
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                text(f"{_SELECT} WHERE user_id = :user_id ORDER BY created_at DESC {page}"), params
+            ).fetchall()
+            total = conn.execute(text("SELECT COUNT(*) FROM AGENT_JOB WHERE user_id = :user_id"), params).scalar()
+        return {"jobs": [self._row_to_job(row) for row in rows], "total": total}
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag an active job for cancellation by whichever worker owns it."""
+        with self.engine.begin() as conn:
+            updated = self._changed(
+                conn,
+                "UPDATE AGENT_JOB SET cancel_requested = 1"
+                " WHERE job_id = :job_id AND status IN ('queued', 'running')",
+                {"job_id": job_id}
+            )
+            return updated > 0
+
+    def heartbeat(self, worker_id: str) -> List[str]:
+        """Refresh this worker's active jobs; returns those flagged for cancellation."""
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "UPDATE AGENT_JOB SET heartbeat_at = :now"
+                    " WHERE worker_id = :worker_id AND status IN ('queued', 'running')"
+                ),
+                {"now": time.time(), "worker_id": worker_id}
+            )
+            rows = conn.execute(
+                text(
+                    "SELECT job_id FROM AGENT_JOB WHERE worker_id = :worker_id"
+                    " AND cancel_requested = 1 AND status IN ('queued', 'running')"
+                ),
+                {"worker_id": worker_id}
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def fail_stale(self, stale_seconds: float) -> int:
+        """Fail active jobs whose worker stopped sending heartbeats (restart, crash)."""
+        now = time.time()
+        with self.engine.begin() as conn:
+            updated = self._changed(
+                conn,
+                "UPDATE AGENT_JOB SET status = 'failed', finished_at = :now,"
+                " error = 'Interrupted: the worker running this job stopped'"
+                " WHERE status IN ('queued', 'running') AND heartbeat_at < :cutoff",
+                {"now": now, "cutoff": now - stale_seconds}
+            )
+        if updated:
+            logger.warning(f"Marked {updated} stale agent jobs as failed")
+        return updated
+
+
+def create_job_store(backend: str, path: str = "data/agent_jobs.db") -> JobStore:
+    """Store for ``[agents] job_store``: sqlite (file at ``path``) or sqlserver."""
+    if backend == "sqlserver":
+        from api.database.engines import get_engine, AGENT
+        return JobStore(get_engine(AGENT))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    return JobStore(engine, create_schema=True)
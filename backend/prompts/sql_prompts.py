@@ -1,12 +1,11 @@
 """
 Prompt templates for SQL generation.
-"""
-
-from langchain.prompts import PromptTemplate
 
-SQL_GENERATION_TEMPLATE = """{schema_context}
+The schema context goes in the system message and the templates below
+in the user message, so every request shares the same system prompt.
+"""
 
-USER QUESTION: {question}
+SQL_GENERATION_TEMPLATE = """USER QUESTION: {question}
 
 INSTRUCTIONS:
 1. Write a T-SQL query to answer the question.
@@ -17,14 +16,7 @@ INSTRUCTIONS:
 
 SQL QUERY:"""
 
-SQL_PROMPT = PromptTemplate(
-    input_variables=["schema_context", "question"],
-    template=SQL_GENERATION_TEMPLATE
-)
-
-SQL_INSERTION_TEMPLATE = """{schema_context}
-
-CONSTRAINTS & RULES (CRITICAL):
+SQL_INSERTION_TEMPLATE = """CONSTRAINTS & RULES (CRITICAL):
 {constraints_context}
 
 USER REQUEST: {question}
@@ -39,8 +31,3 @@ INSTRUCTIONS:
 4. Only return the SQL query or the MISSING_INFO message. No markdown.
 
 SQL QUERY:"""
-
-SQL_INSERTION_PROMPT = PromptTemplate(
-    input_variables=["schema_context", "constraints_context", "question"],
-    template=SQL_INSERTION_TEMPLATE
-)
@@ -0,0 +1,170 @@
+"""
+Approximate Nearest Neighbour Index
+
+IVF (inverted file) index used by the vector store once the corpus
+grows past the point where an exact scan stays cheap.
+"""
+
+from typing import Optional, Tuple
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the positions of the k highest scores, best first.
+
+    Uses argpartition so the cost is O(n + k log k) instead of a full sort.
+    """
+    n = scores.shape[0]
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class IVFIndex:
+    """
+    Inverted-file index over the rows of an external vector matrix.
+
+    The index only stores centroids and, per centroid, the row numbers
+    assigned to it. Vectors stay in the owning store, so the index adds
+    very little memory on top of the matrix itself.
+
+    Features:
+    - Spherical k-means training on a sample of the corpus
+    - Incremental assignment of new rows after training
+    - nprobe-controlled recall/latency trade-off
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        train_iterations: int = 10,
+        seed: int = 42
+    ):
+        self.dimension = dimension
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.trained_size = 0
+        self._lists: Optional[list] = None
+        self.logger = logging.getLogger("rag.ann_index")
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors: np.ndarray):
+        """
+        Learn centroids from the given (normalized) vectors and assign them.
+
+        Args:
+            vectors: Matrix of shape (n, dimension)
+        """
+        n = vectors.shape[0]
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(self.seed)
+
+        # A sample of ~64 points per centroid is enough for stable clusters
+        sample_size = min(n, nlist * 64)
+        sample = vectors[rng.choice(n, sample_size, replace=False)] if sample_size < n else vectors
+        sample = np.asarray(sample, dtype=np.float32)
+
+        centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if members.shape[0]:
+                    centroids[c] = members.mean(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids /= norms
+
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = np.empty(0, dtype=np.int32)
+        self._lists = None
+        self.add(vectors)
+        self.trained_size = n
+
+        self.logger.info(f"Trained IVF index: {nlist} lists over {n} vectors")
+
+    def add(self, vectors: np.ndarray):
+        """Assign newly appended rows to their nearest centroid"""
+        if not self.is_trained or vectors.shape[0] == 0:
+            return
+
+        labels = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+        self.assignments = np.concatenate([self.assignments, labels])
+        self._lists = None
+
+    def reset(self):
+        """Drop the trained state so the next search rebuilds it"""
+        self.centroids = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.trained_size = 0
+        self._lists = None
+
+    def _inverted_lists(self) -> list:
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(
+                self.assignments[order], np.arange(self.centroids.shape[0] + 1)
+            )
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+        return self._lists
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """
+        Row numbers stored in the nprobe lists closest to the query.
+
+        Args:
+            query: Normalized query vector
+
+        Returns:
+            Array of candidate row numbers
+        """
+        centroid_scores = self.centroids @ query
+        probe = top_k_indices(centroid_scores, min(self.nprobe, centroid_scores.shape[0]))
+        lists = self._inverted_lists()
+        return np.concatenate([lists[i] for i in probe]) if len(probe) else np.empty(0, dtype=np.int64)
+
+    def search(
+        self,
+        vectors: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k search.
+
+        Args:
+            vectors: The full matrix the index was built over
+            query: Normalized query vector
+            top_k: Number of results
+            mask: Optional boolean row mask; False rows are skipped
+
+        Returns:
+            Tuple of (row numbers, scores), best first
+        """
+        rows = self.candidates(query)
+        if mask is not None and rows.shape[0]:
+            rows = rows[mask[rows]]
+
+        scores = vectors[rows] @ query
+        best = top_k_indices(scores, top_k)
+        return rows[best], scores[best]
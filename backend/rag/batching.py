@@ -0,0 +1,161 @@
+"""
+Embedding Micro-Batcher
+
+Coalesces concurrent single-text embedding requests into one batched
+model call, executed off the event loop.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from .embeddings import EmbeddingGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Asyncio micro-batcher in front of an ``EmbeddingGenerator``.
+
+    Callers await ``embed(text)``. A background task takes the first
+    queued request, waits up to ``max_wait_ms`` for more (or until
+    ``max_batch_size`` texts are queued), runs one ``embed_batch`` in a
+    dedicated worker thread and resolves every caller's future. While a
+    batch is encoding, new requests keep queueing for the next one.
+
+    An error in a batch fails that batch's callers only. If the
+    background task dies anyway, the next ``embed`` starts a new one and
+    hands it the requests still queued for the old one.
+
+    The batcher binds to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        generator: EmbeddingGenerator,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # One thread: model calls are serialized, batching provides the throughput
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-batcher")
+        self.batches = 0
+        self.texts = 0
+        self.logger = logging.getLogger("rag.batching")
+
+    def _ensure_worker(self):
+        if self._worker is not None and not self._worker.done():
+            return
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        if self._queue is not None:
+            # Requests queued for a dead worker move to the new one; those
+            # made on another (closed) loop can no longer be answered
+            while not self._queue.empty():
+                text, future = self._queue.get_nowait()
+                if future.get_loop() is loop:
+                    queue.put_nowait((text, future))
+        self._queue = queue
+        self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text as part of the next micro-batch"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed several texts, letting them share batches with other callers"""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or the window closes"""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Anything already queued rides along without further waiting
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], error: BaseException):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._embed_batch(batch)
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("Embedding batcher stopped"))
+                raise
+            except Exception as e:
+                self.logger.error(f"Batched embedding of {len(batch)} texts failed: {e}")
+                self._fail(batch, e)
+
+    async def _embed_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        pending = [(text, future) for text, future in batch if not future.cancelled()]
+        if not pending:
+            return
+
+        unique_texts = list(dict.fromkeys(text for text, _ in pending))
+        embeddings = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.generator.embed_batch, unique_texts
+        )
+        if len(embeddings) != len(unique_texts):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(unique_texts)} texts")
+
+        by_text = dict(zip(unique_texts, embeddings))
+        for text, future in pending:
+            if not future.done():
+                future.set_result(by_text[text])
+
+        self.batches += 1
+        self.texts += len(pending)
+
+    async def close(self):
+        """Stop the background task, fail waiting callers and release the worker thread"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            queued = []
+            while not self._queue.empty():
+                queued.append(self._queue.get_nowait())
+            self._fail(queued, RuntimeError("Embedding batcher stopped"))
+            self._queue = None
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
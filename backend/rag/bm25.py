@@ -0,0 +1,431 @@
+"""
+BM25 Lexical Index
+
+Inverted-index BM25 engine for exact term matching on regulatory
+text ("artículo 2.2.4.6.8", "Resolución 0312 estándar 21"), used next
+to dense retrieval in the hybrid pipeline.
+
+On disk the postings are a segment of .npy arrays next to the vector
+store files, memory-mapped on load like the store itself and written
+per generation ``<g>`` like its mapped files (see ``rag.storage``):
+    bm25.json                  version, store version, k1, b, generation,
+                               document counts
+    bm25_terms.<g>.npy         (terms,) sorted term bytes
+    bm25_offsets.<g>.npy       (terms + 1,) int64 offsets into the postings
+    bm25_posting_ids.<g>.npy   document ID of every posting, grouped by term
+    bm25_posting_tfs.<g>.npy   float32 term frequency of every posting
+    bm25_doc_ids.<g>.npy       sorted IDs of the indexed documents
+    bm25_doc_lengths.<g>.npy   int64 token count of each document
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Set, NamedTuple
+from collections import Counter
+import logging
+import math
+import re
+import unicodedata
+from pathlib import Path
+import numpy as np
+
+from .ann_index import top_k_indices
+from .storage import (
+    save_json, load_json, save_array, load_array,
+    generation_file, next_generation, remove_stale_generations
+)
+
+logger = logging.getLogger(__name__)
+
+BM25_FILE = "bm25.json"
+BM25_TERMS_FILE = "bm25_terms.npy"
+BM25_OFFSETS_FILE = "bm25_offsets.npy"
+BM25_POSTING_IDS_FILE = "bm25_posting_ids.npy"
+BM25_POSTING_TFS_FILE = "bm25_posting_tfs.npy"
+BM25_DOC_IDS_FILE = "bm25_doc_ids.npy"
+BM25_DOC_LENGTHS_FILE = "bm25_doc_lengths.npy"
+BM25_SEGMENT_FILES = (
+    BM25_TERMS_FILE, BM25_OFFSETS_FILE, BM25_POSTING_IDS_FILE,
+    BM25_POSTING_TFS_FILE, BM25_DOC_IDS_FILE, BM25_DOC_LENGTHS_FILE
+)
+BM25_VERSION = 2
+
+# Words, numbers and dotted/dashed identifiers such as 2.2.4.6.8 or GTC-45
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+SPANISH_STOPWORDS = frozenset("""
+a al algo ante con contra cual cuando de del desde donde durante e el ella ellas
+ellos en entre era es esa ese eso esta este esto estos fue ha han hasta la las le
+les lo los mas me mi muy no nos o para pero por que se sea ser si sin sobre son su
+sus tambien te tiene u un una uno y ya
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, accent-fold and split text into index terms.
+
+    Dotted identifiers are kept whole and, when they have several
+    parts, their leading part ("2.2.4.6.8" also yields "2.2") so a
+    query for a section matches its articles.
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+
+    terms = []
+    for token in TOKEN_PATTERN.findall(folded):
+        if token in SPANISH_STOPWORDS:
+            continue
+        terms.append(token)
+        parts = token.split(".")
+        if len(parts) > 2:
+            terms.append(".".join(parts[:2]))
+    return terms
+
+
+class _Segment(NamedTuple):
+    """Immutable BM25 postings, one array per segment file"""
+
+    terms: np.ndarray
+    offsets: np.ndarray
+    posting_ids: np.ndarray
+    posting_tfs: np.ndarray
+    doc_ids: np.ndarray
+    doc_lengths: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "_Segment":
+        return cls(
+            np.empty(0, dtype="S1"), np.zeros(1, dtype=np.int64),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        )
+
+    @classmethod
+    def open(cls, directory: Path, generation: Optional[int]) -> "_Segment":
+        return cls(*(
+            load_array(directory / generation_file(name, generation)) for name in BM25_SEGMENT_FILES
+        ))
+
+    def write(self, directory: Path, generation: int):
+        for name, array in zip(BM25_SEGMENT_FILES, self):
+            save_array(directory / generation_file(name, generation), np.ascontiguousarray(array))
+
+    def locate(self, term: str) -> Optional[slice]:
+        """Slice of the posting arrays holding ``term``, or None"""
+        key = term.encode("utf-8")
+        i = int(np.searchsorted(self.terms, key))
+        if i < self.terms.shape[0] and self.terms[i] == key:
+            return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+        return None
+
+    def row_of(self, doc_id: int) -> Optional[int]:
+        """Position of a document in ``doc_ids``, or None"""
+        i = int(np.searchsorted(self.doc_ids, doc_id))
+        if i < self.doc_ids.shape[0] and self.doc_ids[i] == doc_id:
+            return i
+        return None
+
+
+class BM25Index:
+    """
+    Incrementally updatable BM25 index keyed by vector store document IDs.
+
+    Documents loaded from disk stay in a read-only, memory-mapped segment;
+    documents added since are kept in dict postings for cheap inserts and
+    deletes, and deleted segment documents are only recorded as removed.
+    The first query that touches a term freezes its postings from both
+    into NumPy arrays (ids, term frequencies, document lengths), so
+    scoring is vectorized.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_terms: Dict[int, Dict[str, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_length = 0
+        self._segment = _Segment.empty()
+        self._removed: Set[int] = set()
+        self._removed_ids: Optional[np.ndarray] = None
+        self._frozen: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        # Directory and generation the segment was loaded from or saved
+        # to, and whether documents were added or removed since
+        self._path: Optional[Path] = None
+        self._generation: Optional[int] = None
+        self._dirty = False
+        self.logger = logging.getLogger("rag.bm25")
+
+    def __len__(self) -> int:
+        return self._segment.doc_ids.shape[0] - len(self._removed) + len(self.doc_lengths)
+
+    def _in_segment(self, doc_id: int) -> bool:
+        return doc_id not in self._removed and self._segment.row_of(doc_id) is not None
+
+    def _removed_array(self) -> np.ndarray:
+        if self._removed_ids is None:
+            self._removed_ids = np.fromiter(sorted(self._removed), dtype=np.int64, count=len(self._removed))
+        return self._removed_ids
+
+    def add(self, doc_ids: List[int], texts: List[str]):
+        """Index new documents"""
+        for doc_id, text in zip(doc_ids, texts):
+            self._add_terms(int(doc_id), Counter(tokenize(text)))
+
+    def _add_terms(self, doc_id: int, counts: Dict[str, int]):
+        if doc_id in self.doc_lengths or self._in_segment(doc_id):
+            self.remove([doc_id])
+
+        length = sum(counts.values())
+        self.doc_terms[doc_id] = dict(counts)
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self._dirty = True
+
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+            self._frozen.pop(term, None)
+
+    def remove(self, doc_ids: List[int]):
+        """Remove documents from every posting list they appear in"""
+        for doc_id in doc_ids:
+            doc_id = int(doc_id)
+            terms = self.doc_terms.pop(doc_id, None)
+            if terms is not None:
+                self.total_length -= self.doc_lengths.pop(doc_id)
+                self._dirty = True
+                for term in terms:
+                    posting = self.postings.get(term)
+                    if posting is not None:
+                        posting.pop(doc_id, None)
+                        if not posting:
+                            del self.postings[term]
+                    self._frozen.pop(term, None)
+                continue
+
+            row = self._segment.row_of(doc_id) if doc_id not in self._removed else None
+            if row is None:
+                continue
+            # The segment has no forward index, so every frozen term may hold it
+            self._removed.add(doc_id)
+            self._removed_ids = None
+            self.total_length -= int(self._segment.doc_lengths[row])
+            self._frozen.clear()
+            self._dirty = True
+
+    def _frozen_posting(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        frozen = self._frozen.get(term)
+        if frozen is not None:
+            return frozen
+
+        parts = []
+        span = self._segment.locate(term)
+        if span is not None:
+            ids = np.asarray(self._segment.posting_ids[span])
+            tfs = np.asarray(self._segment.posting_tfs[span])
+            if self._removed:
+                keep = ~np.isin(ids, self._removed_array())
+                ids, tfs = ids[keep], tfs[keep]
+            rows = np.searchsorted(self._segment.doc_ids, ids)
+            parts.append((ids, tfs, self._segment.doc_lengths[rows].astype(np.float32)))
+
+        posting = self.postings.get(term)
+        if posting:
+            parts.append((
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float32, count=len(posting)),
+                np.fromiter(
+                    (self.doc_lengths[doc_id] for doc_id in posting), dtype=np.float32, count=len(posting)
+                )
+            ))
+
+        if not parts:
+            return None
+        frozen = tuple(np.concatenate(arrays) for arrays in zip(*parts))
+        if frozen[0].shape[0] == 0:
+            return None
+        self._frozen[term] = frozen
+        return frozen
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        allowed_ids: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank documents for a query.
+
+        Args:
+            query: Query text
+            top_k: Number of results
+            allowed_ids: Optional sorted array of IDs to restrict results to
+
+        Returns:
+            List of (doc_id, bm25 score), best first
+        """
+        n = len(self)
+        if n == 0:
+            return []
+
+        avg_length = self.total_length / n
+        all_ids, all_scores = [], []
+
+        for term in set(tokenize(query)):
+            frozen = self._frozen_posting(term)
+            if frozen is None:
+                continue
+            ids, tfs, lengths = frozen
+            df = ids.shape[0]
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths / max(avg_length, 1e-9))
+            all_ids.append(ids)
+            all_scores.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        if not all_ids:
+            return []
+
+        ids = np.concatenate(all_ids)
+        scores = np.concatenate(all_scores)
+
+        if allowed_ids is not None:
+            keep = np.isin(ids, allowed_ids, assume_unique=False)
+            ids, scores = ids[keep], scores[keep]
+            if ids.shape[0] == 0:
+                return []
+
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores)
+        best = top_k_indices(totals, top_k)
+
+        return [(int(unique_ids[i]), float(totals[i])) for i in best]
+
+    def _merged_segment(self) -> _Segment:
+        """Fold the in-memory postings and the removals into a new segment"""
+        base = self._segment
+        base_terms = np.asarray(base.terms)
+        ids = np.asarray(base.posting_ids)
+        tfs = np.asarray(base.posting_tfs)
+        term_rows = np.repeat(np.arange(base_terms.shape[0]), np.diff(np.asarray(base.offsets)))
+        doc_ids = np.asarray(base.doc_ids)
+        doc_lengths = np.asarray(base.doc_lengths)
+
+        if self._removed:
+            removed = self._removed_array()
+            keep = ~np.isin(ids, removed)
+            ids, tfs, term_rows = ids[keep], tfs[keep], term_rows[keep]
+            live = ~np.isin(doc_ids, removed)
+            doc_ids, doc_lengths = doc_ids[live], doc_lengths[live]
+
+        added = sorted(self.postings)
+        added_terms = np.array([term.encode("utf-8") for term in added], dtype=bytes)
+        sizes = [len(self.postings[term]) for term in added]
+        terms = np.union1d(base_terms, added_terms)
+
+        rows = np.concatenate([
+            np.searchsorted(terms, base_terms)[term_rows],
+            np.repeat(np.searchsorted(terms, added_terms), sizes)
+        ])
+        ids = np.concatenate([ids, np.fromiter(
+            (doc_id for term in added for doc_id in self.postings[term]), dtype=np.int64, count=sum(sizes)
+        )])
+        tfs = np.concatenate([tfs, np.fromiter(
+            (tf for term in added for tf in self.postings[term].values()), dtype=np.float32, count=sum(sizes)
+        )])
+
+        order = np.argsort(rows, kind="stable")
+        counts = np.bincount(rows, minlength=terms.shape[0])
+        present = counts > 0
+
+        doc_ids = np.concatenate([
+            doc_ids, np.fromiter(self.doc_lengths.keys(), dtype=np.int64, count=len(self.doc_lengths))
+        ])
+        doc_lengths = np.concatenate([
+            doc_lengths, np.fromiter(self.doc_lengths.values(), dtype=np.int64, count=len(self.doc_lengths))
+        ])
+        doc_order = np.argsort(doc_ids, kind="stable")
+
+        return _Segment(
+            terms=terms[present],
+            offsets=np.concatenate([[0], np.cumsum(counts[present])]).astype(np.int64),
+            posting_ids=ids[order],
+            posting_tfs=tfs[order],
+            doc_ids=doc_ids[doc_order],
+            doc_lengths=doc_lengths[doc_order]
+        )
+
+    def _reset_to(self, segment: _Segment):
+        """Make ``segment`` the whole index, dropping the in-memory postings"""
+        self._segment = segment
+        self.doc_terms, self.doc_lengths, self.postings = {}, {}, {}
+        self._removed = set()
+        self._removed_ids = None
+        self._frozen = {}
+
+    def save(self, directory: Path, store_version: int = 0):
+        """
+        Persist the index as a segment of .npy arrays plus bm25.json.
+
+        The arrays are rewritten only when documents were added or removed
+        since the index was loaded from or saved to ``directory``; otherwise
+        just bm25.json is updated with the new store version.
+        """
+        directory = Path(directory)
+        rewrite = self._dirty or self._path != directory
+        generation = next_generation(directory, BM25_FILE) if rewrite else self._generation
+
+        if rewrite:
+            self._merged_segment().write(directory, generation)
+
+        save_json(directory / BM25_FILE, {
+            "version": BM25_VERSION,
+            "store_version": store_version,
+            "k1": self.k1,
+            "b": self.b,
+            "generation": generation,
+            "documents": len(self),
+            "total_length": self.total_length
+        })
+
+        if rewrite:
+            self._reset_to(_Segment.open(directory, generation))
+            remove_stale_generations(directory, BM25_SEGMENT_FILES, generation)
+        self._path = directory
+        self._generation = generation
+        self._dirty = False
+
+    @classmethod
+    def load(cls, directory: Path, store_version: int = 0) -> Optional["BM25Index"]:
+        """
+        Memory-map the index, or return None if it is missing or out of
+        sync with the store. This is O(1) in the corpus size.
+        """
+        directory = Path(directory)
+        path = directory / BM25_FILE
+        if not path.exists():
+            return None
+
+        payload = load_json(path)
+        generation = payload.get("generation")
+        if (
+            payload.get("version") != BM25_VERSION
+            or payload.get("store_version") != store_version
+            or not all((directory / generation_file(name, generation)).exists() for name in BM25_SEGMENT_FILES)
+        ):
+            logger.warning(f"BM25 index at {directory} does not match the vector store; rebuilding")
+            return None
+
+        index = cls(k1=payload["k1"], b=payload["b"])
+        index._segment = _Segment.open(directory, generation)
+        index.total_length = payload["total_length"]
+        index._path = directory
+        index._generation = generation
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        new_terms = sum(1 for term in self.postings if self._segment.locate(term) is None)
+        documents = len(self)
+        return {
+            "documents": documents,
+            "terms": self._segment.terms.shape[0] + new_terms,
+            "avg_doc_length": self.total_length / documents if documents else 0.0
+        }
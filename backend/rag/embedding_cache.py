@@ -0,0 +1,199 @@
+"""
+Embedding Cache
+
+Two-tier cache for text embeddings: a bounded in-memory LRU with
+optional TTL, backed by an optional SQLite file that survives restarts.
+"""
+
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Cache key for a text embedded by a given model"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class SQLiteEmbeddingStore:
+    """
+    Persistent embedding tier stored in a single SQLite file.
+
+    Vectors are stored as raw float32 blobs. Lookups and inserts are
+    batched so a whole embedding batch costs one round-trip each way.
+    """
+
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str], max_age: Optional[float] = None) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        min_created = time.time() - max_age if max_age else 0.0
+
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_CHUNK):
+                chunk = keys[start:start + self.LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders}) AND created_at >= ?",
+                    (*chunk, min_created)
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def purge_expired(self, max_age: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM embeddings WHERE created_at < ?", (time.time() - max_age,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU embedding cache with optional TTL and disk tier.
+
+    Memory misses fall through to the disk tier; disk hits are promoted
+    back into memory. Counters are kept for hits, misses, disk hits,
+    evictions and expirations.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        disk_path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = SQLiteEmbeddingStore(disk_path) if disk_path else None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys, counting hits and misses"""
+        found: Dict[str, np.ndarray] = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                vector, stored_at = entry
+                if self.ttl_seconds and now - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = vector
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.disk is not None:
+            from_disk = self.disk.get_many(missing, max_age=self.ttl_seconds)
+            if from_disk:
+                self._store(from_disk)
+                found.update(from_disk)
+                self.disk_hits += len(from_disk)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Add vectors to memory and, when configured, to disk"""
+        if not items:
+            return
+        self._store(items)
+        if self.disk is not None:
+            self.disk.put_many(items)
+
+    def _store(self, items: Dict[str, np.ndarray]):
+        now = time.monotonic()
+        with self._lock:
+            for key, vector in items.items():
+                self._entries[key] = (vector, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, include_disk: bool = False):
+        with self._lock:
+            self._entries.clear()
+        if include_disk and self.disk is not None:
+            self.disk.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "disk_path": str(self.disk.path) if self.disk is not None else None
+        }
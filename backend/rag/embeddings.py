@@ -4,10 +4,12 @@ Embedding Generation
 Generate vector embeddings for text using sentence transformers.
 """
 
-from typing import List, Optional
+from typing import List, Dict, Any, Optional
 import logging
 import numpy as np
 
+from .embedding_cache import EmbeddingCache, embedding_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,33 +104,56 @@ class EmbeddingGenerator:
 
 
 class CachedEmbeddingGenerator(EmbeddingGenerator):
-    """Embedding generator with caching to avoid recomputing"""
+    """
+    Embedding generator with caching to avoid recomputing.
+
+    Entries are keyed by model name + text hash and evicted LRU once
+    ``cache_size`` is reached. Batches are looked up as a whole and only
+    the misses are sent to the model. With ``cache_path`` set, a SQLite
+    tier keeps embeddings across restarts.
+    """
     
     def __init__(
         self,
         model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
         device: str = "cpu",
-        cache_size: int = 10000
+        cache_size: int = 10000,
+        cache_ttl: Optional[float] = None,
+        cache_path: Optional[str] = None
     ):
         super().__init__(model_name, device)
-        self.cache: Dict[str, np.ndarray] = {}
+        self.cache = EmbeddingCache(
+            max_entries=cache_size,
+            ttl_seconds=cache_ttl,
+            disk_path=cache_path
+        )
         self.cache_size = cache_size
     
-    def embed_text(self, text: str) -> np.ndarray:
-        """Generate embedding with caching"""
-        if text in self.cache:
-            self.logger.debug("Cache hit for embedding")
-            return self.cache[text]
+    def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Generate embeddings, computing only the texts not in the cache"""
+        if not texts:
+            return []
         
-        embedding = super().embed_text(text)
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        cached = self.cache.get_many(list(dict.fromkeys(keys)))
         
-        # Add to cache if not full
-        if len(self.cache) < self.cache_size:
-            self.cache[text] = embedding
+        # Embed each distinct missing text once
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            computed = super().embed_batch(list(missing.values()))
+            fresh = dict(zip(missing.keys(), computed))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+        else:
+            self.logger.debug(f"Cache hit for all {len(texts)} embeddings")
         
-        return embedding
+        return [cached[key] for key in keys]
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the embedding cache"""
+        return self.cache.get_stats()
     
-    def clear_cache(self):
+    def clear_cache(self, include_disk: bool = False):
         """Clear the embedding cache"""
-        self.cache.clear()
+        self.cache.clear(include_disk=include_disk)
         self.logger.info("Embedding cache cleared")
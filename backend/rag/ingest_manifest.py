@@ -0,0 +1,128 @@
+"""
+Ingestion Manifest
+
+Tracks which source files are already in the vector store, keyed by
+path, content hash and the chunker configuration they were split with,
+so re-ingestion only touches files that actually changed.
+"""
+
+from typing import List, Dict, Any, Optional
+import hashlib
+import logging
+from pathlib import Path
+
+from .storage import save_json, load_json
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: Path) -> str:
+    """Stream a file through SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunker_key(**config: Any) -> str:
+    """Stable short hash of everything that influences the stored chunks"""
+    canonical = repr(sorted(config.items())).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()[:16]
+
+
+class IngestManifest:
+    """
+    Per-file record of what has been ingested.
+
+    Each entry stores the file's size, mtime, SHA-256 content hash,
+    chunker key and the vector store IDs of its chunks. Size and mtime
+    are only a fast path: a file whose stat changed is re-hashed, and
+    it is re-chunked only if the hash or chunker key differ.
+    """
+
+    FILE_NAME = "ingest_manifest.json"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self.logger = logging.getLogger("rag.ingest_manifest")
+
+        if self.path and self.path.exists():
+            self.load()
+
+    @classmethod
+    def for_index(cls, index_path: str) -> "IngestManifest":
+        """Manifest stored next to the vector store files"""
+        return cls(str(Path(index_path) / cls.FILE_NAME))
+
+    def load(self):
+        payload = load_json(self.path)
+        if payload.get("version") != MANIFEST_VERSION:
+            self.logger.warning(f"Ignoring ingest manifest with version {payload.get('version')}")
+            return
+        self.files = payload.get("files", {})
+
+    def save(self):
+        if not self.path:
+            raise ValueError("No manifest path specified")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        save_json(self.path, {"version": MANIFEST_VERSION, "files": self.files})
+        self.dirty = False
+
+    def is_current(self, file_path: Path, key: str) -> bool:
+        """
+        Whether the stored chunks for a file are still valid.
+
+        Refreshes the recorded stat when only the mtime moved (e.g. a
+        checkout or copy that did not change the content).
+        """
+        entry = self.files.get(file_path.as_posix())
+        if entry is None or entry["chunker_key"] != key:
+            return False
+
+        stat = file_path.stat()
+        if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return True
+
+        if entry["sha256"] != file_sha256(file_path):
+            return False
+
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime
+        self.dirty = True
+        return True
+
+    def record(self, file_path: Path, key: str, doc_ids: List[int]):
+        stat = file_path.stat()
+        self.files[file_path.as_posix()] = {
+            "sha256": file_sha256(file_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "chunker_key": key,
+            "doc_ids": [int(doc_id) for doc_id in doc_ids]
+        }
+        self.dirty = True
+
+    def doc_ids(self, file_key: str) -> List[int]:
+        entry = self.files.get(file_key)
+        return list(entry["doc_ids"]) if entry else []
+
+    def forget(self, file_key: str) -> List[int]:
+        """Drop a file from the manifest, returning the IDs of its chunks"""
+        entry = self.files.pop(file_key, None)
+        self.dirty = self.dirty or entry is not None
+        return list(entry["doc_ids"]) if entry else []
+
+    def files_under(self, directory: str, recursive: bool = True) -> List[str]:
+        """Manifest keys for files inside a directory"""
+        root = Path(directory).as_posix().rstrip("/")
+        prefix = root + "/"
+        return [
+            key for key in self.files
+            if key.startswith(prefix) and (recursive or "/" not in key[len(prefix):])
+        ]
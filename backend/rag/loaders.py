@@ -5,9 +5,11 @@ Load and process documents from various formats (PDF, DOCX, TXT)
 for ingestion into the vectorstore.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Iterable
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +38,11 @@ class Document:
 class DocumentLoader:
     """Base class for document loaders"""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, raise_errors: bool = False):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # False: a file that fails to load is logged and yields no chunks
+        self.raise_errors = raise_errors
         self.logger = logging.getLogger("rag.loader")
     
     def load(self, file_path: str) -> List[Document]:
@@ -120,6 +124,8 @@ class PDFLoader(DocumentLoader):
             
         except Exception as e:
             self.logger.error(f"Failed to load PDF {file_path}: {e}")
+            if self.raise_errors:
+                raise
             return []
 
 
@@ -154,6 +160,8 @@ class DOCXLoader(DocumentLoader):
             
         except Exception as e:
             self.logger.error(f"Failed to load DOCX {file_path}: {e}")
+            if self.raise_errors:
+                raise
             return []
 
 
@@ -184,11 +192,25 @@ class TextLoader(DocumentLoader):
             
         except Exception as e:
             self.logger.error(f"Failed to load text file {file_path}: {e}")
+            if self.raise_errors:
+                raise
             return []
 
 
+def _load_file_in_worker(file_path: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Process-pool entry point: parse and chunk one file"""
+    loader_class = DirectoryLoader.LOADER_MAP[Path(file_path).suffix.lower()]
+    return loader_class(chunk_size=chunk_size, chunk_overlap=chunk_overlap, raise_errors=True).load(file_path)
+
+
 class DirectoryLoader:
-    """Load all documents from a directory"""
+    """
+    Load all documents from a directory.
+
+    ``load`` returns every chunk at once. ``iter_batches`` streams
+    fixed-size chunk batches while files are parsed in a process pool,
+    with a bounded number of files in flight so memory stays flat.
+    """
     
     LOADER_MAP = {
         '.pdf': PDFLoader,
@@ -198,11 +220,66 @@ class DirectoryLoader:
         '.md': TextLoader
     }
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_workers: Optional[int] = None,
+        batch_size: int = 64
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
         self.logger = logging.getLogger("rag.directory_loader")
     
+    def iter_files(self, directory: str, recursive: bool = True) -> Iterator[Path]:
+        """
+        Yield every supported file under a directory, in sorted order.
+
+        Args:
+            directory: Directory path
+            recursive: Whether to search subdirectories
+        """
+        path = Path(directory)
+
+        if not path.exists():
+            self.logger.error(f"Directory not found: {directory}")
+            return
+
+        pattern = "**/*" if recursive else "*"
+
+        for file_path in sorted(path.glob(pattern)):
+            if file_path.is_file() and file_path.suffix.lower() in self.LOADER_MAP:
+                yield file_path
+
+    def load_file(
+        self,
+        file_path: str,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        raise_errors: bool = False
+    ) -> List[Document]:
+        """
+        Load a single file with the loader registered for its extension.
+
+        Args:
+            file_path: Path to the file
+            chunk_size: Override of the directory-wide chunk size
+            chunk_overlap: Override of the directory-wide chunk overlap
+            raise_errors: Raise parse errors instead of returning no chunks
+
+        Returns:
+            List of Document chunks
+        """
+        loader_class = self.LOADER_MAP[Path(file_path).suffix.lower()]
+        loader = loader_class(
+            chunk_size=chunk_size or self.chunk_size,
+            chunk_overlap=self.chunk_overlap if chunk_overlap is None else chunk_overlap,
+            raise_errors=raise_errors
+        )
+        return loader.load(str(file_path))
+
     def load(self, directory: str, recursive: bool = True) -> List[Document]:
         """
         Load all supported documents from a directory.
@@ -214,35 +291,128 @@ class DirectoryLoader:
         Returns:
             List of all Document chunks
         """
-        path = Path(directory)
-        
-        if not path.exists():
-            self.logger.error(f"Directory not found: {directory}")
-            return []
-        
         all_documents = []
-        pattern = "**/*" if recursive else "*"
         
-        for file_path in path.glob(pattern):
-            if file_path.is_file():
-                suffix = file_path.suffix.lower()
-                
-                if suffix in self.LOADER_MAP:
-                    loader_class = self.LOADER_MAP[suffix]
-                    loader = loader_class(
-                        chunk_size=self.chunk_size,
-                        chunk_overlap=self.chunk_overlap
-                    )
-                    
-                    documents = loader.load(str(file_path))
-                    all_documents.extend(documents)
-                    
-                    self.logger.info(
-                        f"Loaded {len(documents)} chunks from {file_path.name}"
-                    )
+        for file_path in self.iter_files(directory, recursive):
+            documents = self.load_file(str(file_path))
+            all_documents.extend(documents)
+            
+            self.logger.info(
+                f"Loaded {len(documents)} chunks from {file_path.name}"
+            )
         
         self.logger.info(
             f"Loaded total of {len(all_documents)} chunks from {directory}"
         )
         
         return all_documents
+
+    def iter_file_batches(
+        self,
+        file_paths: Iterable[Path],
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        failed: Optional[List[Path]] = None
+    ) -> Iterator[List[Document]]:
+        """
+        Parse files in parallel and yield their chunks in batches.
+
+        At most ``2 * max_workers`` files are in flight at a time. When a
+        file finishes, its chunks are moved into the batch buffer and the
+        next file is submitted right away, before any batch is yielded;
+        nothing new is submitted while the generator is suspended at a
+        yield. A slow consumer (e.g. embedding) therefore overlaps with at
+        most ``2 * max_workers`` files being parsed or waiting to be read,
+        instead of letting chunks pile up in memory. Chunks of one file
+        are yielded contiguously, but files arrive in completion order.
+
+        Args:
+            file_paths: Files to load
+            chunk_size: Override of the directory-wide chunk size
+            chunk_overlap: Override of the directory-wide chunk overlap
+            batch_size: Chunks per yielded batch
+            failed: Files that could not be loaded are appended here
+                (they yield no chunks); complete once the iterator is exhausted
+
+        Yields:
+            Lists of Document chunks
+        """
+        chunk_size = chunk_size or self.chunk_size
+        chunk_overlap = self.chunk_overlap if chunk_overlap is None else chunk_overlap
+        batch_size = batch_size or self.batch_size
+        files = iter(file_paths)
+        buffer: List[Document] = []
+
+        if self.max_workers <= 1:
+            for file_path in files:
+                try:
+                    buffer.extend(self.load_file(str(file_path), chunk_size, chunk_overlap, raise_errors=True))
+                except Exception as e:
+                    self._record_failure(file_path, e, failed)
+                while len(buffer) >= batch_size:
+                    yield buffer[:batch_size]
+                    buffer = buffer[batch_size:]
+            if buffer:
+                yield buffer
+            return
+
+        max_pending = 2 * self.max_workers
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: Dict[Any, Path] = {}
+
+            def submit_next() -> bool:
+                file_path = next(files, None)
+                if file_path is None:
+                    return False
+                future = executor.submit(_load_file_in_worker, str(file_path), chunk_size, chunk_overlap)
+                pending[future] = Path(file_path)
+                return True
+
+            while len(pending) < max_pending and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = pending.pop(future)
+                    try:
+                        buffer.extend(future.result())
+                    except Exception as e:
+                        self._record_failure(file_path, e, failed)
+                    submit_next()
+
+                while len(buffer) >= batch_size:
+                    yield buffer[:batch_size]
+                    buffer = buffer[batch_size:]
+
+        if buffer:
+            yield buffer
+
+    def _record_failure(self, file_path: Path, error: Exception, failed: Optional[List[Path]]):
+        self.logger.error(f"Failed to load {file_path}: {error}")
+        if failed is not None:
+            failed.append(Path(file_path))
+
+    def iter_batches(
+        self,
+        directory: str,
+        recursive: bool = True,
+        batch_size: Optional[int] = None
+    ) -> Iterator[List[Document]]:
+        """
+        Stream all supported documents from a directory in chunk batches.
+
+        Args:
+            directory: Directory path
+            recursive: Whether to search subdirectories
+            batch_size: Chunks per yielded batch
+
+        Yields:
+            Lists of Document chunks
+        """
+        yield from self.iter_file_batches(
+            self.iter_files(directory, recursive),
+            batch_size=batch_size
+        )
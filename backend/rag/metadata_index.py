@@ -0,0 +1,86 @@
+"""
+Metadata Index
+
+Vectorized metadata filtering over the dictionary-encoded metadata
+columns of the vector store.
+"""
+
+from typing import Dict, Any, Iterable, Tuple
+import logging
+import numpy as np
+
+from .storage import MetadataColumns, value_key
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataIndex:
+    """
+    Boolean row masks ("bitmaps") per metadata value.
+
+    For every filter term the matching rows are found by comparing the
+    column's int32 codes with the value's code, a single vectorized
+    pass. Masks for the indexed columns (by default ``doc_type``,
+    ``source`` and ``file_type``) are cached and, because the columns
+    are append-only, extended with only the rows added since.
+
+    Filters are dicts of ``{key: value}`` (equality) or
+    ``{key: {"$in": [values...]}}``; all terms must match.
+    """
+
+    DEFAULT_INDEXED = ("doc_type", "source", "file_type")
+
+    def __init__(
+        self,
+        columns: MetadataColumns,
+        indexed_columns: Iterable[str] = DEFAULT_INDEXED
+    ):
+        self.columns = columns
+        self.indexed_columns = set(indexed_columns)
+        self._bitmaps: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def _compute(self, column: int, code: int, start: int, end: int) -> np.ndarray:
+        return self.columns.codes[column, start:end] == code
+
+    def value_mask(self, name: str, value: Any) -> np.ndarray:
+        """Rows whose metadata ``name`` equals ``value``"""
+        count = len(self.columns)
+        column, code = self.columns.locate(name, value)
+        if code is None:
+            return np.zeros(count, dtype=bool)
+
+        if name not in self.indexed_columns:
+            return self._compute(column, code, 0, count)
+
+        key = (name, value_key(value))
+        cached = self._bitmaps.get(key)
+        if cached is None:
+            cached = self._compute(column, code, 0, count)
+        elif cached.shape[0] < count:
+            cached = np.concatenate([cached, self._compute(column, code, cached.shape[0], count)])
+        self._bitmaps[key] = cached
+        return cached
+
+    def mask(self, filter_metadata: Dict[str, Any]) -> np.ndarray:
+        """Combined row mask for a filter dict"""
+        result = np.ones(len(self.columns), dtype=bool)
+
+        for name, condition in filter_metadata.items():
+            if isinstance(condition, dict) and "$in" in condition:
+                term = np.zeros(len(self.columns), dtype=bool)
+                for value in condition["$in"]:
+                    term |= self.value_mask(name, value)
+            else:
+                term = self.value_mask(name, condition)
+            result &= term
+
+            if not result.any():
+                break
+
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "indexed_columns": sorted(self.indexed_columns),
+            "cached_bitmaps": len(self._bitmaps)
+        }
@@ -0,0 +1,183 @@
+"""
+RAG Query Result Cache
+
+Caches complete RAG answers by normalized question and filters, with
+optional semantic matching of paraphrased questions.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import copy
+import json
+import logging
+import re
+import time
+import unicodedata
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[¿?¡!.,;:\"'()\[\]]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Case-, accent-, punctuation- and whitespace-insensitive form of a question"""
+    folded = unicodedata.normalize("NFKD", question.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    folded = _PUNCTUATION.sub(" ", folded)
+    return _WHITESPACE.sub(" ", folded).strip()
+
+
+class QueryResultCache:
+    """
+    LRU + TTL cache of RAG query results.
+
+    Lookups first try the exact key (normalized question, filters,
+    return_sources). Semantic matching is off by default; with
+    ``similarity_threshold`` set, a miss then compares the query
+    embedding with those of cached questions that used the same filters
+    and reuses the best one above the threshold.
+
+    Every entry is tagged with the vector store revision it was computed
+    against; when the revision changes (ingestion, deletion, reload)
+    the whole cache is dropped.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[Tuple[str, str, bool], Dict[str, Any]]" = OrderedDict()
+        self._revision: Optional[str] = None
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.logger = logging.getLogger("rag.query_cache")
+
+    @staticmethod
+    def _filters_key(filter_metadata: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(filter_metadata or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+    def _check_revision(self, revision: str):
+        if revision != self._revision:
+            if self._entries:
+                self.invalidations += 1
+                self.logger.info("Vector store changed; query cache invalidated")
+            self._entries.clear()
+            self._revision = revision
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.monotonic() - entry["created_at"] > self.ttl_seconds
+
+    def get(
+        self,
+        question: str,
+        filter_metadata: Optional[Dict[str, Any]],
+        return_sources: bool,
+        revision: str
+    ) -> Optional[Dict[str, Any]]:
+        """Exact lookup by normalized question; does not count misses"""
+        self._check_revision(revision)
+        key = (normalize_question(question), self._filters_key(filter_metadata), return_sources)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry["result"])
+
+    def get_similar(
+        self,
+        query_embedding: np.ndarray,
+        filter_metadata: Optional[Dict[str, Any]],
+        return_sources: bool,
+        revision: str
+    ) -> Optional[Dict[str, Any]]:
+        """Semantic lookup by embedding similarity; counts the miss if none qualifies"""
+        self._check_revision(revision)
+
+        if self.similarity_threshold is None:
+            self.misses += 1
+            return None
+
+        filters_key = self._filters_key(filter_metadata)
+        candidates = [
+            (key, entry) for key, entry in self._entries.items()
+            if key[1] == filters_key and key[2] == return_sources and not self._expired(entry)
+        ]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        matrix = np.stack([entry["embedding"] for _, entry in candidates])
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+
+        if similarities[best] < self.similarity_threshold:
+            self.misses += 1
+            return None
+
+        key, entry = candidates[best]
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.semantic_hits += 1
+        return copy.deepcopy(entry["result"])
+
+    def put(
+        self,
+        question: str,
+        filter_metadata: Optional[Dict[str, Any]],
+        return_sources: bool,
+        revision: str,
+        query_embedding: np.ndarray,
+        result: Dict[str, Any]
+    ):
+        self._check_revision(revision)
+        key = (normalize_question(question), self._filters_key(filter_metadata), return_sources)
+
+        embedding = np.asarray(query_embedding, dtype=np.float32)
+        embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+
+        self._entries[key] = {
+            "result": copy.deepcopy(result),
+            "embedding": embedding,
+            "created_at": time.monotonic()
+        }
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
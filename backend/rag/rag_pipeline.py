@@ -10,6 +10,8 @@ import logging
 from .loaders import Document
 from .embeddings import EmbeddingGenerator
 from .vectorstore import VectorStore
+from .batching import EmbeddingBatcher
+from .query_cache import QueryResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,10 @@ class RAGPipeline:
     3. Rerank results (optional)
     4. Generate answer using LLM with retrieved context
     5. Track citations
+    
+    With a ``result_cache`` repeated (or, semantically, paraphrased)
+    questions are answered from the cache without retrieval or LLM
+    generation.
     """
     
     def __init__(
@@ -31,10 +37,14 @@ class RAGPipeline:
         vectorstore: VectorStore,
         embedding_generator: EmbeddingGenerator,
         top_k: int = 5,
-        rerank: bool = False
+        rerank: bool = False,
+        embedding_batcher: Optional[EmbeddingBatcher] = None,
+        result_cache: Optional[QueryResultCache] = None
     ):
         self.vectorstore = vectorstore
         self.embedding_generator = embedding_generator
+        self.embedding_batcher = embedding_batcher
+        self.result_cache = result_cache
         self.top_k = top_k
         self.rerank = rerank
         self.logger = logging.getLogger("rag.pipeline")
@@ -57,16 +67,27 @@ class RAGPipeline:
             Answer with optional sources and citations
         """
         try:
+            revision = self.vectorstore.revision
+            cache_args = (filter_metadata, return_sources, revision)
+            
+            if self.result_cache is not None:
+                cached = self.result_cache.get(question, *cache_args)
+                if cached is not None:
+                    self.logger.info(f"Query cache hit: {question}")
+                    return cached
+            
             # Step 1: Generate query embedding
             self.logger.info(f"Processing query: {question}")
-            query_embedding = self.embedding_generator.embed_text(question)
+            query_embedding = await self._embed_query(question)
+            
+            if self.result_cache is not None:
+                cached = self.result_cache.get_similar(query_embedding, *cache_args)
+                if cached is not None:
+                    self.logger.info(f"Semantic query cache hit: {question}")
+                    return cached
             
             # Step 2: Retrieve relevant documents
-            results = self.vectorstore.search(
-                query_embedding=query_embedding,
-                top_k=self.top_k,
-                filter_metadata=filter_metadata
-            )
+            results = self._retrieve(question, query_embedding, filter_metadata)
             
             if not results:
                 return {
@@ -98,6 +119,9 @@ class RAGPipeline:
                 response["sources"] = citations
                 response["num_sources"] = len(results)
             
+            if self.result_cache is not None:
+                self.result_cache.put(question, *cache_args, query_embedding, response)
+            
             return response
             
         except Exception as e:
@@ -108,6 +132,25 @@ class RAGPipeline:
                 "confidence": 0.0
             }
     
+    def _retrieve(
+        self,
+        question: str,
+        query_embedding,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Dense retrieval from the vectorstore"""
+        return self.vectorstore.search(
+            query_embedding=query_embedding,
+            top_k=self.top_k,
+            filter_metadata=filter_metadata
+        )
+    
+    async def _embed_query(self, question: str):
+        """Embed the question, sharing a model call with concurrent queries when batching"""
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed(question)
+        return self.embedding_generator.embed_text(question)
+    
     def _build_context(self, results: List[Dict[str, Any]]) -> str:
         """Build context string from retrieved documents"""
         context_parts = []
@@ -199,23 +242,82 @@ Respuesta:"""
 class HybridRAGPipeline(RAGPipeline):
     """
     Hybrid RAG pipeline combining semantic and keyword search.
+    
+    Dense results from the vectorstore and BM25 results from its lexical
+    index are merged with reciprocal rank fusion (RRF): each document
+    scores sum(1 / (rrf_k + rank)) over the rankings it appears in. This
+    lets exact references such as "artículo 2.2.4.6.8" surface even when
+    their embedding is not among the nearest neighbours.
     """
     
-    async def query(
+    def __init__(
+        self,
+        vectorstore: VectorStore,
+        embedding_generator: EmbeddingGenerator,
+        top_k: int = 5,
+        rerank: bool = False,
+        embedding_batcher: Optional[EmbeddingBatcher] = None,
+        result_cache: Optional[QueryResultCache] = None,
+        rrf_k: int = 60,
+        candidate_multiplier: int = 4
+    ):
+        super().__init__(
+            vectorstore, embedding_generator, top_k, rerank, embedding_batcher, result_cache
+        )
+        self.rrf_k = rrf_k
+        self.candidate_multiplier = candidate_multiplier
+    
+    def _retrieve(
         self,
         question: str,
-        filter_metadata: Optional[Dict[str, Any]] = None,
-        return_sources: bool = True
-    ) -> Dict[str, Any]:
-        """Query using hybrid search (semantic + keyword)"""
+        query_embedding,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Fuse dense and BM25 rankings with reciprocal rank fusion"""
+        candidates = self.top_k * self.candidate_multiplier
         
-        # Get semantic search results
-        semantic_results = await super().query(
+        dense = self.vectorstore.search(
+            query_embedding=query_embedding,
+            top_k=candidates,
+            filter_metadata=filter_metadata
+        )
+        lexical = self.vectorstore.lexical_search(
             question,
-            filter_metadata,
-            return_sources=False
+            top_k=candidates,
+            filter_metadata=filter_metadata
         )
         
-        # TODO: Add keyword search (BM25) and merge results
+        return self._fuse(dense, lexical, query_embedding)
+    
+    def _fuse(
+        self,
+        dense: List[Dict[str, Any]],
+        lexical: List[Dict[str, Any]],
+        query_embedding
+    ) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion of two ranked result lists"""
+        fused: Dict[int, Dict[str, Any]] = {}
+        
+        for source, ranking in (("dense", dense), ("lexical", lexical)):
+            for rank, result in enumerate(ranking, start=1):
+                entry = fused.setdefault(result["id"], {**result, "rrf_score": 0.0, "retrieved_by": []})
+                entry["rrf_score"] += 1.0 / (self.rrf_k + rank)
+                entry["retrieved_by"].append(source)
+                if "bm25_score" in result:
+                    entry["bm25_score"] = result["bm25_score"]
+        
+        ranked = sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)[:self.top_k]
+        
+        # Keyword-only hits have no similarity yet; score them so confidence stays comparable
+        missing = [r["id"] for r in ranked if "score" not in r]
+        if missing:
+            similarities = self.vectorstore.score_documents(query_embedding, missing)
+            for result in ranked:
+                if "score" not in result:
+                    result["score"] = similarities.get(result["id"], 0.0)
+        
+        self.logger.info(
+            f"Hybrid retrieval fused {len(dense)} dense and {len(lexical)} keyword results"
+        )
         
-        return semantic_results
+        return ranked
@@ -0,0 +1,355 @@
+"""
+Vector Store Storage
+
+Versioned binary on-disk format for the vector store. Every large
+array is a raw .npy file opened with ``mmap_mode``, so loading is O(1)
+and several worker processes share one copy through the page cache.
+
+Layout of an index directory (format version 2):
+    manifest.json          format version, dimension, counts, store version,
+                           generation
+    vectors.<g>.npy        (n, dimension) float32 or float16
+    ids.<g>.npy            (n,) int64 stable document IDs
+    texts.<g>.bin          UTF-8 chunk texts, concatenated
+    text_offsets.<g>.npy   (n + 1,) int64 byte offsets into texts.bin
+    metadata_columns.json  column names and per-column value dictionaries
+    metadata_codes.<g>.npy (columns, n) int32 dictionary codes, -1 = missing
+    deleted.npy            packed bitmap of tombstoned rows (optional)
+
+Memory-mapped files are never replaced in place, which fails on Windows
+while a mapping is open: every save writes them under a new generation
+``<g>`` named by the manifest, and the previous generation is deleted
+once nothing maps it any more. Manifests without a generation name the
+files without one.
+
+``deleted.npy`` is the only file rewritten when documents are deleted;
+tombstoned rows stay in the other files until the store is compacted.
+"""
+
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import json
+import logging
+import os
+from pathlib import Path
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+TEXTS_FILE = "texts.bin"
+TEXT_OFFSETS_FILE = "text_offsets.npy"
+METADATA_COLUMNS_FILE = "metadata_columns.json"
+METADATA_CODES_FILE = "metadata_codes.npy"
+DELETED_FILE = "deleted.npy"
+
+# Files opened with mmap, and so written per generation
+MAPPED_FILES = (VECTORS_FILE, IDS_FILE, TEXTS_FILE, TEXT_OFFSETS_FILE, METADATA_CODES_FILE)
+
+VECTOR_DTYPES = {"float32": np.float32, "float16": np.float16}
+
+
+def value_key(value: Any) -> str:
+    """Hashable, type-aware key for a metadata value"""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def generation_file(name: str, generation: Optional[int]) -> str:
+    """Name of one generation of a file: texts.bin -> texts.<generation>.bin"""
+    if generation is None:
+        return name
+    stem, suffix = name.split(".", 1)
+    return f"{stem}.{generation}.{suffix}"
+
+
+def next_generation(directory: Path, header: str = MANIFEST_FILE) -> int:
+    """Generation following the one recorded in a directory's header file"""
+    path = directory / header
+    if not path.exists():
+        return 1
+    return int(load_json(path).get("generation") or 0) + 1
+
+
+def remove_stale_generations(directory: Path, names: Iterable[str], generation: int):
+    """
+    Delete every other generation of ``names``, including unversioned copies.
+
+    Call it only after the caller has dropped its own mappings of the old
+    files. A file still mapped by another process cannot be deleted on
+    Windows; it is left for the next save to remove.
+    """
+    for name in names:
+        stem, suffix = name.split(".", 1)
+        for path in [directory / name, *directory.glob(f"{stem}.*.{suffix}")]:
+            tag = path.name[len(stem) + 1:-len(suffix) - 1]
+            if path.name != name and not (tag.isdigit() and int(tag) != generation):
+                continue
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug(f"Could not delete stale {path}, retrying on the next save: {e}")
+
+
+def _replace_atomically(target: Path, write):
+    """Write to a temporary sibling and rename it over the target"""
+    tmp = target.with_name(target.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, target)
+
+
+def save_array(path: Path, array: np.ndarray):
+    """Atomically save an array as .npy"""
+    def write(tmp: Path):
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+    _replace_atomically(path, write)
+
+
+def load_array(path: Path, mmap: bool = True) -> np.ndarray:
+    """Open a .npy array, read-only memory-mapped by default"""
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def save_bitmap(path: Path, mask: np.ndarray):
+    """Atomically save a boolean row mask as a packed bitmap (one bit per row)"""
+    save_array(path, np.packbits(np.asarray(mask, dtype=bool)))
+
+
+def load_bitmap(path: Path, count: int) -> np.ndarray:
+    """Writable boolean mask of ``count`` rows; rows beyond the stored bitmap are False"""
+    mask = np.zeros(count, dtype=bool)
+    if path.exists():
+        bits = np.unpackbits(load_array(path, mmap=False)).astype(bool)
+        stored = min(count, bits.shape[0])
+        mask[:stored] = bits[:stored]
+    return mask
+
+
+def save_json(path: Path, payload: Dict[str, Any]):
+    """Atomically save compact JSON"""
+    def write(tmp: Path):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    _replace_atomically(path, write)
+
+
+def load_json(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TextStore:
+    """
+    Append-only text column backed by an offsets array and a byte blob.
+
+    Texts loaded from disk stay in the memory-mapped blob and are only
+    decoded when a row is accessed; new texts are kept in a list until
+    the next save.
+    """
+
+    def __init__(
+        self,
+        blob: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None
+    ):
+        self._blob = blob if blob is not None else np.empty(0, dtype=np.uint8)
+        self._offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self._appended: List[str] = []
+
+    @property
+    def _base_count(self) -> int:
+        return self._offsets.shape[0] - 1
+
+    def __len__(self) -> int:
+        return self._base_count + len(self._appended)
+
+    def __getitem__(self, row: int) -> str:
+        if row < self._base_count:
+            start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+            return bytes(self._blob[start:end]).decode("utf-8")
+        return self._appended[row - self._base_count]
+
+    def __iter__(self) -> Iterable[str]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def append(self, texts: List[str]):
+        self._appended.extend(texts)
+
+    def take(self, keep: np.ndarray) -> "TextStore":
+        """New in-memory store holding only the rows where ``keep`` is True"""
+        store = TextStore()
+        store.append([self[row] for row in np.flatnonzero(keep).tolist()])
+        return store
+
+    def write(self, directory: Path, generation: Optional[int] = None):
+        """
+        Write a generation of texts.bin and text_offsets.npy, then reopen
+        the store from it so the previous files are no longer mapped.
+        """
+        offsets = np.empty(len(self) + 1, dtype=np.int64)
+        offsets[:self._base_count + 1] = self._offsets
+
+        def write_blob(tmp: Path):
+            with open(tmp, "wb") as f:
+                f.write(memoryview(np.ascontiguousarray(self._blob)))
+                position = int(self._offsets[-1])
+                for i, text in enumerate(self._appended):
+                    encoded = text.encode("utf-8")
+                    f.write(encoded)
+                    position += len(encoded)
+                    offsets[self._base_count + i + 1] = position
+
+        _replace_atomically(directory / generation_file(TEXTS_FILE, generation), write_blob)
+        save_array(directory / generation_file(TEXT_OFFSETS_FILE, generation), offsets)
+
+        written = TextStore.open(directory, generation)
+        self._blob, self._offsets, self._appended = written._blob, written._offsets, []
+
+    @classmethod
+    def open(cls, directory: Path, generation: Optional[int] = None) -> "TextStore":
+        offsets = load_array(directory / generation_file(TEXT_OFFSETS_FILE, generation))
+        blob_path = directory / generation_file(TEXTS_FILE, generation)
+        if blob_path.stat().st_size == 0:
+            return cls(offsets=np.asarray(offsets))
+        return cls(blob=np.memmap(blob_path, dtype=np.uint8, mode="r"), offsets=offsets)
+
+
+class MetadataColumns:
+    """
+    Dictionary-encoded columnar metadata.
+
+    Each metadata key is a column holding one int32 code per row; the
+    code indexes that column's list of distinct values, and -1 marks a
+    row without the key.
+    """
+
+    MISSING = -1
+
+    def __init__(
+        self,
+        names: Optional[List[str]] = None,
+        values: Optional[List[List[Any]]] = None,
+        codes: Optional[np.ndarray] = None,
+        count: int = 0
+    ):
+        self.names: List[str] = list(names or [])
+        self.values: List[List[Any]] = [list(v) for v in (values or [])]
+        self._codes = codes if codes is not None else np.empty((len(self.names), 0), dtype=np.int32)
+        self._count = count
+        self._column_index = {name: i for i, name in enumerate(self.names)}
+        self._lookups: Dict[int, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def codes(self) -> np.ndarray:
+        """(columns, rows) view of the populated codes"""
+        return self._codes[:, :self._count]
+
+    def _lookup(self, column: int) -> Dict[str, int]:
+        if column not in self._lookups:
+            self._lookups[column] = {
+                value_key(value): code for code, value in enumerate(self.values[column])
+            }
+        return self._lookups[column]
+
+    def locate(self, name: str, value: Any) -> Tuple[Optional[int], Optional[int]]:
+        """(column, code) of a metadata value; either is None if never stored"""
+        column = self._column_index.get(name)
+        if column is None:
+            return None, None
+        return column, self._lookup(column).get(value_key(value))
+
+    def _add_column(self, name: str) -> int:
+        column = len(self.names)
+        self.names.append(name)
+        self.values.append([])
+        self._column_index[name] = column
+        missing = np.full((1, self._codes.shape[1]), self.MISSING, dtype=np.int32)
+        self._codes = np.vstack([self._codes, missing])
+        return column
+
+    def _ensure_capacity(self, needed: int):
+        if needed > self._codes.shape[1]:
+            capacity = max(needed, self._codes.shape[1] * 2, 1024)
+            grown = np.full((len(self.names), capacity), self.MISSING, dtype=np.int32)
+            grown[:, :self._count] = self._codes[:, :self._count]
+            self._codes = grown
+
+    def append(self, rows: List[Dict[str, Any]]):
+        """Encode and append metadata rows"""
+        for name in dict.fromkeys(key for row in rows for key in row):
+            if name not in self._column_index:
+                self._add_column(name)
+
+        start = self._count
+        self._ensure_capacity(start + len(rows))
+
+        for offset, row in enumerate(rows):
+            for name, value in row.items():
+                column = self._column_index[name]
+                lookup = self._lookup(column)
+                key = value_key(value)
+                code = lookup.get(key)
+                if code is None:
+                    code = len(self.values[column])
+                    self.values[column].append(value)
+                    lookup[key] = code
+                self._codes[column, start + offset] = code
+
+        self._count = start + len(rows)
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """Decode one row back into a metadata dict"""
+        codes = self._codes[:, row]
+        return {
+            name: self.values[column][int(codes[column])]
+            for column, name in enumerate(self.names)
+            if codes[column] != self.MISSING
+        }
+
+    def take(self, keep: np.ndarray) -> "MetadataColumns":
+        """New columns object holding only the rows where ``keep`` is True"""
+        kept = np.ascontiguousarray(self.codes[:, keep])
+        return MetadataColumns(self.names, self.values, kept, kept.shape[1])
+
+    def write(self, directory: Path, generation: Optional[int] = None):
+        """Write the columns and a generation of the codes, then map the codes from it"""
+        save_json(directory / METADATA_COLUMNS_FILE, {
+            "names": self.names,
+            "values": self.values
+        })
+        codes_path = directory / generation_file(METADATA_CODES_FILE, generation)
+        save_array(codes_path, np.ascontiguousarray(self.codes))
+        self._codes = load_array(codes_path)
+
+    @classmethod
+    def open(cls, directory: Path, generation: Optional[int] = None) -> "MetadataColumns":
+        columns = load_json(directory / METADATA_COLUMNS_FILE)
+        codes = load_array(directory / generation_file(METADATA_CODES_FILE, generation))
+        return cls(columns["names"], columns["values"], codes, codes.shape[1])
+
+
+def write_manifest(directory: Path, manifest: Dict[str, Any]):
+    """Write the manifest last so a complete set of files is always visible"""
+    save_json(directory / MANIFEST_FILE, {"format_version": FORMAT_VERSION, **manifest})
+
+
+def read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    """Return the manifest, or None for stores written before format version 2"""
+    path = directory / MANIFEST_FILE
+    if not path.exists():
+        return None
+
+    manifest = load_json(path)
+    version = manifest.get("format_version")
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported vector store format version {version} at {directory} "
+            f"(expected {FORMAT_VERSION})"
+        )
+    return manifest
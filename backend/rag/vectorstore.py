@@ -1,7 +1,8 @@
 """
 Vector Store
 
-FAISS-based vector store for similarity search.
+NumPy-backed vector store for similarity search, with an IVF
+approximate index for large corpora.
 """
 
 from typing import List, Dict, Any, Optional, Tuple
@@ -9,53 +10,182 @@ import logging
 import numpy as np
 from pathlib import Path
 import json
+import threading
+
+from .ann_index import IVFIndex, top_k_indices
+from . import storage
+from .storage import TextStore, MetadataColumns
+from .metadata_index import MetadataIndex
+from .bm25 import BM25Index
 
 logger = logging.getLogger(__name__)
 
 
 class VectorStore:
     """
-    FAISS-based vector store for document embeddings.
-    
+    Vector store for document embeddings.
+
+    Vectors live in one contiguous float32 matrix. With the default
+    cosine metric they are L2-normalized on insert, so similarity is a
+    single matrix-vector product followed by an argpartition top-k.
+
     Features:
-    - Similarity search
+    - Exact vectorized similarity search
+    - IVF approximate search above ``ann_threshold`` documents
     - Metadata filtering
-    - Index persistence
+    - Memory-mapped binary persistence (see ``rag.storage``)
+    - Tombstone deletion with stable IDs and background compaction
+    - Optional BM25 lexical index kept in sync with the documents
     - Batch operations
     """
-    
+
+    METRICS = ("cosine", "ip")
+    SCORE_BLOCK_ROWS = 65536
+
     def __init__(
         self,
         dimension: int = 384,
-        index_path: Optional[str] = None
+        index_path: Optional[str] = None,
+        metric: str = "cosine",
+        ann_threshold: int = 20000,
+        ann_nlist: Optional[int] = None,
+        ann_nprobe: int = 8,
+        storage_dtype: str = "float32",
+        indexed_metadata: Optional[List[str]] = None,
+        compaction_threshold: float = 0.2,
+        lexical_index: bool = True
     ):
+        if metric not in self.METRICS:
+            raise ValueError(f"Unsupported metric '{metric}', expected one of {self.METRICS}")
+
+        if storage_dtype not in storage.VECTOR_DTYPES:
+            raise ValueError(
+                f"Unsupported storage dtype '{storage_dtype}', "
+                f"expected one of {tuple(storage.VECTOR_DTYPES)}"
+            )
+
         self.dimension = dimension
         self.index_path = index_path
-        self.index = None
-        self.documents: List[Dict[str, Any]] = []
-        self.metadata: List[Dict[str, Any]] = []
+        self.metric = metric
+        self.ann_threshold = ann_threshold
+        self.ann_nlist = ann_nlist
+        self.ann_nprobe = ann_nprobe
+        self.storage_dtype = storage_dtype
+        self.indexed_metadata = list(indexed_metadata or MetadataIndex.DEFAULT_INDEXED)
+        self.compaction_threshold = compaction_threshold
+        self.lexical_enabled = lexical_index
+        self.lexical: Optional[BM25Index] = None
+        self.version = 0
+        self._mutations = 0
+        self.index: Optional[IVFIndex] = None
+        self._vectors = np.empty((0, dimension), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._texts = TextStore()
+        self._metadata = MetadataColumns()
+        self._metadata_index = MetadataIndex(self._metadata, self.indexed_metadata)
+        self._deleted = np.zeros(0, dtype=bool)
+        self._deleted_count = 0
+        self._count = 0
+        self._next_id = 0
+        # Guards row-aligned state against the background compaction thread
+        self._lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        # Directory whose rows are a prefix of the rows in memory, and how
+        # many rows it holds; deletions can then be saved as a bitmap alone
+        self._saved_path: Optional[Path] = None
+        self._saved_rows = 0
         self.logger = logging.getLogger("rag.vectorstore")
-        
+
         if index_path and Path(index_path).exists():
             self.load()
         else:
             self._initialize_index()
-    
+
     def _initialize_index(self):
-        """Initialize a new FAISS index"""
-        try:
-            # This will use FAISS when installed
-            # import faiss
-            # self.index = faiss.IndexFlatL2(self.dimension)
-            
-            self.logger.info(f"Initialized FAISS index (dimension: {self.dimension})")
-            # Placeholder
-            self.index = {"dimension": self.dimension, "vectors": []}
-            
-        except Exception as e:
-            self.logger.error(f"Failed to initialize FAISS index: {e}")
-            raise
-    
+        """Initialize an empty vector matrix and ANN index"""
+        self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._texts = TextStore()
+        self._metadata = MetadataColumns()
+        self._deleted = np.zeros(0, dtype=bool)
+        self._deleted_count = 0
+        self._count = 0
+        self._mutations += 1
+        self._saved_path = None
+        self.lexical = BM25Index() if self.lexical_enabled else None
+        self.index = IVFIndex(
+            dimension=self.dimension,
+            nlist=self.ann_nlist,
+            nprobe=self.ann_nprobe
+        )
+        self.logger.info(f"Initialized vector index (dimension: {self.dimension}, metric: {self.metric})")
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View over the populated rows of the vector matrix"""
+        return self._vectors[:self._count]
+
+    def __len__(self) -> int:
+        return self._count - self._deleted_count
+
+    @property
+    def revision(self) -> str:
+        """Token that changes whenever the searchable content changes"""
+        return f"{self.version}.{self._mutations}"
+
+    def get_document(self, row: int) -> Dict[str, Any]:
+        """Materialize the document stored at a matrix row"""
+        return {
+            "id": int(self._ids[row]),
+            "text": self._texts[row],
+            "metadata": self._metadata.row(row)
+        }
+
+    def _prepare_vectors(self, embeddings) -> np.ndarray:
+        """Convert embeddings to a contiguous float32 matrix, normalized for cosine"""
+        array = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if array.ndim == 1:
+            array = array.reshape(1, -1)
+
+        if array.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {array.shape[1]} does not match store dimension {self.dimension}"
+            )
+
+        if self.metric == "cosine":
+            norms = np.linalg.norm(array, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            array = array / norms
+
+        return array
+
+    def _append_vectors(self, array: np.ndarray, ids: np.ndarray):
+        """
+        Append rows, growing the backing arrays geometrically.
+
+        A store opened from disk is backed by read-only memory maps; the
+        first append copies them into writable float32 arrays.
+        """
+        needed = self._count + array.shape[0]
+        if needed > self._vectors.shape[0] or not self._vectors.flags.writeable:
+            capacity = max(needed, self._vectors.shape[0] * 2, 1024)
+            grown = np.empty((capacity, self.dimension), dtype=np.float32)
+            grown[:self._count] = self._vectors[:self._count]
+            self._vectors = grown
+
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:self._count] = self._ids[:self._count]
+            self._ids = grown_ids
+
+            grown_deleted = np.zeros(capacity, dtype=bool)
+            grown_deleted[:self._count] = self._deleted[:self._count]
+            self._deleted = grown_deleted
+
+        self._vectors[self._count:needed] = array
+        self._ids[self._count:needed] = ids
+        self._deleted[self._count:needed] = False
+        self._count = needed
+
     def add_documents(
         self,
         texts: List[str],
@@ -64,52 +194,106 @@ class VectorStore:
     ) -> List[int]:
         """
         Add documents to the vector store.
-        
+
         Args:
             texts: Document texts
             embeddings: Document embeddings
             metadata: Optional metadata for each document
-        
+
         Returns:
             List of document IDs
         """
         if len(texts) != len(embeddings):
             raise ValueError("Number of texts and embeddings must match")
-        
+
         if metadata and len(metadata) != len(texts):
             raise ValueError("Number of metadata entries must match texts")
-        
-        # Convert embeddings to numpy array
-        embeddings_array = np.array(embeddings).astype('float32')
-        
-        # Add to FAISS index
-        # self.index.add(embeddings_array)
-        
-        # Store documents and metadata
-        start_id = len(self.documents)
-        doc_ids = []
-        
-        for i, (text, embedding) in enumerate(zip(texts, embeddings)):
-            doc_id = start_id + i
-            doc_ids.append(doc_id)
-            
-            self.documents.append({
-                "id": doc_id,
-                "text": text
-            })
-            
-            if metadata:
-                self.metadata.append(metadata[i])
-            else:
-                self.metadata.append({})
-        
-        # Placeholder: store in dict
-        self.index["vectors"].extend(embeddings_array.tolist())
-        
+
+        if not texts:
+            return []
+
+        embeddings_array = self._prepare_vectors(embeddings)
+
+        with self._lock:
+            # IDs are never reused and grow with the row order, so the id
+            # column stays sorted and lookups can binary-search it
+            doc_ids = list(range(self._next_id, self._next_id + len(texts)))
+            self._next_id += len(texts)
+
+            self._append_vectors(embeddings_array, np.asarray(doc_ids, dtype=np.int64))
+
+            # Keep the ANN lists in sync; retraining happens lazily on search
+            if self.index is not None and self.index.is_trained:
+                self.index.add(embeddings_array)
+
+            # Store texts and metadata
+            self._texts.append(list(texts))
+            self._metadata.append(metadata if metadata else [{} for _ in texts])
+
+            if self.lexical is not None:
+                self.lexical.add(doc_ids, texts)
+
+            self._mutations += 1
+
         self.logger.info(f"Added {len(texts)} documents to vector store")
-        
+
         return doc_ids
-    
+
+    def _filter_mask(self, filter_metadata: Dict[str, Any]) -> np.ndarray:
+        """Boolean row mask for documents matching every filter term"""
+        # Deletion and loading swap the columns object; rebuild the bitmaps then
+        if self._metadata_index.columns is not self._metadata:
+            self._metadata_index = MetadataIndex(self._metadata, self.indexed_metadata)
+        return self._metadata_index.mask(filter_metadata)
+
+    def _score(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Similarity of the query against all rows, or the given ones.
+
+        float16 matrices loaded from disk are upcast block by block so a
+        query never materializes a float32 copy of the whole matrix.
+        """
+        matrix = self.vectors if rows is None else self.vectors[rows]
+        if matrix.dtype == np.float32:
+            return matrix @ query
+
+        scores = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], self.SCORE_BLOCK_ROWS):
+            block = matrix[start:start + self.SCORE_BLOCK_ROWS]
+            scores[start:start + block.shape[0]] = block.astype(np.float32) @ query
+        return scores
+
+    def _use_ann(self, candidate_count: int) -> bool:
+        """Whether the approximate index should serve this query"""
+        if self.index is None or self._count < self.ann_threshold:
+            return False
+
+        # Narrow filters are cheaper to scan exactly than to probe
+        if candidate_count < self.ann_threshold:
+            return False
+
+        if not self.index.is_trained or self._count > 2 * self.index.trained_size:
+            self.index.train(self.vectors)
+
+        return True
+
+    def _exact_search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over all rows, or only the masked ones"""
+        if mask is None:
+            scores = self._score(query)
+            rows = top_k_indices(scores, top_k)
+            return rows, scores[rows]
+
+        candidates = np.flatnonzero(mask)
+        scores = self._score(query, candidates)
+        best = top_k_indices(scores, top_k)
+        return candidates[best], scores[best]
+
     def search(
         self,
         query_embedding: np.ndarray,
@@ -118,100 +302,373 @@ class VectorStore:
     ) -> List[Dict[str, Any]]:
         """
         Search for similar documents.
-        
+
         Args:
             query_embedding: Query embedding vector
             top_k: Number of results to return
-            filter_metadata: Optional metadata filters
-        
+            filter_metadata: Optional metadata filters, {key: value} or
+                {key: {"$in": [values]}}; applied before scoring
+
         Returns:
             List of search results with documents and scores
         """
-        if not self.documents:
-            return []
-        
-        # Perform FAISS search
-        # query_array = np.array([query_embedding]).astype('float32')
-        # distances, indices = self.index.search(query_array, top_k)
-        
-        # Placeholder: return first k documents
-        results = []
-        
-        for i in range(min(top_k, len(self.documents))):
-            doc = self.documents[i]
-            meta = self.metadata[i] if i < len(self.metadata) else {}
-            
-            # Apply metadata filtering
-            if filter_metadata:
-                if not all(meta.get(k) == v for k, v in filter_metadata.items()):
-                    continue
-            
-            results.append({
-                "id": doc["id"],
-                "text": doc["text"],
-                "metadata": meta,
-                "score": 0.9 - (i * 0.1)  # Placeholder score
-            })
-        
+        query = self._prepare_vectors(query_embedding)[0]
+
+        with self._lock:
+            if len(self) == 0:
+                return []
+
+            # Filters and tombstones are applied before scoring so top-k stays exact
+            mask = self._filter_mask(filter_metadata) if filter_metadata else None
+            if self._deleted_count:
+                live = ~self._deleted[:self._count]
+                mask = live if mask is None else mask & live
+            candidate_count = int(mask.sum()) if mask is not None else self._count
+
+            if candidate_count == 0:
+                return []
+
+            if self._use_ann(candidate_count):
+                rows, scores = self.index.search(self.vectors, query, top_k, mask)
+                # Probed lists can hold fewer than top_k matches; fall back to exact
+                if rows.shape[0] < min(top_k, candidate_count):
+                    rows, scores = self._exact_search(query, top_k, mask)
+            else:
+                rows, scores = self._exact_search(query, top_k, mask)
+
+            results = []
+            for row, score in zip(rows.tolist(), scores.tolist()):
+                result = self.get_document(row)
+                result["score"] = float(score)
+                results.append(result)
+
         self.logger.info(f"Search returned {len(results)} results")
-        
+
         return results
-    
-    def delete_documents(self, doc_ids: List[int]):
-        """Delete documents by ID"""
-        # FAISS doesn't support deletion, need to rebuild index
-        self.documents = [doc for doc in self.documents if doc["id"] not in doc_ids]
-        self.metadata = [meta for i, meta in enumerate(self.metadata) if i not in doc_ids]
-        
-        self.logger.info(f"Deleted {len(doc_ids)} documents")
-        
-        # Would need to rebuild FAISS index here
-    
+
+    def _rows_for_ids(self, doc_ids: List[int]) -> np.ndarray:
+        """Row numbers of the given IDs that exist in the store"""
+        ids = self._ids[:self._count]
+        wanted = np.unique(np.asarray(doc_ids, dtype=np.int64))
+        positions = np.searchsorted(ids, wanted)
+        positions = positions[positions < self._count]
+        return positions[np.isin(ids[positions], wanted)]
+
+    def delete_documents(self, doc_ids: List[int]) -> int:
+        """
+        Delete documents by ID.
+
+        Rows are only tombstoned, which is O(k log n) for k IDs; searches
+        skip them immediately and ``save_deletions`` persists them. Once
+        tombstones exceed ``compaction_threshold`` of the rows, a
+        background thread compacts the store.
+
+        Returns:
+            Number of documents that were deleted
+        """
+        with self._lock:
+            rows = self._rows_for_ids(doc_ids)
+            rows = rows[~self._deleted[rows]]
+            if rows.shape[0] == 0:
+                return 0
+
+            self._deleted[rows] = True
+            self._deleted_count += int(rows.shape[0])
+
+            if self.lexical is not None:
+                self.lexical.remove(self._ids[rows].tolist())
+
+            self._mutations += 1
+
+        self.logger.info(f"Deleted {rows.shape[0]} documents")
+
+        if self._deleted_count >= self.compaction_threshold * self._count:
+            self.compact_in_background()
+
+        return int(rows.shape[0])
+
+    def compact(self):
+        """Physically drop tombstoned rows from vectors, ids, texts and metadata"""
+        with self._lock:
+            if not self._deleted_count:
+                return
+
+            keep = ~self._deleted[:self._count]
+            removed = self._deleted_count
+
+            self._texts = self._texts.take(keep)
+            self._metadata = self._metadata.take(keep)
+            self._vectors = np.ascontiguousarray(self.vectors[keep], dtype=np.float32)
+            self._ids = np.ascontiguousarray(self._ids[:self._count][keep])
+            self._count = self._vectors.shape[0]
+            self._deleted = np.zeros(self._count, dtype=bool)
+            self._deleted_count = 0
+            # The files on disk no longer line up with the rows
+            self._saved_path = None
+
+            # Row numbers shifted, so the ANN lists must be rebuilt
+            if self.index is not None:
+                self.index.reset()
+
+        self.logger.info(f"Compacted vector store: dropped {removed} rows, {self._count} remain")
+
+    def compact_in_background(self) -> bool:
+        """Start a compaction thread unless one is already running"""
+        if self._compaction is not None and self._compaction.is_alive():
+            return False
+
+        self._compaction = threading.Thread(
+            target=self.compact, name="vectorstore-compaction", daemon=True
+        )
+        self._compaction.start()
+        return True
+
     def save(self, path: Optional[str] = None):
-        """Save the vector store to disk"""
+        """
+        Save the vector store to disk in the binary format.
+
+        Memory-mapped files are written as a new generation and the
+        manifest is written last, so readers that open the store
+        concurrently see either the old or the new version. The store then
+        maps the new generation and deletes the old one. The store version
+        is bumped on every save.
+
+        Tombstoned rows are written along with the deleted bitmap unless
+        they exceed ``compaction_threshold``, in which case the store is
+        compacted first.
+        """
         save_path = path or self.index_path
-        
+
         if not save_path:
             raise ValueError("No save path specified")
-        
+
         save_path = Path(save_path)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Save FAISS index
-        # faiss.write_index(self.index, str(save_path / "index.faiss"))
-        
-        # Save documents and metadata
-        with open(save_path / "documents.json", 'w', encoding='utf-8') as f:
-            json.dump(self.documents, f, ensure_ascii=False, indent=2)
-        
-        with open(save_path / "metadata.json", 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
-        
-        self.logger.info(f"Vector store saved to {save_path}")
-    
+        save_path.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            if self._needs_compaction():
+                self.compact()
+            self._write(save_path)
+            self._saved_path = save_path
+            self._saved_rows = self._count
+
+        self.logger.info(f"Vector store saved to {save_path} (version {self.version})")
+
+    def save_deletions(self, path: Optional[str] = None):
+        """
+        Persist tombstones by rewriting only the deleted bitmap.
+
+        This is O(n / 8) bytes instead of a full rewrite. It falls back to
+        ``save()`` when the store was compacted since it was last saved to
+        or loaded from ``path`` (the rows on disk no longer line up), or
+        when the tombstones call for compaction anyway.
+        """
+        if not (path or self.index_path):
+            raise ValueError("No save path specified")
+
+        save_path = Path(path or self.index_path)
+
+        with self._lock:
+            if self._saved_path != save_path or self._needs_compaction():
+                self.save(str(save_path))
+                return
+            storage.save_bitmap(save_path / storage.DELETED_FILE, self._deleted[:self._saved_rows])
+
+        self.logger.info(f"Saved {self._deleted_count} tombstones to {save_path}")
+
+    def _needs_compaction(self) -> bool:
+        return self._deleted_count > 0 and self._deleted_count >= self.compaction_threshold * self._count
+
+    def _write(self, save_path: Path):
+        generation = storage.next_generation(save_path)
+        vectors_path = save_path / storage.generation_file(storage.VECTORS_FILE, generation)
+        ids_path = save_path / storage.generation_file(storage.IDS_FILE, generation)
+
+        dtype = storage.VECTOR_DTYPES[self.storage_dtype]
+        storage.save_array(vectors_path, self.vectors.astype(dtype, copy=False))
+        storage.save_array(ids_path, self._ids[:self._count])
+        self._texts.write(save_path, generation)
+        self._metadata.write(save_path, generation)
+        storage.save_bitmap(save_path / storage.DELETED_FILE, self._deleted[:self._count])
+
+        self.version += 1
+        if self.lexical is not None:
+            self.lexical.save(save_path, store_version=self.version)
+        storage.write_manifest(save_path, {
+            "version": self.version,
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "count": self._count,
+            "next_id": self._next_id,
+            "vector_dtype": self.storage_dtype,
+            "generation": generation
+        })
+
+        # Map the new generation so nothing holds the previous one open
+        self._vectors = storage.load_array(vectors_path)
+        self._ids = storage.load_array(ids_path)
+        storage.remove_stale_generations(save_path, storage.MAPPED_FILES, generation)
+
     def load(self, path: Optional[str] = None):
-        """Load the vector store from disk"""
+        """
+        Load the vector store from disk.
+
+        Arrays are memory-mapped rather than read, so this is O(1) in the
+        corpus size; pages are faulted in as searches touch them.
+        """
         load_path = Path(path or self.index_path)
-        
+
         if not load_path.exists():
             raise FileNotFoundError(f"Vector store not found at {load_path}")
-        
-        # Load FAISS index
-        # self.index = faiss.read_index(str(load_path / "index.faiss"))
-        
-        # Load documents and metadata
-        with open(load_path / "documents.json", 'r', encoding='utf-8') as f:
-            self.documents = json.load(f)
-        
+
+        self._initialize_index()
+
+        manifest = storage.read_manifest(load_path)
+        if manifest is None:
+            self._load_legacy(load_path)
+            return
+
+        if manifest["dimension"] != self.dimension:
+            raise ValueError(
+                f"Stored dimension {manifest['dimension']} does not match store dimension {self.dimension}"
+            )
+
+        self.metric = manifest["metric"]
+        self.storage_dtype = manifest["vector_dtype"]
+        self.version = manifest["version"]
+        self._next_id = manifest["next_id"]
+        generation = manifest.get("generation")
+        self._vectors = storage.load_array(load_path / storage.generation_file(storage.VECTORS_FILE, generation))
+        self._ids = storage.load_array(load_path / storage.generation_file(storage.IDS_FILE, generation))
+        self._texts = TextStore.open(load_path, generation)
+        self._metadata = MetadataColumns.open(load_path, generation)
+        self._count = manifest["count"]
+        self._deleted = storage.load_bitmap(load_path / storage.DELETED_FILE, self._count)
+        self._deleted_count = int(self._deleted.sum())
+        self._saved_path = load_path
+        self._saved_rows = self._count
+
+        if self.lexical_enabled:
+            self.lexical = BM25Index.load(load_path, store_version=self.version)
+            if self.lexical is None:
+                self._rebuild_lexical()
+            elif self._deleted_count:
+                # Tombstones saved after the BM25 file
+                self.lexical.remove(self._ids[:self._count][self._deleted].tolist())
+
+        self.logger.info(f"Vector store loaded from {load_path} (version {self.version}, {self._count} documents)")
+
+    def _load_legacy(self, load_path: Path):
+        """Read a store written as documents.json/metadata.json (format version 1)"""
+        documents_file = load_path / "documents.json"
+        vectors_file = load_path / "vectors.npy"
+
+        if not documents_file.exists():
+            self.logger.info(f"Empty vector store directory at {load_path}")
+            return
+
+        if not vectors_file.exists():
+            # Stores written before vectors were persisted cannot be searched
+            self.logger.warning(f"No vectors found at {load_path}; re-ingest to enable search")
+            return
+
+        with open(documents_file, 'r', encoding='utf-8') as f:
+            documents = json.load(f)
+
         with open(load_path / "metadata.json", 'r', encoding='utf-8') as f:
-            self.metadata = json.load(f)
-        
-        self.logger.info(f"Vector store loaded from {load_path}")
-    
+            metadata = json.load(f)
+
+        vectors = np.load(vectors_file).astype(np.float32)
+        ids = np.asarray([doc["id"] for doc in documents], dtype=np.int64)
+
+        # Rows must be in ID order for binary-searched deletes
+        order = np.argsort(ids, kind="stable")
+        vectors, ids = vectors[order], ids[order]
+        documents = [documents[i] for i in order.tolist()]
+        metadata = [metadata[i] for i in order.tolist()]
+
+        self._append_vectors(vectors, ids)
+        self._texts.append([doc["text"] for doc in documents])
+        self._metadata.append(metadata)
+        self._next_id = int(ids.max()) + 1 if ids.size else 0
+        self._rebuild_lexical()
+
+        self.logger.info(f"Legacy vector store loaded from {load_path}; next save upgrades it")
+
+    def _rebuild_lexical(self):
+        """Build the BM25 index from the stored texts"""
+        if not self.lexical_enabled:
+            return
+        self.lexical = BM25Index()
+        live = np.flatnonzero(~self._deleted[:self._count])
+        self.lexical.add(self._ids[live].tolist(), [self._texts[row] for row in live.tolist()])
+        self.logger.info(f"Rebuilt BM25 index over {len(self.lexical)} documents")
+
+    def _live_ids(self, filter_metadata: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Sorted IDs of live documents matching a filter, or None for no restriction"""
+        if not filter_metadata and not self._deleted_count:
+            return None
+        mask = ~self._deleted[:self._count]
+        if filter_metadata:
+            mask &= self._filter_mask(filter_metadata)
+        return self._ids[:self._count][mask]
+
+    def lexical_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        BM25 keyword search over the stored texts.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            filter_metadata: Optional metadata filters, as for ``search``
+
+        Returns:
+            List of results with documents and ``bm25_score``
+        """
+        if self.lexical is None:
+            return []
+
+        with self._lock:
+            hits = self.lexical.search(query, top_k, self._live_ids(filter_metadata))
+            if not hits:
+                return []
+
+            rows = self._rows_for_ids([doc_id for doc_id, _ in hits])
+            row_of_id = dict(zip(self._ids[rows].tolist(), rows.tolist()))
+
+            results = []
+            for doc_id, score in hits:
+                result = self.get_document(row_of_id[doc_id])
+                result["bm25_score"] = score
+                results.append(result)
+
+        return results
+
+    def score_documents(self, query_embedding: np.ndarray, doc_ids: List[int]) -> Dict[int, float]:
+        """Similarity of the query to specific documents, by ID"""
+        query = self._prepare_vectors(query_embedding)[0]
+        with self._lock:
+            rows = self._rows_for_ids(doc_ids)
+            scores = self._score(query, rows)
+            return dict(zip(self._ids[rows].tolist(), scores.tolist()))
+
     def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics"""
         return {
-            "total_documents": len(self.documents),
+            "total_documents": len(self),
+            "deleted_pending_compaction": self._deleted_count,
             "dimension": self.dimension,
+            "metric": self.metric,
+            "storage_dtype": self.storage_dtype,
+            "version": self.version,
+            "index_type": "ivf" if self.index is not None and self.index.is_trained else "flat",
+            "ann_threshold": self.ann_threshold,
+            "metadata_index": self._metadata_index.get_stats(),
+            "lexical_index": self.lexical.get_stats() if self.lexical is not None else None,
             "index_path": str(self.index_path) if self.index_path else None
         }
@@ -0,0 +1,41 @@
+import sys
+import os
+import asyncio
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from agents.events import AgentEventStream, emit, TOKEN
+from agents.tools.base_tools import BaseTool
+
+
+class EchoTransport:
+    async def request(self, method, endpoint, params=None, json=None):
+        return {"endpoint": endpoint}
+
+
+def test_tool_calls_and_tokens_reach_the_active_stream():
+    tool = BaseTool(api_base_url="http://test", transport=EchoTransport())
+
+    async def run():
+        # Outside a streamed run emit() is a no-op
+        await emit(TOKEN, content="ignored")
+        events = AgentEventStream(max_pending=2)
+
+        async def agent():
+            events.activate()
+            try:
+                await tool.crud_get_one("EMPLEADO", 1)
+                await emit(TOKEN, content="Hola")
+            finally:
+                events.close()
+
+        task = asyncio.create_task(agent())
+        received = [event async for event in events]
+        await task
+        return received
+
+    received = asyncio.run(run())
+    assert [event["event"] for event in received] == ["tool_start", "tool_end", "token"]
+    assert received[1]["ok"] is True and received[1]["endpoint"] == "/api/v1/crud/EMPLEADO/1"
+    assert received[2]["content"] == "Hola"
@@ -0,0 +1,107 @@
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from agents.events import emit, streaming, TOOL_END
+from orchestrator.job_queue import AgentJobQueue, JobQueueFull
+from orchestrator.job_store import JobStore, create_job_store
+
+
+def test_jobs_run_fairly_persist_and_cancel(tmp_path):
+    store = create_job_store("sqlite", str(tmp_path / "jobs.db"))
+    started = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def runner(job):
+            started.append((job["user_id"], job["task"]))
+            # Progress is tracked, but tokens are not streamed for jobs
+            assert not streaming()
+            await emit(TOOL_END, endpoint="/api/v1/crud/TAREA")
+            if job["task"] == "slow":
+                await asyncio.sleep(60)
+            await gate.wait()
+            return {"answer": job["task"].upper()}
+
+        queue = AgentJobQueue(store, runner, max_workers=2, max_running_per_user=1)
+        first = [await queue.enqueue(1, "assistant_agent", task) for task in ("a1", "a2", "a3")]
+        slow = await queue.enqueue(2, "assistant_agent", "slow")
+        await asyncio.sleep(0.05)
+
+        # One running job per user: user 2 gets a worker even though user 1 queued first
+        assert started == [(1, "a1"), (2, "slow")]
+        assert (await queue.get(slow["job_id"]))["status"] == "running"
+
+        assert await queue.cancel(slow["job_id"])
+        assert await queue.cancel(first[2]["job_id"])
+        gate.set()
+        await asyncio.sleep(0.1)
+
+        jobs = {job["task"]: job for job in (await queue.history(1))["jobs"]}
+        cancelled = await queue.get(slow["job_id"])
+        await queue.close()
+
+        blocked = AgentJobQueue(store, runner, max_running_per_user=0, max_queued_per_user=1)
+        await blocked.enqueue(3, "assistant_agent", "b1")
+        with pytest.raises(JobQueueFull):
+            await blocked.enqueue(3, "assistant_agent", "b2")
+        await blocked.close()
+        return jobs, cancelled
+
+    jobs, cancelled = asyncio.run(scenario())
+    assert cancelled["status"] == "cancelled"
+    assert jobs["a1"]["status"] == "completed" and jobs["a1"]["result"] == {"answer": "A1"}
+    assert jobs["a1"]["progress"] == 100
+    assert jobs["a2"]["status"] == "completed"
+    assert jobs["a3"]["status"] == "cancelled"
+
+
+def test_stale_jobs_are_failed(tmp_path):
+    store = create_job_store("sqlite", str(tmp_path / "jobs.db"))
+    store.create({"job_id": "j1", "user_id": 1, "agent_name": "x", "task": "t", "status": "running", "worker_id": "gone"})
+    assert store.fail_stale(-1) == 1
+    assert store.get("j1")["status"] == "failed"
+    assert not store.request_cancel("j1")
+
+
+class NoCountEngine:
+    """SQL Server engine stand-in: writes report rowcount -1, as under SET NOCOUNT ON."""
+
+    class dialect:
+        name = "mssql"
+
+    def __init__(self, changed):
+        self.changed = changed
+        self.statements = []
+
+    def begin(self):
+        engine = self
+
+        class Connection:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, statement, params=None):
+                engine.statements.append(str(statement))
+                return type("Result", (), {"rowcount": -1, "scalar": lambda self: engine.changed})()
+
+        return Connection()
+
+
+def test_sqlserver_writes_count_rows_with_rowcount_variable():
+    assert JobStore(NoCountEngine(changed=1)).finish("j1", "completed", result={"ok": True})
+    assert not JobStore(NoCountEngine(changed=0)).request_cancel("j1")
+
+    engine = NoCountEngine(changed=3)
+    assert JobStore(engine).fail_stale(60) == 3
+    assert engine.statements[0].startswith("SET NOCOUNT ON;")
+    assert engine.statements[0].endswith("SELECT @@ROWCOUNT")
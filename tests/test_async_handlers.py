@@ -0,0 +1,65 @@
+import ast
+import os
+from pathlib import Path
+
+# Flags blocking calls made directly inside ``async def`` functions of the API.
+# Blocking work belongs in a plain ``def`` handler or behind run_db / run_cpu.
+API_DIR = Path(os.path.dirname(os.path.dirname(__file__))) / "backend" / "api"
+
+BLOCKING_FUNCTIONS = {"verify_password", "get_password_hash", "generate_inspection_report"}
+BLOCKING_MODULES = {"bcrypt", "time"}
+# Session methods that never touch the database
+NON_BLOCKING_DB_METHODS = {"add"}
+
+
+def _call_name(call):
+    func = call.func
+    if isinstance(func, ast.Name):
+        return None, func.id
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return func.value.id, func.attr
+    return None, None
+
+
+def _is_blocking(call):
+    owner, name = _call_name(call)
+    if owner == "db":
+        return name not in NON_BLOCKING_DB_METHODS
+    if call.args and isinstance(call.args[0], ast.Name) and call.args[0].id == "db":
+        # helpers that take the session do database work
+        return True
+    if owner in BLOCKING_MODULES and name in {"sleep", "hashpw", "checkpw", "gensalt"}:
+        return True
+    return name in BLOCKING_FUNCTIONS
+
+
+def _direct_calls(node):
+    """Calls in a function body, skipping nested functions and lambdas."""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(child, ast.Await):
+            # run_db(...) / run_cpu(...) arguments are executed off the loop
+            continue
+        if isinstance(child, ast.Call):
+            yield child
+        yield from _direct_calls(child)
+
+
+def find_blocking_calls():
+    violations = []
+    for path in sorted(API_DIR.rglob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.AsyncFunctionDef):
+                continue
+            for call in _direct_calls(node):
+                if _is_blocking(call):
+                    owner, name = _call_name(call)
+                    label = f"{owner}.{name}" if owner else name
+                    violations.append(f"{path.relative_to(API_DIR)}:{call.lineno} {node.name}: {label}")
+    return violations
+
+
+def test_no_blocking_calls_in_async_handlers():
+    assert find_blocking_calls() == []
@@ -0,0 +1,264 @@
+import sys
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from agents.autonomous_agents import (
+    CoordinationBatch, TaskCoordinatorAgent, dedup_key, insert_tasks, task_row, _like, _multirow_values
+)
+
+
+def _rows(name, fields, *values):
+    """Rows with attribute, index and ``_mapping`` access, like SQLAlchemy's Row"""
+    row_class = type(name, (namedtuple(name, fields),), {"_mapping": property(lambda self: self._asdict())})
+    return [row_class(*row) for row in values]
+
+
+class FakeResult:
+    def __init__(self, rows=None, scalar=None, rowcount=None):
+        self.rows = rows or []
+        self._scalar = scalar
+        self.rowcount = len(self.rows) if rowcount is None else rowcount
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        return self._scalar
+
+
+class FakeSession:
+    """
+    Answers each statement by the first marker found in its SQL and records
+    writes. Like the real engines (SET NOCOUNT ON), writes report a
+    rowcount of -1.
+    """
+
+    def __init__(self, answers=(), fail_on=None, existing_keys=(), open_keys=()):
+        self.answers = answers
+        self.fail_on = fail_on
+        # Keys a concurrent run inserted after this one loaded its state
+        self.existing_keys = set(existing_keys)
+        # Keys of open tasks the NOT EXISTS guard filters out
+        self.open_keys = set(open_keys)
+        self.writes = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.savepoint_rollbacks = 0
+
+    @contextmanager
+    def begin_nested(self):
+        writes = len(self.writes)
+        try:
+            yield
+        except Exception:
+            del self.writes[writes:]
+            self.savepoint_rollbacks += 1
+            raise
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("write failed")
+        if "INSERT INTO TAREA" in sql:
+            keys = [value for name, value in params.items() if name.startswith("dkey_")]
+            if self.existing_keys.intersection(keys):
+                raise IntegrityError(sql, params, Exception(
+                    "[23000] Cannot insert duplicate key row in object 'dbo.TAREA'"
+                    " with unique index 'UX_TAREA_dedup_key'. (2601)"
+                ))
+            self.writes.append((sql, params))
+            inserted = [key for key in keys if key not in self.open_keys]
+            return FakeResult(scalar=len(inserted), rowcount=-1)  # SELECT @@ROWCOUNT
+        if sql.lstrip().startswith("UPDATE"):
+            self.writes.append((sql, params))
+            return FakeResult(rowcount=-1)
+        for marker, result in self.answers:
+            if marker in sql:
+                return result
+        return FakeResult(scalar=0)  # COUNT(*) of the per-row duplicate checks
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _coordinator_answers():
+    today = date.today().isoformat()
+    overdue = _rows(
+        "Overdue", "id_tarea Descripcion Fecha Prioridad Estado CorreoResponsable Nombre DiasVencida",
+        (501, "Entregar matriz", None, "Alta", "Pendiente", "ana@empresa.co", "Ana", 9),
+        (502, "Revisar botiquín", None, "Media", "Pendiente", "luis@empresa.co", "Luis", 5),
+    )
+    open_tasks = _rows(
+        "Task", "id_tarea id_empleado_responsable Descripcion Estado dedup_key Hoy",
+        (600, 7, "Realizar Examen Médico Ocupacional", "Pendiente", dedup_key("emo", 7), 0),
+        (601, 11, "Ejecutar capacitación pendiente: Alturas", "Pendiente", None, 1),
+    )
+    alerts = _rows(
+        "Alert", "Tipo Mensaje Prioridad",
+        ("Extintor", "Extintor vencido en bodega", "Crítica"),
+        ("Extintor", "Extintor vencido en bodega", "Crítica"),
+    )
+    return [
+        ("SP_Monitorear_Tareas_Vencidas", FakeResult(overdue)),
+        ("SP_Generar_Tareas_Vigencia", FakeResult(_rows("Generated", "TareasGeneradas", (0,)))),
+        ("FROM TAREA\n    WHERE Estado IN", FakeResult(open_tasks)),
+        ("EXAMEN_MEDICO_VENCIDO", FakeResult(_rows("EmoAlert", "id_empleado", (8,)))),
+        ("NombreRol, r.id_rol", FakeResult(_rows("Role", "NombreRol id_rol id_empleado", ("Coordinador SST", 3, 11)))),
+        ("e.Correo IN", FakeResult(_rows("Supervisor", "Correo id_supervisor NombreSupervisor", ("ana@empresa.co", 42, "Jefe")))),
+        ("VW_Dashboard_Alertas", FakeResult(alerts)),
+        ("EM.id_examen IS NULL", FakeResult(_rows(
+            "Emo", "id_empleado NombreCompleto Correo Estado",
+            (7, "Ana Ruiz", "ana@empresa.co", "EMO Vencido"),
+            (8, "Luis Gil", "luis@empresa.co", "EMO Vencido"),
+            (9, "Eva Sol", "eva@empresa.co", "Sin EMO Registrado"),
+        ))),
+        ("FROM CAPACITACION", FakeResult(_rows(
+            "Cap", "id_capacitacion Tema Fecha_Programada DiasVencidos", (31, "Alturas", None, 4)
+        ))),
+        ("REUNION_COMITE", FakeResult(scalar=1)),
+        ("INSPECCION", FakeResult()),
+        ("FROM EQUIPO", FakeResult()),
+        ("EVALUACION_RIESGO", FakeResult()),
+    ], today
+
+
+def test_batch_run_deduplicates_and_commits_once():
+    answers, today = _coordinator_answers()
+    db = FakeSession(answers)
+
+    actions = TaskCoordinatorAgent(db, batch=True).analyze_and_coordinate()
+
+    assert db.commits == 1 and db.rollbacks == 0
+    updates = [params for sql, params in db.writes if sql.lstrip().startswith("UPDATE")]
+    inserts = [params for sql, params in db.writes if "INSERT INTO TAREA" in sql]
+    assert updates == [{"task_0": 501, "resp_0": 42}]
+    assert len(inserts) == 1
+
+    keys = {value for name, value in inserts[0].items() if name.startswith("dkey_")}
+    # Employee 7 has an open EMO task, 8 an EMO alert today; the repeated
+    # alert and the unkeyed "Alturas" task are created at most once
+    assert keys == {
+        dedup_key("emo", 9),
+        dedup_key("alerta", "Extintor|Extintor vencido en bodega", today),
+    }
+    assert sum(action.get("status") == "EXECUTED" for action in actions) == 1
+
+
+def test_batch_run_rolls_back_when_a_write_fails():
+    answers, _ = _coordinator_answers()
+    db = FakeSession(answers, fail_on="INSERT INTO TAREA")
+
+    with pytest.raises(RuntimeError):
+        TaskCoordinatorAgent(db, batch=True).analyze_and_coordinate()
+    assert db.commits == 0 and db.rollbacks == 1
+
+
+def test_like_matches_parts_in_order():
+    assert _like("Realizar Examen Médico Ocupacional", "examen médico")
+    assert _like("Alerta: Juan Pérez sin examen médico", "Juan Pérez", "médico")
+    assert not _like("médico de Juan Pérez", "Juan Pérez", "médico")
+    assert not _like(None, "x")
+
+
+def test_dedup_key_is_normalized():
+    assert dedup_key("alerta", "Extintor  VENCIDO en Bodega", "2026-10-18") == \
+        dedup_key("Alerta", "extintor vencido en bodega", "2026-10-18")
+    assert dedup_key("emo", 7) != dedup_key("emo", 7, "2026-10-18")
+    assert len(dedup_key("emo", 7)) == 40
+
+
+def test_planned_writes_update_duplicate_indexes():
+    batch = CoordinationBatch(db_session=None)
+    batch.unkeyed_open[7][100] = "Inspección extintores bodega"
+    batch.task_owner[100] = 7
+    batch.roles = {"Coordinador SST": (3, 11), "Director SST": (5, 12)}
+    key = dedup_key("inspeccion", 5)
+
+    batch.plan_escalation(100, 42)
+    assert not batch.has_open_task(key, 7, "extintores")
+    assert batch.has_open_task(key, 42, "extintores")
+
+    key = dedup_key("capacitacion", 9)
+    batch.plan_task(key, 11, "Ejecutar capacitación pendiente: Alturas", 7, "Alta", "Capacitación", None)
+    assert batch.has_open_task(key, 99)
+    assert batch.created_today(key)
+    assert batch.new_tasks[0]["dkey"] == key
+
+    assert batch.holder("Presidente COPASST", "Coordinador SST") == 11
+    assert batch.holder("Coordinador SST", "Director SST", highest_role=True) == 12
+
+    values, params = _multirow_values(batch.escalations, ["task", "resp"])
+    assert values == "(:task_0, :resp_0)"
+    assert params == {"task_0": 100, "resp_0": 42}
+
+
+def test_insert_tasks_skips_rows_a_concurrent_run_already_inserted():
+    rows = [task_row(dedup_key("emo", emp), emp, "Realizar EMO", 15, "Alta", "Salud", None) for emp in (1, 2, 3)]
+    db = FakeSession(existing_keys={dedup_key("emo", 2)})
+
+    assert insert_tasks(db, rows) == 2
+    # The multi-row insert hits the unique index; the retry goes row by row
+    assert db.savepoint_rollbacks == 2
+    inserted = [params["resp_0"] for _, params in db.writes]
+    assert inserted == [1, 3]
+    assert "NOT EXISTS" in db.writes[0][0]
+
+
+def test_insert_tasks_reraises_other_integrity_errors():
+    class BrokenSession(FakeSession):
+        def execute(self, statement, params=None):
+            raise IntegrityError(str(statement), params, Exception("FOREIGN KEY constraint (547)"))
+
+    rows = [task_row(dedup_key("emo", 1), 1, "Realizar EMO", 15, "Alta", "Salud", None)]
+    with pytest.raises(IntegrityError):
+        insert_tasks(BrokenSession(), rows)
+
+
+def test_per_row_run_writes_dedup_keys():
+    answers, _ = _coordinator_answers()
+    db = FakeSession(answers, existing_keys={dedup_key("capacitacion", 31)})
+
+    actions = TaskCoordinatorAgent(db, batch=False).analyze_and_coordinate()
+
+    keys = [params["dkey_0"] for sql, params in db.writes if "INSERT INTO TAREA" in sql]
+    # Employee 8 has an EMO alert today; the training task lost the race
+    assert dedup_key("emo", 9) in keys and dedup_key("emo", 8) not in keys
+    assert dedup_key("capacitacion", 31) not in keys
+    assert not any(action.get("gap_type") == "CAPACITACION" for action in actions)
+
+
+def test_insert_tasks_counts_with_rowcount_not_the_cursor():
+    rows = [task_row(dedup_key("emo", emp), emp, "Realizar EMO", 15, "Alta", "Salud", None) for emp in (1, 2)]
+    # NOCOUNT: the cursor says -1 while the guard drops one of the two rows
+    db = FakeSession(open_keys={dedup_key("emo", 1)})
+
+    assert insert_tasks(db, rows) == 1
+    assert "SELECT @@ROWCOUNT" in db.writes[0][0]
+    assert insert_tasks(FakeSession(open_keys={dedup_key("emo", 1), dedup_key("emo", 2)}), rows) == 0
+
+
+def test_per_row_run_does_not_report_tasks_the_guard_skipped():
+    answers, _ = _coordinator_answers()
+    db = FakeSession(answers, open_keys={dedup_key("capacitacion", 31)})
+
+    actions = TaskCoordinatorAgent(db, batch=False).analyze_and_coordinate()
+
+    assert not any(action.get("gap_type") == "CAPACITACION" for action in actions)
+    assert any(action.get("gap_type") == "EMO" for action in actions)
@@ -0,0 +1,79 @@
+import sys
+import os
+import csv
+import io
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from api.utils import pagination
+from api.utils.pagination import decode_cursor, encode_cursor, export_rows, paginate
+
+Base = declarative_base()
+
+
+class Cargo(Base):
+    __tablename__ = "CARGO"
+    id_cargo = Column(Integer, primary_key=True)
+    Nombre = Column(String(100))
+    Area = Column(String(50))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            Cargo(id_cargo=i, Nombre=f"Cargo {i}", Area="Planta" if i % 2 else "Oficina")
+            for i in range(1, 8)
+        ])
+        session.commit()
+        yield session
+
+
+def test_cursor_pages_cover_the_table_once(db):
+    seen, cursor = [], None
+    while True:
+        page = paginate(db, Cargo, "CARGO", db.query(Cargo), 0, 3, cursor, "none", filtered=False)
+        seen.extend(item["id_cargo"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert page["total"] is None
+
+    assert seen == list(range(1, 8))
+    first = paginate(db, Cargo, "CARGO", db.query(Cargo), 0, 3, None, "exact", filtered=False)
+    assert first["total"] == 7 and decode_cursor("CARGO", first["next_cursor"], 1) == [3]
+
+
+def test_invalid_or_foreign_cursor_is_a_400(db):
+    for cursor in ("no-es-un-cursor", encode_cursor("EMPLEADO", [3]), encode_cursor("CARGO", [3, 1])):
+        with pytest.raises(HTTPException) as error:
+            paginate(db, Cargo, "CARGO", db.query(Cargo), 0, 3, cursor, "none", filtered=False)
+        assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        paginate(db, Cargo, "CARGO", db.query(Cargo), 0, 3, None, "bogus", filtered=False)
+    assert error.value.status_code == 400
+
+
+def test_export_framing(db, monkeypatch):
+    monkeypatch.setattr(pagination, "EXPORT_BATCH_SIZE", 3)
+
+    lines = list(export_rows(db, Cargo, {"Area": "Planta"}, "ndjson"))
+    assert [orjson.loads(line)["id_cargo"] for line in lines] == [1, 3, 5, 7]
+    assert all(line.endswith(b"\n") for line in lines)
+
+    blocks = list(export_rows(db, Cargo, None, "csv"))
+    # 7 rows in blocks of 3: header + 3, 3, then the last row
+    assert len(blocks) == 3
+    assert sum(block.count("id_cargo,Nombre,Area") for block in blocks) == 1
+    rows = list(csv.DictReader(io.StringIO("".join(blocks))))
+    assert [row["id_cargo"] for row in rows] == [str(i) for i in range(1, 8)]
@@ -0,0 +1,105 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from rag.batching import EmbeddingBatcher
+
+
+class RecordingGenerator:
+    """Stand-in for EmbeddingGenerator that records each batch it is given"""
+
+    def __init__(self, fail=False, gate=None):
+        self.calls = []
+        self.fail = fail
+        self.gate = gate
+
+    def embed_batch(self, texts):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model down")
+        return [np.full(4, float(len(text)), dtype=np.float32) for text in texts]
+
+
+def test_concurrent_requests_share_one_batch():
+    generator = RecordingGenerator()
+    batcher = EmbeddingBatcher(generator, max_batch_size=32, max_wait_ms=50)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "a", "ccc"]))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert generator.calls == [["a", "bb", "ccc"]]
+    assert [float(vector[0]) for vector in results] == [1.0, 2.0, 1.0, 3.0]
+    assert batcher.get_stats()["texts"] == 4
+
+
+def test_batches_flush_when_full_or_after_max_wait():
+    generator = RecordingGenerator()
+    batcher = EmbeddingBatcher(generator, max_batch_size=2, max_wait_ms=20)
+
+    async def run():
+        await batcher.embed_many(["a", "b", "c", "d", "e"])
+        started = time.monotonic()
+        await batcher.embed("solo")
+        elapsed = time.monotonic() - started
+        await batcher.close()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert [len(call) for call in generator.calls] == [2, 2, 1, 1]
+    # A lone request waits for the window, not for a full batch
+    assert elapsed < 0.5
+
+
+def test_model_error_reaches_every_waiter_and_batcher_recovers():
+    generator = RecordingGenerator(fail=True)
+    batcher = EmbeddingBatcher(generator, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+        generator.fail = False
+        recovered = await batcher.embed("c")
+        await batcher.close()
+        return results, recovered
+
+    results, recovered = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert float(recovered[0]) == 1.0
+
+
+def test_requests_queued_for_a_dead_worker_are_moved_to_the_new_one():
+    gate = threading.Event()
+    generator = RecordingGenerator(gate=gate)
+    batcher = EmbeddingBatcher(generator, max_batch_size=1, max_wait_ms=0)
+
+    async def run():
+        in_flight = asyncio.ensure_future(batcher.embed("a"))
+        await asyncio.sleep(0.05)  # "a" is encoding, "b" queues behind it
+        queued = asyncio.ensure_future(batcher.embed("b"))
+        await asyncio.sleep(0.01)
+
+        batcher._worker.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(in_flight, 5)
+        fresh = await batcher.embed("ccc")
+        moved = await asyncio.wait_for(queued, 5)
+        await batcher.close()
+        return moved, fresh
+
+    moved, fresh = asyncio.run(run())
+    assert float(moved[0]) == 1.0 and float(fresh[0]) == 3.0
@@ -0,0 +1,48 @@
+import sys
+import os
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from rag.embeddings import CachedEmbeddingGenerator, EmbeddingGenerator
+
+
+class CountingGenerator(CachedEmbeddingGenerator):
+    """Cached generator that records which texts reach the model"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.embedded = []
+
+
+def _fake_embed(self, texts):
+    self.embedded.extend(texts)
+    return [np.full(4, float(len(text)), dtype=np.float32) for text in texts]
+
+
+def test_batch_embeds_only_misses_and_evicts_lru(monkeypatch):
+    monkeypatch.setattr(EmbeddingGenerator, "embed_batch", _fake_embed)
+    generator = CountingGenerator(cache_size=2)
+
+    generator.embed_batch(["a", "bb", "a"])
+    generator.embed_batch(["a", "ccc"])
+
+    assert generator.embedded == ["a", "bb", "ccc"]
+    stats = generator.get_cache_stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_disk_tier_survives_restart(monkeypatch, tmp_path):
+    monkeypatch.setattr(EmbeddingGenerator, "embed_batch", _fake_embed)
+    path = str(tmp_path / "cache.sqlite")
+
+    CountingGenerator(cache_path=path).embed_batch(["artículo 2.2.4.6.8"])
+    restarted = CountingGenerator(cache_path=path)
+    vector = restarted.embed_text("artículo 2.2.4.6.8")
+
+    assert restarted.embedded == []
+    assert vector[0] == len("artículo 2.2.4.6.8")
+    assert restarted.get_cache_stats()["disk_hits"] == 1
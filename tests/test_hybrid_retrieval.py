@@ -0,0 +1,70 @@
+import sys
+import os
+import asyncio
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from rag.bm25 import BM25Index, BM25_POSTING_IDS_FILE, tokenize
+from rag.storage import generation_file
+from rag.rag_pipeline import HybridRAGPipeline
+from rag.vectorstore import VectorStore
+
+
+def test_tokenize_keeps_regulatory_identifiers():
+    assert tokenize("Artículo 2.2.4.6.8 de la Resolución 0312") == [
+        "articulo", "2.2.4.6.8", "2.2", "resolucion", "0312"
+    ]
+
+
+def test_hybrid_pipeline_surfaces_exact_article_match(tmp_path):
+    rng = np.random.default_rng(1)
+    texts = [f"Texto general sobre seguridad número {i}" for i in range(50)]
+    texts[37] = "Artículo 2.2.4.6.8 Obligaciones de los empleadores"
+    store = VectorStore(dimension=8)
+    store.add_documents(texts, rng.normal(size=(50, 8)))
+
+    class QueryEmbedder:
+        def embed_text(self, text):
+            return rng.normal(size=8)
+
+    pipeline = HybridRAGPipeline(store, QueryEmbedder(), top_k=3)
+    results = pipeline._retrieve("artículo 2.2.4.6.8", QueryEmbedder().embed_text(""), None)
+
+    article = next(r for r in results if r["id"] == 37)
+    assert "lexical" in article["retrieved_by"]
+    assert article["bm25_score"] > 0 and "score" in article
+
+    store.save(str(tmp_path / "index"))
+    reloaded = VectorStore(dimension=8, index_path=str(tmp_path / "index"))
+    assert reloaded.lexical_search("2.2.4.6.8", top_k=1)[0]["id"] == 37
+    reloaded.delete_documents([37])
+    assert reloaded.lexical_search("2.2.4.6.8", top_k=1) == []
+
+
+def test_bm25_segment_is_memory_mapped_and_only_rewritten_on_change(tmp_path):
+    index = BM25Index()
+    index.add([1, 2, 3], ["Resolución 0312 estándar 21", "Decreto 1072 artículo 2.2.4.6.8", "Estándar mínimo"])
+    index.save(tmp_path, store_version=1)
+
+    loaded = BM25Index.load(tmp_path, store_version=1)
+    assert isinstance(loaded._segment.posting_ids, np.memmap) and not loaded.postings
+    assert loaded.search("2.2.4.6.8", top_k=1) == index.search("2.2.4.6.8", top_k=1)
+
+    postings = tmp_path / generation_file(BM25_POSTING_IDS_FILE, 1)
+    written = postings.stat().st_mtime_ns
+    loaded.save(tmp_path, store_version=2)
+    assert postings.stat().st_mtime_ns == written
+    assert BM25Index.load(tmp_path, store_version=1) is None
+
+    loaded.remove([2])
+    loaded.add([4], ["Artículo 2.2.4.6.8 obligaciones"])
+    assert [doc_id for doc_id, _ in loaded.search("2.2.4.6.8")] == [4]
+    loaded.save(tmp_path, store_version=3)
+
+    reloaded = BM25Index.load(tmp_path, store_version=3)
+    assert len(reloaded) == 3 and reloaded.total_length == loaded.total_length
+    assert [doc_id for doc_id, _ in reloaded.search("2.2.4.6.8")] == [4]
+    assert sorted(doc_id for doc_id, _ in reloaded.search("estandar")) == [1, 3]
@@ -0,0 +1,58 @@
+import sys
+import os
+import asyncio
+
+import yaml
+
+# Add backend and vector to path
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(os.path.join(ROOT, "backend"))
+sys.path.append(os.path.join(ROOT, "vector"))
+
+from ingest import DocumentIngester
+
+
+def _ingester(tmp_path):
+    config = {
+        "embedding_model": "test",
+        "embedding_dimension": 384,
+        "device": "cpu",
+        "embedding_cache_path": None,
+        "index_path": str(tmp_path / "index"),
+        "chunk_size": 1000,
+        "chunk_overlap": 0,
+        "loader_workers": 1,
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    return DocumentIngester(str(config_path))
+
+
+def test_file_that_fails_to_load_keeps_its_chunks_and_is_retried(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    good, bad = docs / "good.txt", docs / "bad.txt"
+    good.write_text("Uso obligatorio de casco en obra.", encoding="utf-8")
+    bad.write_text("Procedimiento de trabajo en alturas.", encoding="utf-8")
+
+    ingester = _ingester(tmp_path)
+    asyncio.run(ingester.ingest_directory(str(docs)))
+    bad_ids = ingester.manifest.doc_ids(bad.as_posix())
+    assert len(bad_ids) == 1
+
+    # Not UTF-8: TextLoader fails on it
+    bad.write_bytes(b"\xff\xfe\x00 corrupto")
+    good.write_text("Uso obligatorio de casco y botas en obra.", encoding="utf-8")
+    result = asyncio.run(ingester.ingest_directory(str(docs)))
+
+    assert result["files_failed"] == [bad.as_posix()]
+    assert result["files_changed"] == 1
+    assert ingester.manifest.doc_ids(bad.as_posix()) == bad_ids
+    assert not ingester.manifest.is_current(bad, ingester.manifest.files[bad.as_posix()]["chunker_key"])
+    assert len(ingester.vectorstore) == 2
+
+    bad.write_text("Procedimiento de trabajo en alturas, revisado.", encoding="utf-8")
+    result = asyncio.run(ingester.ingest_directory(str(docs)))
+    assert result["files_failed"] == [] and result["files_changed"] == 1
+    assert ingester.manifest.doc_ids(bad.as_posix()) != bad_ids
+    assert len(ingester.vectorstore) == 2
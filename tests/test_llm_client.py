@@ -0,0 +1,95 @@
+import sys
+import os
+import asyncio
+import json
+
+import httpx
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from agents.llm_cache import LLMResponseCache, completion_key
+from agents.llm_client import LLMClientManager, LLMError, TokenBucket
+
+
+class FakeOpenAI:
+    """Minimal OpenAI-compatible /chat/completions that fails the first `failures` calls."""
+
+    def __init__(self, failures=0, status=503):
+        self.failures = failures
+        self.status = status
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return httpx.Response(self.status, json={"error": "busy"}, headers={"retry-after": "0"})
+        body = json.loads(request.content)
+        if body["stream"]:
+            chunks = [{"choices": [{"delta": {"content": word}}]} for word in ("Hola", " mundo")]
+            sse = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "ok"}}]})
+
+
+def make_manager(server, **kwargs):
+    return LLMClientManager("http://fake/v1", api_key="test", transport=httpx.MockTransport(server),
+                            retry_base_delay=0.0, **kwargs)
+
+
+def test_complete_and_stream_retry_transient_errors():
+    server = FakeOpenAI(failures=2)
+    manager = make_manager(server)
+
+    async def run():
+        response = await manager.complete([{"role": "user", "content": "hola"}])
+        deltas = [delta async for delta in manager.stream([{"role": "user", "content": "hola"}])]
+        await manager.close()
+        return response, deltas
+
+    response, deltas = asyncio.run(run())
+    assert response["choices"][0]["message"]["content"] == "ok"
+    assert deltas == ["Hola", " mundo"]
+    assert manager.get_stats()["retries"] == 2
+
+
+def test_client_errors_are_not_retried():
+    server = FakeOpenAI(failures=5, status=400)
+    manager = make_manager(server)
+    with pytest.raises(LLMError):
+        asyncio.run(manager.complete([{"role": "user", "content": "hola"}]))
+    assert server.calls == 1
+
+
+def test_token_bucket_spaces_out_bursts():
+    bucket = TokenBucket(per_minute=60)  # one per second, burst of ten
+    delays = [bucket.reserve() for _ in range(12)]
+    assert delays[:10] == [0.0] * 10
+    assert 0.9 < delays[10] < 1.1 and 1.9 < delays[11] < 2.1
+
+
+def test_cache_serves_deterministic_requests_without_calling_the_provider(tmp_path):
+    server = FakeOpenAI()
+    cache = LLMResponseCache(max_entries=10, disk_path=str(tmp_path / "llm.db"))
+    manager = make_manager(server, cache=cache)
+    messages = [{"role": "system", "content": "Eres un experto SST"}, {"role": "user", "content": "Resume"}]
+
+    async def run():
+        await manager.complete(messages, temperature=0)
+        await manager.complete(messages, temperature=0)
+        await manager.complete(messages, temperature=0.7)  # not cacheable
+        await manager.complete(messages, temperature=0.7, cache=True)
+        deltas = [delta async for delta in manager.stream(messages, temperature=0)]
+        await manager.close()
+        return deltas
+
+    deltas = asyncio.run(run())
+    assert server.calls == 3
+    assert deltas == ["ok"]
+    assert cache.get_stats()["hits"] == 2
+
+    # The disk tier survives a restart
+    restarted = LLMResponseCache(disk_path=str(tmp_path / "llm.db"))
+    assert restarted.get(completion_key("gpt-4", 0, messages)) is not None
+    assert completion_key("gpt-4", 0, messages) != completion_key("gpt-4", 0, messages, {"max_tokens": 50})
@@ -0,0 +1,44 @@
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from api.utils.principal_cache import Principal, PrincipalCache, token_id
+
+
+def make_principal(email, id_rol=3, role_name="Coordinador SST"):
+    user = SimpleNamespace(Correo_Electronico=email, Estado=True, id_rol=id_rol, Nivel_Acceso=None)
+    return Principal(user=user, role_name=role_name)
+
+
+def test_cache_hits_expires_and_invalidates():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    ana = make_principal("ana@empresa.co")
+
+    assert cache.get("ana@empresa.co", "t1") is None
+    cache.put("ana@empresa.co", "t1", ana)
+    cache.put("ana@empresa.co", "t2", ana)
+    assert cache.get("ANA@empresa.co", "t1") is ana
+    assert ana.has_role(["Coordinador SST"]) and not ana.has_role(["CEO"])
+
+    # Invalidation drops every token of the user
+    assert cache.invalidate_user("ana@empresa.co") == 2
+    assert cache.get("ana@empresa.co", "t2") is None
+
+    # Entries never outlive the token
+    cache.put("ana@empresa.co", "t3", ana, token_exp=time.time() - 1)
+    assert cache.get("ana@empresa.co", "t3") is None
+
+    # Size bound evicts least recently used
+    for jti in ("a", "b", "c"):
+        cache.put("luis@empresa.co", jti, make_principal("luis@empresa.co"))
+    assert cache.get("luis@empresa.co", "a") is None
+    assert cache.get_stats()["entries"] == 2
+
+
+def test_token_id_falls_back_to_token_hash():
+    assert token_id({"jti": "abc"}, "token") == "abc"
+    assert token_id({}, "token-1") != token_id({}, "token-2")
@@ -0,0 +1,77 @@
+import sys
+import os
+import asyncio
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from rag.query_cache import QueryResultCache
+from rag.rag_pipeline import RAGPipeline
+from rag.vectorstore import VectorStore
+
+
+class FixedEmbedder:
+    """Embeds every question to the same vector and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_text(self, text):
+        self.calls += 1
+        return np.ones(4, dtype=np.float32)
+
+
+def test_repeated_and_paraphrased_questions_skip_the_pipeline():
+    store = VectorStore(dimension=4)
+    store.add_documents(["El examen médico periódico se realiza anualmente."], [np.ones(4)])
+    embedder = FixedEmbedder()
+    pipeline = RAGPipeline(store, embedder, result_cache=QueryResultCache(similarity_threshold=0.99))
+
+    first = asyncio.run(pipeline.query("¿Cada cuánto se hace el examen médico periódico?"))
+    exact = asyncio.run(pipeline.query("cada cuanto se hace el examen medico periodico"))
+    similar = asyncio.run(pipeline.query("frecuencia del examen periódico"))
+
+    assert first == exact == similar
+    assert embedder.calls == 2
+    assert pipeline.result_cache.get_stats()["semantic_hits"] == 1
+
+    store.add_documents(["Nuevo documento"], [np.ones(4)])
+    asyncio.run(pipeline.query("cada cuanto se hace el examen medico periodico"))
+    assert embedder.calls == 3
+    assert pipeline.result_cache.get_stats()["invalidations"] == 1
+
+
+class MappedEmbedder:
+    """Embeds each question to a fixed vector"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_text(self, text):
+        return np.asarray(self.vectors[text], dtype=np.float32)
+
+
+def test_semantic_matching_is_opt_in_and_respects_the_threshold():
+    store = VectorStore(dimension=4)
+    store.add_documents(["Examen médico de ingreso y periódico."], [np.ones(4)])
+    # Cosine similarity with "ingreso": 0.95 for "al ingresar", 0.8 for "periodico"
+    embedder = MappedEmbedder({
+        "examen medico de ingreso": [1.0, 0.0, 0.0, 0.0],
+        "examen medico al ingresar": [0.95, np.sqrt(1 - 0.95 ** 2), 0.0, 0.0],
+        "examen medico periodico": [0.8, 0.0, 0.6, 0.0],
+    })
+
+    default = RAGPipeline(store, embedder, result_cache=QueryResultCache())
+    asyncio.run(default.query("examen medico de ingreso"))
+    asyncio.run(default.query("examen medico al ingresar"))
+    assert default.result_cache.get_stats()["semantic_hits"] == 0
+
+    opted_in = RAGPipeline(store, embedder, result_cache=QueryResultCache(similarity_threshold=0.9))
+    asyncio.run(opted_in.query("examen medico de ingreso"))
+    asyncio.run(opted_in.query("examen medico al ingresar"))
+    asyncio.run(opted_in.query("examen medico periodico"))
+    stats = opted_in.result_cache.get_stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 2
@@ -0,0 +1,97 @@
+import sys
+import os
+import asyncio
+import json
+
+import httpx
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from agents import assistant_agent
+from agents.base_agent import AgentContext
+from agents.events import AgentEventStream, TOKEN
+from agents.llm_cache import LLMResponseCache
+from agents.llm_client import LLMClientManager
+from agents.tools.assistant_tools import AssistantTools
+from agents.tools.query_tools import QueryTools
+from data.schema_context import SCHEMA_CONTEXT
+
+
+class FakeSQLModel:
+    """OpenAI-compatible /chat/completions that always answers with the same SQL."""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        if body["stream"]:
+            chunks = [{"choices": [{"delta": {"content": word}}]} for word in self.sql.split(" ")[:1]]
+            chunks += [{"choices": [{"delta": {"content": " " + word}}]} for word in self.sql.split(" ")[1:]]
+            sse = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": self.sql}}]})
+
+
+class OfflineTransport:
+    async def request(self, method, endpoint, params=None, json=None):
+        raise AssertionError(f"unexpected API call: {method} {endpoint}")
+
+
+def make_manager(server, **kwargs):
+    return LLMClientManager("http://fake/v1", api_key="test", transport=httpx.MockTransport(server),
+                            retry_base_delay=0.0, **kwargs)
+
+
+def test_sql_is_generated_through_the_llm_manager():
+    server = FakeSQLModel("```sql\nDELETE FROM EMPLEADO\n```")
+    tools = QueryTools(llm=make_manager(server))
+
+    result = asyncio.run(tools.query_database("Borra los empleados"))
+
+    # Rejected before reaching the database
+    assert result["success"] is False and "Security Alert" in result["error"]
+    assert result["sql"].strip() == "DELETE FROM EMPLEADO"
+    body = server.requests[0]
+    assert body["temperature"] == 0 and body["stream"] is False
+    assert body["messages"][0] == {"role": "system", "content": SCHEMA_CONTEXT}
+    assert "Borra los empleados" in body["messages"][1]["content"]
+
+
+def test_sql_generation_is_streamed_as_token_events():
+    server = FakeSQLModel("DROP TABLE EMPLEADO")
+    tools = QueryTools(llm=make_manager(server))
+
+    async def run():
+        events = AgentEventStream()
+        events.activate()
+        result = await tools.query_database("Borra la tabla")
+        events.close()
+        return result, [event async for event in events]
+
+    result, events = asyncio.run(run())
+    tokens = [event for event in events if event["event"] == TOKEN]
+    assert [event["content"] for event in tokens] == ["DROP", " TABLE", " EMPLEADO"]
+    assert all(event["tool"] == "QueryTools" for event in tokens)
+    assert server.requests[0]["stream"] is True
+    assert result["sql"] == "DROP TABLE EMPLEADO" and result["success"] is False
+
+
+def test_repeated_agent_questions_hit_the_llm_cache(monkeypatch):
+    server = FakeSQLModel("DELETE FROM EMPLEADO")
+    cache = LLMResponseCache(max_entries=10)
+    manager = make_manager(server, cache=cache)
+    monkeypatch.setattr(assistant_agent, "AssistantTools", lambda: AssistantTools("http://test", transport=OfflineTransport()))
+    monkeypatch.setattr(assistant_agent, "QueryTools", lambda: QueryTools(llm=manager))
+    agent = assistant_agent.AssistantAgent()
+
+    async def ask_twice():
+        return [await agent.execute("¿Cuántos empleados hay?", AgentContext(user_id=1)) for _ in range(2)]
+
+    answers = asyncio.run(ask_twice())
+    assert answers[0] == answers[1] and answers[0]["type"] == "error"
+    assert len(server.requests) == 1
+    assert cache.get_stats()["hits"] == 1
@@ -0,0 +1,43 @@
+import sys
+import os
+
+from sqlalchemy import create_engine, text
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from api.utils.schema_cache import SchemaSnapshot, load_metadata
+
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE EMPRESA (id_empresa INTEGER PRIMARY KEY, nombre TEXT)"))
+        conn.execute(text(
+            "CREATE TABLE EMPLEADO (id_empleado INTEGER PRIMARY KEY, "
+            "id_empresa INTEGER REFERENCES EMPRESA(id_empresa))"
+        ))
+        conn.execute(text("CREATE TABLE AUDITORIA (id_auditoria INTEGER PRIMARY KEY)"))
+    return engine
+
+
+def test_snapshot_reused_without_touching_database(tmp_path):
+    engine = make_engine(tmp_path / "db.sqlite")
+    cache_path = str(tmp_path / "schema.pkl")
+    calls = []
+
+    def fingerprint(_engine):
+        calls.append(1)
+        return "v1"
+
+    first = load_metadata(engine, ["EMPLEADO"], cache_path, revalidate=False, fingerprint=fingerprint)
+    # Foreign key targets come along, unrelated tables do not
+    assert set(first.tables) == {"EMPLEADO", "EMPRESA"}
+    assert len(calls) == 1
+
+    second = load_metadata(engine, ["EMPLEADO"], cache_path, revalidate=False, fingerprint=fingerprint)
+    assert set(second.tables) == {"EMPLEADO", "EMPRESA"}
+    assert len(calls) == 1
+
+    # A different table selection does not reuse the snapshot
+    assert SchemaSnapshot(cache_path).load(["AUDITORIA"]) is None
@@ -0,0 +1,51 @@
+import sys
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, LargeBinary
+from sqlalchemy.orm import declarative_base
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from api.utils.serializers import get_serializer, serialize_rows
+
+Base = declarative_base()
+
+
+class Evento(Base):
+    __tablename__ = "EVENTO"
+    id_evento = Column(Integer, primary_key=True)
+    Descripcion = Column(String(200))
+    Fecha_Evento = Column(Date)
+    Fecha_Registro = Column(DateTime)
+    Costo = Column(Numeric(12, 2))
+    Dias_Perdidos = Column(Numeric(5, 0))
+    Adjunto = Column(LargeBinary)
+
+
+def test_serializer_converts_and_is_cached():
+    row = Evento(
+        id_evento=1,
+        Descripcion="Caída",
+        Fecha_Evento=date(2025, 3, 1),
+        Fecha_Registro=datetime(2025, 3, 1, 8, 30),
+        Costo=Decimal("150.50"),
+        Dias_Perdidos=Decimal("3"),
+        Adjunto=b"\x00\x01",
+    )
+
+    assert get_serializer(Evento) is get_serializer(Evento)
+    assert serialize_rows([row]) == [{
+        "id_evento": 1,
+        "Descripcion": "Caída",
+        "Fecha_Evento": "2025-03-01",
+        "Fecha_Registro": "2025-03-01T08:30:00",
+        "Costo": 150.5,
+        "Dias_Perdidos": 3,
+        "Adjunto": "AAE=",
+    }]
+
+    empty = get_serializer(Evento)(Evento(id_evento=2))
+    assert empty["Fecha_Evento"] is None and empty["Costo"] is None
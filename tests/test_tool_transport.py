@@ -0,0 +1,104 @@
+import sys
+import os
+import asyncio
+from datetime import date
+from typing import Annotated, Any, Dict, List, Optional
+
+import pytest
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from agents.tools.transport import InProcessTransport, _Route
+
+
+def get_current_principal():
+    raise AssertionError("the transport validates the token itself")
+
+
+async def get_current_user(principal: Annotated[dict, Depends(get_current_principal)]):
+    return principal["user"]
+
+
+async def get_current_active_user(current_user: Annotated[dict, Depends(get_current_user)]):
+    if not current_user["active"]:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+router = APIRouter()
+
+
+@router.get("/report/{year}")
+async def report(year: int, fecha_corte: Optional[date] = None, current_user=Depends(get_current_active_user)):
+    return {"year": year, "fecha_corte": fecha_corte}
+
+
+@router.post("/mark")
+def mark(ids: List[int], current_user=Depends(get_current_active_user)):
+    return {"marked": ids, "by": current_user and current_user["name"]}
+
+
+@router.get("/{table_name}")
+def get_all(table_name: str, limit: int = Query(100, ge=1), current_user=Depends(get_current_active_user)):
+    return ORJSONResponse({"table": table_name, "limit": limit})
+
+
+@router.post("/{table_name}/search")
+def search(table_name: str, filters: Dict[str, Any], current_user=Depends(get_current_active_user)):
+    if not filters:
+        raise HTTPException(status_code=400, detail="no filters")
+    return {"table": table_name, "filters": filters}
+
+
+class FakeTransport(InProcessTransport):
+    anonymous_routes = {("x", "GET", "/report/{year}"), ("x", "GET", "/{table_name}"), ("x", "POST", "/{table_name}/search")}
+    anonymous_tables = {"EMPLEADO"}
+    users = {"ana-token": {"name": "ana", "active": True}, "old-token": {"name": "old", "active": False}}
+
+    def _load_routes(self):
+        return [_Route(method, route, "/api/v1/x") for route in router.routes for method in route.methods]
+
+    async def _principal(self):
+        if self.token not in self.users:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        return {"user": self.users[self.token]}
+
+
+def test_inprocess_binds_path_query_and_body():
+    transport = FakeTransport()
+    call = lambda *args, **kwargs: asyncio.run(transport.request(*args, **kwargs))
+
+    assert call("GET", "/api/v1/x/report/2024?fecha_corte=2024-06-30") == {"year": 2024, "fecha_corte": "2024-06-30"}
+    assert call("GET", "/api/v1/x/EMPLEADO") == {"table": "EMPLEADO", "limit": 100}
+    assert call("GET", "/api/v1/x/EMPLEADO", params={"limit": "5"}) == {"table": "EMPLEADO", "limit": 5}
+    assert call("POST", "/api/v1/x/EMPLEADO/search", json={"Area": "SST"}) == {"table": "EMPLEADO", "filters": {"Area": "SST"}}
+
+    with pytest.raises(Exception, match="API error: .*no filters"):
+        call("POST", "/api/v1/x/EMPLEADO/search", json={})
+    with pytest.raises(Exception, match="Not Found"):
+        call("DELETE", "/api/v1/x/EMPLEADO")
+
+
+def test_inprocess_without_a_token_only_reaches_allow_listed_reads():
+    transport = FakeTransport()
+    call = lambda *args, **kwargs: asyncio.run(transport.request(*args, **kwargs))
+
+    with pytest.raises(Exception, match="Not authenticated"):
+        call("POST", "/api/v1/x/mark", json=[1, 2])
+    with pytest.raises(Exception, match="Not authenticated"):
+        call("GET", "/api/v1/x/USUARIOS_AUTORIZADOS")
+
+
+def test_inprocess_runs_the_route_auth_dependencies_for_the_token():
+    call = lambda token, *args, **kwargs: asyncio.run(
+        FakeTransport({"Authorization": f"Bearer {token}"}).request(*args, **kwargs)
+    )
+
+    assert call("ana-token", "POST", "/api/v1/x/mark", json=[1, 2]) == {"marked": [1, 2], "by": "ana"}
+    with pytest.raises(Exception, match="Inactive user"):
+        call("old-token", "POST", "/api/v1/x/mark", json=[1])
+    with pytest.raises(Exception, match="Could not validate credentials"):
+        call("forged", "GET", "/api/v1/x/EMPLEADO")
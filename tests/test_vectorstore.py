@@ -0,0 +1,175 @@
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from rag import storage
+from rag.vectorstore import VectorStore
+
+
+def _random_store(n=2000, dimension=16, **kwargs):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, dimension)).astype("float32")
+    store = VectorStore(dimension=dimension, **kwargs)
+    store.add_documents(
+        [f"chunk {i}" for i in range(n)],
+        vectors,
+        [{"doc_type": "regulation" if i % 50 == 0 else "policy"} for i in range(n)]
+    )
+    return store, vectors
+
+
+def test_search_returns_nearest_neighbours_by_cosine():
+    store, vectors = _random_store()
+
+    results = store.search(vectors[42], top_k=3)
+
+    assert results[0]["id"] == 42
+    assert results[0]["score"] > results[1]["score"] >= results[2]["score"]
+
+
+def test_filtered_search_is_exact_top_k():
+    store, vectors = _random_store()
+
+    results = store.search(vectors[0], top_k=10, filter_metadata={"doc_type": "regulation"})
+
+    assert len(results) == 10
+    assert all(r["metadata"]["doc_type"] == "regulation" for r in results)
+    assert results[0]["id"] == 0
+
+
+def test_ann_index_finds_exact_match():
+    store, vectors = _random_store(n=5000, ann_threshold=1000, ann_nprobe=16)
+
+    results = store.search(vectors[1234], top_k=5)
+
+    assert store.get_stats()["index_type"] == "ivf"
+    assert results[0]["id"] == 1234
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    store, vectors = _random_store(n=200)
+    store.save(str(tmp_path / "index"))
+
+    loaded = VectorStore(dimension=16, index_path=str(tmp_path / "index"))
+
+    assert loaded.get_stats()["total_documents"] == 200
+    assert loaded.search(vectors[7], top_k=1)[0]["id"] == 7
+
+
+def test_binary_store_is_memory_mapped_and_appendable(tmp_path):
+    store, vectors = _random_store(n=300, storage_dtype="float16")
+    store.save(str(tmp_path / "index"))
+
+    loaded = VectorStore(dimension=16, index_path=str(tmp_path / "index"))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.get_stats()["version"] == 1
+    assert loaded.search(vectors[11], top_k=1)[0]["metadata"] == {"doc_type": "policy"}
+
+    new_ids = loaded.add_documents(["nuevo"], vectors[:1], [{"doc_type": "procedure"}])
+    assert new_ids == [300]
+    assert loaded.search(vectors[0], top_k=2, filter_metadata={"doc_type": "procedure"})[0]["text"] == "nuevo"
+
+
+def test_legacy_json_store_is_readable(tmp_path):
+    import json
+
+    index = tmp_path / "index"
+    index.mkdir()
+    vectors = np.eye(16, dtype="float32")[:2]
+    np.save(index / "vectors.npy", vectors)
+    (index / "documents.json").write_text(json.dumps([{"id": 0, "text": "a"}, {"id": 1, "text": "b"}]))
+    (index / "metadata.json").write_text(json.dumps([{}, {"source": "x"}]))
+
+    loaded = VectorStore(dimension=16, index_path=str(index))
+
+    assert loaded.search(vectors[1], top_k=1)[0] == {"id": 1, "text": "b", "metadata": {"source": "x"}, "score": 1.0}
+
+
+def test_filter_supports_in_and_stays_exact_for_rare_values():
+    store, vectors = _random_store(n=5000, ann_threshold=1000)
+    store.add_documents(["decreto"], vectors[:1] * -1, [{"doc_type": "decree"}])
+
+    rare = store.search(vectors[0], top_k=3, filter_metadata={"doc_type": "decree"})
+    mixed = store.search(
+        vectors[0], top_k=200, filter_metadata={"doc_type": {"$in": ["decree", "regulation"]}}
+    )
+
+    assert [r["text"] for r in rare] == ["decreto"]
+    assert len(mixed) == 101
+    assert store.search(vectors[0], top_k=3, filter_metadata={"doc_type": "missing"}) == []
+
+
+def test_delete_tombstones_then_compacts_with_stable_ids(tmp_path):
+    store, vectors = _random_store(n=100, compaction_threshold=0.5)
+
+    assert store.delete_documents([3, 3, 999]) == 1
+    assert store.search(vectors[3], top_k=1)[0]["id"] != 3
+    assert store.get_stats()["deleted_pending_compaction"] == 1
+
+    store.compact()
+    store.delete_documents([4])
+    store.save(str(tmp_path / "index"))
+    loaded = VectorStore(dimension=16, index_path=str(tmp_path / "index"))
+
+    assert len(loaded) == 98
+    assert loaded.search(vectors[50], top_k=1)[0]["id"] == 50
+    assert loaded.add_documents(["nuevo"], vectors[:1]) == [100]
+    assert loaded.delete_documents([50]) == 1
+
+
+def test_save_deletions_writes_only_the_bitmap(tmp_path):
+    path = tmp_path / "index"
+    store, vectors = _random_store(n=100, compaction_threshold=0.5, index_path=str(path))
+    store.save()
+    vectors_mtime = (path / "vectors.1.npy").stat().st_mtime_ns
+
+    store.delete_documents([7, 8])
+    store.save_deletions()
+
+    assert (path / "vectors.1.npy").stat().st_mtime_ns == vectors_mtime
+    loaded = VectorStore(dimension=16, index_path=str(path))
+    assert len(loaded) == 98
+    assert loaded.get_stats()["deleted_pending_compaction"] == 2
+    assert loaded.search(vectors[7], top_k=1)[0]["id"] != 7
+    assert 8 not in [r["id"] for r in loaded.lexical_search("chunk 8", top_k=5)]
+
+    # Past the threshold the store is compacted and rewritten
+    loaded.delete_documents(list(range(10, 60)))
+    loaded._compaction.join()
+    loaded.save_deletions()
+    reloaded = VectorStore(dimension=16, index_path=str(path))
+    assert len(reloaded) == 48
+    assert reloaded.get_stats()["deleted_pending_compaction"] == 0
+
+
+def test_save_never_replaces_a_memory_mapped_file(tmp_path, monkeypatch):
+    path = tmp_path / "index"
+    store, vectors = _random_store(n=100, index_path=str(path))
+    store.save()
+    loaded = VectorStore(dimension=16, index_path=str(path))
+    loaded.add_documents(["nuevo"], vectors[:1], [{"doc_type": "procedure"}])
+
+    # Windows refuses to replace a file while it is mapped
+    replaced = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        if Path(dst).exists():
+            replaced.append(Path(dst).name)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(storage.os, "replace", recording_replace)
+    loaded.save()
+
+    assert set(replaced) <= {"manifest.json", "metadata_columns.json", "deleted.npy", "bm25.json"}
+    assert not list(path.glob("*.1.*"))
+    assert loaded.search(vectors[0], top_k=2, filter_metadata={"doc_type": "procedure"})[0]["text"] == "nuevo"
+    reloaded = VectorStore(dimension=16, index_path=str(path))
+    assert len(reloaded) == 101 and reloaded.get_document(100)["text"] == "nuevo"
+    assert reloaded.lexical_search("nuevo", top_k=1)[0]["id"] == 100
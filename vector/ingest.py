@@ -12,38 +12,60 @@ import yaml
 import asyncio
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from rag.loaders import DirectoryLoader, Document
-from rag.embeddings import EmbeddingGenerator
+from rag.embeddings import CachedEmbeddingGenerator
 from rag.vectorstore import VectorStore
+from rag.ingest_manifest import IngestManifest, chunker_key
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class DocumentIngester:
-    """Ingest documents into vectorstore"""
+    """
+    Ingest documents into vectorstore.
+
+    Ingestion is incremental: an ingest manifest stored next to the index
+    records each file's content hash, chunker settings and chunk IDs.
+    Unchanged files are skipped, changed files have their old chunks
+    deleted and are re-chunked, and files that disappeared from a source
+    directory have their chunks removed. A changed file that fails to
+    load keeps its previous chunks and manifest entry, so the next run
+    retries it.
+    """
     
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize ingester with configuration"""
         self.config = self._load_config(config_path)
         
         # Initialize components
-        self.embedding_generator = EmbeddingGenerator(
+        self.embedding_generator = CachedEmbeddingGenerator(
             model_name=self.config["embedding_model"],
-            device=self.config["device"]
+            device=self.config["device"],
+            cache_size=self.config.get("embedding_cache_size", 10000),
+            cache_path=self.config.get("embedding_cache_path")
         )
         
         self.vectorstore = VectorStore(
             dimension=self.config["embedding_dimension"],
-            index_path=self.config["index_path"]
+            index_path=self.config["index_path"],
+            metric=self.config.get("metric", "cosine"),
+            ann_threshold=self.config.get("ann_threshold", 20000),
+            ann_nlist=self.config.get("ann_nlist"),
+            ann_nprobe=self.config.get("ann_nprobe", 8),
+            storage_dtype=self.config.get("storage_dtype", "float32")
         )
         
         self.loader = DirectoryLoader(
             chunk_size=self.config["chunk_size"],
-            chunk_overlap=self.config["chunk_overlap"]
+            chunk_overlap=self.config["chunk_overlap"],
+            max_workers=self.config.get("loader_workers"),
+            batch_size=self.config.get("embedding_batch_size", 64)
         )
+
+        self.manifest = IngestManifest.for_index(self.config["index_path"])
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file"""
@@ -62,7 +84,7 @@ class DocumentIngester:
             "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
             "embedding_dimension": 384,
             "device": "cpu",
-            "vectorstore_type": "faiss",
+            "vectorstore_type": "numpy",
             "index_path": "./vector/index",
             "chunk_size": 1000,
             "chunk_overlap": 200,
@@ -73,63 +95,150 @@ class DocumentIngester:
         self,
         directory: str,
         doc_type: str = "general",
-        recursive: bool = True
+        recursive: bool = True,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        force: bool = False,
+        save: bool = True
     ) -> Dict[str, Any]:
         """
-        Ingest all documents from a directory.
+        Ingest new and changed documents from a directory.
         
         Args:
             directory: Directory path
             doc_type: Document type for metadata
             recursive: Search subdirectories
+            chunk_size: Per-source override of the configured chunk size
+            chunk_overlap: Per-source override of the configured chunk overlap
+            force: Re-ingest every file even if the manifest says it is current
+            save: Persist the vectorstore and manifest when something changed
         
         Returns:
             Ingestion results
         """
         logger.info(f"Starting ingestion from: {directory}")
-        
-        # Load documents
-        documents = self.loader.load(directory, recursive=recursive)
-        
-        if not documents:
+
+        chunk_size = chunk_size or self.config["chunk_size"]
+        chunk_overlap = self.config["chunk_overlap"] if chunk_overlap is None else chunk_overlap
+        default_metadata = self.config.get("default_metadata", {})
+
+        # Everything that ends up in a stored chunk is part of the key, so a
+        # config change only invalidates the sources it applies to
+        key = chunker_key(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            doc_type=doc_type,
+            default_metadata=sorted(default_metadata.items())
+        )
+
+        seen = set()
+        removed_ids: List[int] = []
+        changed_files: List[Path] = []
+        unchanged = 0
+
+        for file_path in self.loader.iter_files(directory, recursive=recursive):
+            seen.add(file_path.as_posix())
+
+            if not force and self.manifest.is_current(file_path, key):
+                unchanged += 1
+                continue
+
+            changed_files.append(file_path)
+
+        removed_files = [
+            file_key for file_key in self.manifest.files_under(directory, recursive)
+            if file_key not in seen
+        ]
+        for file_key in removed_files:
+            removed_ids.extend(self.manifest.forget(file_key))
+
+        if not seen and not removed_files:
             logger.warning(f"No documents found in {directory}")
             return {
                 "status": "no_documents",
                 "directory": directory,
                 "count": 0
             }
-        
-        logger.info(f"Loaded {len(documents)} document chunks")
-        
-        # Add document type to metadata
-        for doc in documents:
-            doc.metadata["doc_type"] = doc_type
-            doc.metadata.update(self.config.get("default_metadata", {}))
-        
-        # Generate embeddings
-        texts = [doc.content for doc in documents]
-        logger.info("Generating embeddings...")
-        embeddings = self.embedding_generator.embed_batch(texts)
-        
-        # Add to vectorstore
-        metadata = [doc.metadata for doc in documents]
-        logger.info("Adding to vectorstore...")
-        doc_ids = self.vectorstore.add_documents(texts, embeddings, metadata)
-        
-        # Save vectorstore
-        logger.info("Saving vectorstore...")
-        self.vectorstore.save()
-        
+
+        logger.info(
+            f"{len(changed_files)} new or changed files, "
+            f"{unchanged} unchanged, {len(removed_files)} removed"
+        )
+
+        if removed_ids:
+            self.vectorstore.delete_documents(removed_ids)
+
+        # Stream chunk batches of the changed files straight into embedding;
+        # parsing runs ahead in the loader's process pool, bounded by it
+        doc_ids: List[int] = []
+        ids_by_file: Dict[str, List[int]] = {}
+        failed_files: List[Path] = []
+
+        for batch in self.loader.iter_file_batches(
+            changed_files, chunk_size, chunk_overlap, failed=failed_files
+        ):
+            for doc in batch:
+                doc.metadata["doc_type"] = doc_type
+                doc.metadata.update(default_metadata)
+
+            texts = [doc.content for doc in batch]
+            embeddings = self.embedding_generator.embed_batch(texts)
+            batch_ids = self.vectorstore.add_documents(texts, embeddings, [doc.metadata for doc in batch])
+            doc_ids.extend(batch_ids)
+
+            for doc, doc_id in zip(batch, batch_ids):
+                ids_by_file.setdefault(Path(doc.metadata["source"]).as_posix(), []).append(doc_id)
+
+            logger.info(f"Indexed batch of {len(batch)} chunks ({len(doc_ids)} so far)")
+
+        # Old chunks of a changed file go only once its new chunks are in;
+        # a file that failed to load keeps them and stays out of date
+        failed_keys = {file_path.as_posix() for file_path in failed_files}
+        stale_ids: List[int] = list(removed_ids)
+        replaced_ids: List[int] = []
+        for file_path in changed_files:
+            file_key = file_path.as_posix()
+            if file_key in failed_keys:
+                continue
+            replaced_ids.extend(self.manifest.doc_ids(file_key))
+            self.manifest.record(file_path, key, ids_by_file.get(file_key, []))
+
+        if replaced_ids:
+            self.vectorstore.delete_documents(replaced_ids)
+            stale_ids.extend(replaced_ids)
+
+        if failed_files:
+            logger.warning(
+                f"{len(failed_files)} files failed to load and will be retried: "
+                f"{', '.join(path.name for path in failed_files)}"
+            )
+
+        if save and (changed_files or removed_files):
+            self.save()
+        elif save and self.manifest.dirty:
+            self.manifest.save()
+
         logger.info(f"Ingestion complete: {len(doc_ids)} chunks indexed")
-        
+
         return {
             "status": "success",
             "directory": directory,
             "count": len(doc_ids),
+            "files_changed": len(changed_files) - len(failed_files),
+            "files_failed": [file_path.as_posix() for file_path in failed_files],
+            "files_unchanged": unchanged,
+            "files_removed": len(removed_files),
+            "chunks_removed": len(stale_ids),
             "doc_ids": doc_ids
         }
+
+    def save(self):
+        """Persist the vectorstore, then the manifest that points into it"""
+        logger.info("Saving vectorstore...")
+        self.vectorstore.save()
+        self.manifest.save()
     
-    async def ingest_from_config(self) -> Dict[str, Any]:
+    async def ingest_from_config(self, force: bool = False) -> Dict[str, Any]:
         """Ingest documents from sources defined in config"""
         sources = self.config.get("document_sources", [])
         
@@ -151,9 +260,22 @@ class DocumentIngester:
                 logger.warning(f"Source path not found: {path}")
                 continue
             
-            result = await self.ingest_directory(path, doc_type, recursive)
+            result = await self.ingest_directory(
+                path,
+                doc_type,
+                recursive,
+                chunk_size=source.get("chunk_size"),
+                chunk_overlap=source.get("chunk_overlap"),
+                force=force,
+                save=False
+            )
             results.append(result)
         
+        if any(r.get("files_changed") or r.get("files_removed") for r in results):
+            self.save()
+        elif self.manifest.dirty:
+            self.manifest.save()
+        
         total_docs = sum(r.get("count", 0) for r in results)
         
         return {
@@ -185,6 +307,11 @@ async def main():
         action="store_true",
         help="Ingest from config file sources"
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-ingest every file, ignoring the ingest manifest"
+    )
     
     args = parser.parse_args()
     
@@ -192,10 +319,10 @@ async def main():
     
     if args.config:
         logger.info("Ingesting from config file sources...")
-        result = await ingester.ingest_from_config()
+        result = await ingester.ingest_from_config(force=args.force)
     elif args.directory:
         logger.info(f"Ingesting from directory: {args.directory}")
-        result = await ingester.ingest_directory(args.directory, args.type)
+        result = await ingester.ingest_directory(args.directory, args.type, force=args.force)
     else:
         logger.error("Please specify --directory or --config")
         return